@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +42,96 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 TRANSLATING_LANGUAGES = os.getenv("TRANSLATING_LANGUAGES")
 
+# Translation API client (main.translation.client): seconds per attempt and
+# per call including retries, retry backoff, the keep-alive connection pool
+# and the circuit breaker (failed calls in a row before failing fast, and
+# for how many seconds).
+TRANSLATION_CLIENT = {
+    "timeout": float(os.getenv("TRANSLATION_TIMEOUT", "20")),
+    "deadline": float(os.getenv("TRANSLATION_DEADLINE", "45")),
+    "max_retries": int(os.getenv("TRANSLATION_MAX_RETRIES", "2")),
+    "backoff": 0.5,
+    "max_backoff": 8.0,
+    "max_connections": int(os.getenv("TRANSLATION_MAX_CONNECTIONS", "20")),
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 30.0,
+    "breaker_threshold": int(os.getenv("TRANSLATION_BREAKER_THRESHOLD", "5")),
+    "breaker_reset": float(os.getenv("TRANSLATION_BREAKER_RESET", "30")),
+}
+
+# Where translation calls go: "openai", "local" (an offline backend for
+# development, CI and load tests) or the dotted path of a backend class.
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "openai")
+
+# Behaviour of the local backend: seconds per call (plus random jitter), the
+# share of calls failing or returning malformed JSON, and the random seed.
+TRANSLATION_LOCAL_BACKEND = {
+    "latency": float(os.getenv("TRANSLATION_LOCAL_LATENCY", "0.2")),
+    "jitter": float(os.getenv("TRANSLATION_LOCAL_JITTER", "0.1")),
+    "error_rate": float(os.getenv("TRANSLATION_LOCAL_ERROR_RATE", "0")),
+    "malformed_rate": float(os.getenv("TRANSLATION_LOCAL_MALFORMED_RATE", "0")),
+    "seed": int(os.getenv("TRANSLATION_LOCAL_SEED", "0")),
+}
+
+# CV content is sent to the translation API in chunks of at most this many
+# characters of JSON, up to TRANSLATION_CHUNK_CONCURRENCY at a time.
+TRANSLATION_CHUNK_MAX_CHARS = int(os.getenv("TRANSLATION_CHUNK_MAX_CHARS", "4000"))
+TRANSLATION_CHUNK_CONCURRENCY = int(os.getenv("TRANSLATION_CHUNK_CONCURRENCY", "4"))
+
+# Languages translated at the same time by a multi-language batch.
+TRANSLATION_BATCH_CONCURRENCY = int(os.getenv("TRANSLATION_BATCH_CONCURRENCY", "5"))
+
+# Seconds a CV translation job may run before another view starts a new one.
+TRANSLATION_JOB_TIMEOUT = int(os.getenv("TRANSLATION_JOB_TIMEOUT", "300"))
+
+# Translate a candidate's CV into every translating language in a Celery task
+# after its bio or projects change; edits within the delay share one job.
+TRANSLATION_PREWARM = os.getenv("TRANSLATION_PREWARM", "False") == "True"
+TRANSLATION_PREWARM_DELAY = int(os.getenv("TRANSLATION_PREWARM_DELAY", "30"))
+TRANSLATION_PREWARM_CONCURRENCY = int(os.getenv("TRANSLATION_PREWARM_CONCURRENCY", "4"))
+
+# Rendered CV PDFs are cached in PDF_CACHE_STORAGE (a Django storage class
+# created with PDF_CACHE_DIR as its location) and the least recently used
+# ones are evicted beyond PDF_CACHE_MAX_BYTES. Bump PDF_TEMPLATE_VERSION when
+# the PDF template or its styles change.
+PDF_CACHE_STORAGE = os.getenv(
+    "PDF_CACHE_STORAGE", "django.core.files.storage.FileSystemStorage"
+)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", str(BASE_DIR / "pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(500 * 1024**2)))
+PDF_TEMPLATE_VERSION = "2"
+# "" streams cached PDFs from Django; "x-accel-redirect" (nginx, with an
+# internal location at PDF_CACHE_SENDFILE_URL aliased to PDF_CACHE_DIR) or
+# "x-sendfile" (Apache, lighttpd) lets the web server send the file.
+PDF_CACHE_SENDFILE = os.getenv("PDF_CACHE_SENDFILE", "")
+PDF_CACHE_SENDFILE_URL = os.getenv("PDF_CACHE_SENDFILE_URL", "/protected/pdf/")
+
+# PDFs are laid out by PDF_RENDER_WORKERS warm WeasyPrint processes (0 renders
+# in the web process). A render may take PDF_RENDER_TIMEOUT seconds, at most
+# PDF_RENDER_QUEUE_SIZE renders wait for a worker, and workers are replaced
+# after PDF_RENDER_MAX_TASKS renders or beyond PDF_RENDER_MAX_RSS_MB.
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "60"))
+PDF_RENDER_QUEUE_SIZE = int(os.getenv("PDF_RENDER_QUEUE_SIZE", "20"))
+PDF_RENDER_MAX_TASKS = int(os.getenv("PDF_RENDER_MAX_TASKS", "200"))
+PDF_RENDER_MAX_RSS_MB = int(os.getenv("PDF_RENDER_MAX_RSS_MB", "500"))
+
+# Bulk CV exports render up to PDF_EXPORT_CONCURRENCY PDFs at a time; the API
+# exports at most PDF_EXPORT_MAX_CANDIDATES candidates per request.
+PDF_EXPORT_CONCURRENCY = int(os.getenv("PDF_EXPORT_CONCURRENCY", "4"))
+PDF_EXPORT_MAX_CANDIDATES = int(os.getenv("PDF_EXPORT_MAX_CANDIDATES", "500"))
+
+# Render a candidate's CV PDF (untranslated and in PDF_PRERENDER_LANGUAGES, a
+# comma-separated list) in a Celery task after their data changes; changes
+# within the delay share one job.
+PDF_PRERENDER = os.getenv("PDF_PRERENDER", "False") == "True"
+PDF_PRERENDER_DELAY = int(os.getenv("PDF_PRERENDER_DELAY", "30"))
+PDF_PRERENDER_LANGUAGES = [
+    language
+    for language in os.getenv("PDF_PRERENDER_LANGUAGES", "").split(",")
+    if language
+]
+
 # Email configuration settings
 
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND")
@@ -121,6 +212,122 @@ DATABASES = {
     }
 }
 
+# Caches
+# "translations" keeps recently served CV translations in process memory in
+# front of the CVTranslation table. "shared" holds the state every web and
+# Celery process must see, such as the marks of scheduled background jobs.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("SHARED_CACHE_URL", CELERY_BROKER_URL),
+        "KEY_PREFIX": "cvproject",
+    },
+    "translations": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "translations",
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "1000"))
+        },
+    },
+}
+
+# Audit request logging
+# AUDIT_SINK picks where RequestLoggingMiddleware sends records: "database"
+# (one INSERT per request), "buffered" (background batch writer), "jsonl"
+# (rotating compressed files), "redis" (stream drained by Celery) or a dotted
+# path to a custom sink class.
+
+AUDIT_SINK = os.getenv("AUDIT_SINK", "database")
+
+AUDIT_BUFFER_MAX_SIZE = int(os.getenv("AUDIT_BUFFER_MAX_SIZE", "10000"))
+AUDIT_BUFFER_BATCH_SIZE = int(os.getenv("AUDIT_BUFFER_BATCH_SIZE", "500"))
+AUDIT_BUFFER_FLUSH_INTERVAL = float(os.getenv("AUDIT_BUFFER_FLUSH_INTERVAL", "2"))
+# One of "drop", "block" or "spill"
+AUDIT_BUFFER_OVERFLOW_POLICY = os.getenv("AUDIT_BUFFER_OVERFLOW_POLICY", "drop")
+AUDIT_BUFFER_BLOCK_TIMEOUT = float(os.getenv("AUDIT_BUFFER_BLOCK_TIMEOUT", "1"))
+AUDIT_BUFFER_SPILL_PATH = os.getenv(
+    "AUDIT_BUFFER_SPILL_PATH", str(BASE_DIR / "audit_spill.jsonl")
+)
+
+AUDIT_JSONL_DIR = os.getenv("AUDIT_JSONL_DIR", str(BASE_DIR / "audit_logs"))
+AUDIT_JSONL_MAX_BYTES = int(os.getenv("AUDIT_JSONL_MAX_BYTES", str(50 * 1024**2)))
+
+AUDIT_REDIS_URL = os.getenv("AUDIT_REDIS_URL", CELERY_BROKER_URL)
+AUDIT_REDIS_STREAM = os.getenv("AUDIT_REDIS_STREAM", "audit:request_logs")
+AUDIT_REDIS_STREAM_MAX_LENGTH = int(
+    os.getenv("AUDIT_REDIS_STREAM_MAX_LENGTH", "1000000")
+)
+# Seconds the redis sink waits to connect to or hear back from Redis before
+# it drops the request log.
+AUDIT_REDIS_SOCKET_TIMEOUT = float(os.getenv("AUDIT_REDIS_SOCKET_TIMEOUT", "0.25"))
+AUDIT_REDIS_CONSUMER_GROUP = os.getenv("AUDIT_REDIS_CONSUMER_GROUP", "audit")
+AUDIT_REDIS_DRAIN_BATCH_SIZE = int(os.getenv("AUDIT_REDIS_DRAIN_BATCH_SIZE", "5000"))
+AUDIT_REDIS_DRAIN_MAX_BATCHES = int(os.getenv("AUDIT_REDIS_DRAIN_MAX_BATCHES", "20"))
+# Entries that failed to store this many times move to the dead-letter stream
+# (AUDIT_REDIS_STREAM + ":dead" unless set).
+AUDIT_REDIS_MAX_DELIVERIES = int(os.getenv("AUDIT_REDIS_MAX_DELIVERIES", "5"))
+AUDIT_REDIS_DEAD_LETTER_STREAM = os.getenv("AUDIT_REDIS_DEAD_LETTER_STREAM") or None
+
+# Monthly RequestLog partitions older than the retention window are dropped,
+# after being exported to AUDIT_ARCHIVE_DIR as gzipped CSV when it is set.
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "6"))
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "2"))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR") or None
+
+# Which requests get logged (see audit.policy). Excluded paths skip logging
+# entirely; the rest are sampled per path/method, except authenticated and
+# mutating requests, which are always kept.
+AUDIT_POLICY = {
+    "exclude": [
+        r"^/static/",
+        r"^/favicon\.ico$",
+        r"^/remove-message/$",
+        r"^/health",
+        r"^/audit/logs/live/stream/$",
+    ],
+    "sample": [
+        {"methods": ["HEAD", "OPTIONS"], "rate": 0},
+    ],
+    "default_rate": float(os.getenv("AUDIT_SAMPLE_RATE", "1")),
+    "always_log_authenticated": True,
+    "always_log_methods": ["POST", "PUT", "PATCH", "DELETE"],
+}
+
+# Web exports stream at most AUDIT_EXPORT_MAX_ROWS rows; the
+# export_audit_logs management command has no cap.
+AUDIT_EXPORT_MAX_ROWS = int(os.getenv("AUDIT_EXPORT_MAX_ROWS", "100000"))
+AUDIT_EXPORT_CHUNK_SIZE = int(os.getenv("AUDIT_EXPORT_CHUNK_SIZE", "2000"))
+
+# Live tail streams send a comment every HEARTBEAT seconds and are closed
+# (the browser reconnects) after MAX_SECONDS.
+AUDIT_LIVE_TAIL_HEARTBEAT = float(os.getenv("AUDIT_LIVE_TAIL_HEARTBEAT", "15"))
+AUDIT_LIVE_TAIL_MAX_SECONDS = float(os.getenv("AUDIT_LIVE_TAIL_MAX_SECONDS", "300"))
+
+AUDIT_ROLLUP_BATCH_SIZE = int(os.getenv("AUDIT_ROLLUP_BATCH_SIZE", "50000"))
+# Seconds after its insert a request log waits before it is rolled up, so rows
+# whose transaction commits late are not skipped by the id watermark.
+AUDIT_ROLLUP_LAG = int(os.getenv("AUDIT_ROLLUP_LAG", "60"))
+
+CELERY_BEAT_SCHEDULE = {
+    "maintain-request-log-partitions": {
+        "task": "audit.tasks.maintain_request_log_partitions",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "update-request-rollups": {
+        "task": "audit.tasks.update_request_rollups",
+        "schedule": float(os.getenv("AUDIT_ROLLUP_INTERVAL", "60")),
+    },
+}
+if AUDIT_SINK == "redis":
+    CELERY_BEAT_SCHEDULE["drain-request-log-stream"] = {
+        "task": "audit.tasks.drain_request_log_stream",
+        "schedule": float(os.getenv("AUDIT_REDIS_DRAIN_INTERVAL", "5")),
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -148,6 +355,11 @@ TIME_ZONE = "UTC"
 
 USE_I18N = True
 
+# Catalogs of the CV page labels, written by ``manage.py translate_ui_strings``.
+LOCALE_PATHS = [
+    BASE_DIR / "locale",
+]
+
 USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
@@ -43,6 +43,7 @@ from main.views.frontend_views import (
     cv_detail,
     cv_generate_pdf,
     cv_list,
+    cv_translation_status,
     send_cv_to_email,
     settings_page,
 )
@@ -96,6 +97,11 @@ admin_patterns = [
     ),
     path("", cv_list, name="cv_list"),
     path("cv/<int:pk>/", cv_detail, name="cv_detail"),
+    path(
+        "cv/<int:pk>/translation/<str:job_id>/",
+        cv_translation_status,
+        name="cv_translation_status",
+    ),
     path("cv/<int:pk>/download-pdf/", cv_generate_pdf, name="cv_generate_pdf"),
     path("cv/<int:pk>/send-pdf-email/", send_cv_to_email, name="send_cv_to_email"),
     path("cv/<int:pk>/", translate_cv_content, name="translate_cv_content"),
@@ -0,0 +1,240 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import (
+    InterfaceError,
+    OperationalError,
+    close_old_connections,
+    transaction,
+)
+
+from .live import notify_request_logs
+from .models import RequestLog
+from .records import deserialize_record, serialize_record, to_request_log
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP = "drop"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_SPILL = "spill"
+OVERFLOW_POLICIES = (OVERFLOW_DROP, OVERFLOW_BLOCK, OVERFLOW_SPILL)
+
+
+class BufferedRequestLogWriter:
+    """
+    Collects request log records in a bounded in-process queue and writes them
+    with ``bulk_create`` from a background thread, either once ``batch_size``
+    records are waiting or every ``flush_interval`` seconds.
+
+    When the queue is full the ``overflow_policy`` decides what happens to the
+    record: ``drop`` discards it, ``block`` waits up to ``block_timeout``
+    seconds for room (and drops it after that), ``spill`` appends it to a JSONL
+    file at ``spill_path`` which is loaded back on the next flush.
+    """
+
+    def __init__(
+        self,
+        max_queue_size=10000,
+        batch_size=500,
+        flush_interval=2.0,
+        overflow_policy=OVERFLOW_DROP,
+        block_timeout=1.0,
+        spill_path=None,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {overflow_policy!r}, "
+                f"expected one of {', '.join(OVERFLOW_POLICIES)}."
+            )
+        if overflow_policy == OVERFLOW_SPILL and not spill_path:
+            raise ValueError("The spill overflow policy requires a spill_path.")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.spill_path = spill_path
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._counters = {"queued": 0, "flushed": 0, "dropped": 0, "spilled": 0}
+        self._counters_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def counters(self):
+        with self._counters_lock:
+            counters = dict(self._counters)
+        counters["pending"] = self._queue.qsize()
+        return counters
+
+    def _count(self, name, amount=1):
+        with self._counters_lock:
+            self._counters[name] += amount
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="request-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def enqueue(self, record):
+        try:
+            if self.overflow_policy == OVERFLOW_BLOCK:
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self._handle_overflow([record])
+            return
+
+        self._count("queued")
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _handle_overflow(self, records):
+        if self.overflow_policy == OVERFLOW_SPILL:
+            try:
+                self._spill(records)
+                self._count("spilled", len(records))
+                return
+            except OSError as e:
+                logger.error(f"Failed to spill request logs to disk: {str(e)}")
+        self._count("dropped", len(records))
+
+    def _spill(self, records):
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as spill_file:
+                for record in records:
+                    spill_file.write(json.dumps(serialize_record(record)) + "\n")
+
+    def _read_spilled(self):
+        """Claim the spill file and return the records it held."""
+        if not self.spill_path:
+            return []
+        claimed_path = f"{self.spill_path}.flushing"
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return []
+            os.replace(self.spill_path, claimed_path)
+        with open(claimed_path, encoding="utf-8") as spill_file:
+            records = [deserialize_record(json.loads(line)) for line in spill_file]
+        os.remove(claimed_path)
+        return records
+
+    def _drain(self):
+        records = []
+        while len(records) < self.batch_size:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _write(self, records):
+        """
+        Write ``records`` in one batch; if that fails for another reason than
+        the database being unreachable, write them one by one so a bad record
+        is dropped alone instead of taking the batch with it.
+        """
+        try:
+            with transaction.atomic():
+                logs = RequestLog.objects.bulk_create(
+                    [to_request_log(record) for record in records],
+                    batch_size=self.batch_size,
+                )
+        except (InterfaceError, OperationalError) as e:
+            logger.error(f"Failed to write {len(records)} request logs: {str(e)}")
+            self._handle_overflow(records)
+            return
+        except Exception as e:
+            logger.error(f"Failed to write request log batch: {str(e)}")
+            logs = self._write_each(records)
+        else:
+            self._count("flushed", len(records))
+        notify_request_logs(logs)
+
+    def _write_each(self, records):
+        logs = []
+        for index, record in enumerate(records):
+            try:
+                with transaction.atomic():
+                    log = to_request_log(record)
+                    log.save()
+            except (InterfaceError, OperationalError) as e:
+                remaining = records[index:]
+                logger.error(f"Failed to write {len(remaining)} request logs: {str(e)}")
+                self._handle_overflow(remaining)
+                break
+            except Exception as e:
+                logger.error(
+                    f"Dropping request log of {record.get('path')!r}: {str(e)}"
+                )
+                self._count("dropped")
+                continue
+            logs.append(log)
+        self._count("flushed", len(logs))
+        return logs
+
+    def flush(self):
+        """Write everything queued so far, then anything spilled to disk."""
+        with self._flush_lock:
+            while True:
+                records = self._drain()
+                if not records:
+                    break
+                self._write(records)
+
+            spilled = self._read_spilled()
+            for start in range(0, len(spilled), self.batch_size):
+                end = start + self.batch_size
+                self._write(spilled[start:end])
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Request log flush failed: {str(e)}", exc_info=True)
+
+    def shutdown(self, timeout=5.0):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_request_log_writer():
+    """Return the process-wide writer, creating and starting it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BufferedRequestLogWriter(
+                max_queue_size=settings.AUDIT_BUFFER_MAX_SIZE,
+                batch_size=settings.AUDIT_BUFFER_BATCH_SIZE,
+                flush_interval=settings.AUDIT_BUFFER_FLUSH_INTERVAL,
+                overflow_policy=settings.AUDIT_BUFFER_OVERFLOW_POLICY,
+                block_timeout=settings.AUDIT_BUFFER_BLOCK_TIMEOUT,
+                spill_path=settings.AUDIT_BUFFER_SPILL_PATH,
+            )
+            _writer.start()
+        return _writer
@@ -0,0 +1,73 @@
+"""
+Interning of repeated RequestLog strings (paths, user agents) into small
+lookup tables, so log rows carry an integer id instead of the text.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.db import connections, models, transaction
+
+
+class DimensionManager(models.Manager):
+    """
+    Maps distinct values to their row id, creating rows on first sight.
+
+    Resolved ids are kept in a per-process LRU of ``cache_size`` entries, so
+    in the steady state ``get_id`` costs no query. An id is only cached once
+    the row is known to be committed; inside a transaction that happens on
+    commit, so a rollback cannot leave the cache pointing at a missing row.
+    """
+
+    def __init__(self, cache_size=4096):
+        super().__init__()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _remember(self, value, pk):
+        with self._lock:
+            self._cache[value] = pk
+            self._cache.move_to_end(value)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _resolve(self, value):
+        lookup = self.model.lookup_for(value)
+        pk = self.filter(**lookup).values_list("pk", flat=True).first()
+        if pk is None:
+            # Another process may insert the same value concurrently.
+            self.bulk_create(
+                [self.model(**{"value": value, **lookup})], ignore_conflicts=True
+            )
+            pk = self.filter(**lookup).values_list("pk", flat=True).get()
+        return pk
+
+    def get_id(self, value):
+        """Return the id of ``value``, or None for an empty value."""
+        if not value:
+            return None
+        with self._lock:
+            pk = self._cache.get(value)
+            if pk is not None:
+                self._cache.move_to_end(value)
+                return pk
+
+        pk = self._resolve(value)
+        if connections[self.db].in_atomic_block:
+            transaction.on_commit(lambda: self._remember(value, pk), using=self.db)
+        else:
+            self._remember(value, pk)
+        return pk
+
+
+def clear_dimension_caches(**kwargs):
+    """Forget every cached id, e.g. after the tables were flushed."""
+    from .models import RequestPath, UserAgent
+
+    RequestPath.objects.clear_cache()
+    UserAgent.objects.clear_cache()
@@ -0,0 +1,77 @@
+"""
+Streaming exports of RequestLog rows as CSV or newline-delimited JSON.
+
+Rows are read through a server-side cursor (``QuerySet.iterator``) and
+encoded one at a time, so memory use does not grow with the export size.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# (column name, lookup) pairs; paths, user agents and users are exported as
+# their text values rather than ids.
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("timestamp", "timestamp"),
+    ("method", "method"),
+    ("path", "path__value"),
+    ("query_string", "query_string"),
+    ("remote_ip", "remote_ip"),
+    ("user_agent", "user_agent__value"),
+    ("user", "user__username"),
+    ("status_code", "status_code"),
+    ("response_size", "response_size"),
+    ("duration_ms", "duration_ms"),
+    ("db_query_count", "db_query_count"),
+    ("db_time_ms", "db_time_ms"),
+)
+
+
+class Echo:
+    """File-like object whose ``write`` just returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=2000, max_rows=None):
+    """Yield the export columns of ``queryset``, oldest first."""
+    queryset = queryset.order_by("timestamp", "id").values_list(
+        *[lookup for _, lookup in EXPORT_COLUMNS]
+    )
+    if max_rows is not None:
+        queryset = queryset[:max_rows]
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+ENCODERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+}
+
+
+def iter_export(queryset, export_format, chunk_size=2000, max_rows=None):
+    """Yield the encoded lines of an export in ``export_format``."""
+    return ENCODERS[export_format](
+        export_rows(queryset, chunk_size=chunk_size, max_rows=max_rows)
+    )
@@ -0,0 +1,47 @@
+from django import forms
+
+from .queries import decode_cursor
+
+
+class RequestLogFilterForm(forms.Form):
+    user = forms.CharField(required=False, label="User")
+    method = forms.ChoiceField(
+        required=False,
+        label="Method",
+        choices=[
+            ("", "Any method"),
+            *[
+                (method, method)
+                for method in ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD")
+            ],
+        ],
+    )
+    path = forms.CharField(required=False, label="Path prefix")
+    remote_ip = forms.GenericIPAddressField(required=False, label="IP")
+    since = forms.DateTimeField(
+        required=False,
+        label="From",
+        widget=forms.DateTimeInput(attrs={"type": "datetime-local"}),
+    )
+    until = forms.DateTimeField(
+        required=False,
+        label="To",
+        widget=forms.DateTimeInput(attrs={"type": "datetime-local"}),
+    )
+    cursor = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean_cursor(self):
+        value = self.cleaned_data["cursor"]
+        if not value:
+            return None
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise forms.ValidationError("Invalid page cursor.")
+
+
+class LatencyFilterForm(forms.Form):
+    hours = forms.IntegerField(
+        required=False, min_value=1, max_value=24 * 90, label="Last hours"
+    )
+    path = forms.CharField(required=False, label="Path prefix")
@@ -0,0 +1,243 @@
+"""
+Live feed of new RequestLog rows for the audit tail view.
+
+The code writing RequestLog rows (the sinks, the batch writer and the Redis
+stream drain) hands them to ``notify_request_logs`` once stored, which sends
+the whole batch as JSON arrays through ``pg_notify`` on ``CHANNEL``, at most
+``MAX_PAYLOAD_BYTES`` each. Nothing is sent while no live tail listens
+anywhere: listening connections carry ``LISTENER_APPLICATION_NAME``, and
+``pg_stat_activity`` is checked for one at most every
+``LISTENER_CHECK_INTERVAL`` seconds per process.
+
+Each process keeps a single LISTEN connection, owned by a background thread,
+and fans the rows out to the queues of the connected viewers, so N open tails
+cost one database subscription. The thread is started by the first
+subscriber and stops soon after the last one leaves.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+from .models import RequestPath
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "audit_request_log"
+LISTENER_APPLICATION_NAME = "audit-live-tail"
+LISTENER_CHECK_INTERVAL = 5.0
+# PostgreSQL refuses notification payloads of 8000 bytes or more.
+MAX_PAYLOAD_BYTES = 7900
+
+
+class Subscription:
+    """A viewer's queue of payloads; new ones are dropped while it is full."""
+
+    def __init__(self, max_size=100):
+        self._queue = queue.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def put(self, payload):
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        """Return the next payload, or None after ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """Subscription read from an event loop (ASGI); ``put`` is thread-safe."""
+
+    def __init__(self, max_size=100):
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def _put(self, payload):
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def put(self, payload):
+        self.loop.call_soon_threadsafe(self._put, payload)
+
+    async def get(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RequestLogBroadcaster:
+    def __init__(self, channel=CHANNEL, using="default", reconnect_delay=5.0):
+        self.channel = channel
+        self.using = using
+        self.reconnect_delay = reconnect_delay
+        self.listening = threading.Event()
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, subscription):
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, payload):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(payload)
+
+    def _start(self):
+        self.listening.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="request-log-listener", daemon=True
+        )
+        self._thread.start()
+
+    def _has_subscribers(self):
+        with self._lock:
+            return bool(self._subscribers)
+
+    def _listen(self):
+        wrapper = connections[self.using]
+        listener = wrapper.get_new_connection(
+            {
+                **wrapper.get_connection_params(),
+                "application_name": LISTENER_APPLICATION_NAME,
+            }
+        )
+        try:
+            listener.autocommit = True
+            listener.execute(f'LISTEN "{self.channel}"')
+            self.listening.set()
+            while self._has_subscribers():
+                for notify in listener.notifies(timeout=1.0):
+                    for row in json.loads(notify.payload):
+                        self.publish(json.dumps(row))
+        finally:
+            self.listening.clear()
+            listener.close()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Request log listener failed: {str(e)}")
+                time.sleep(self.reconnect_delay)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_request_log_broadcaster():
+    """Return the process-wide broadcaster."""
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            _broadcaster = RequestLogBroadcaster()
+        return _broadcaster
+
+
+_listeners_checked_at = None
+_listeners_found = False
+
+
+def has_listeners(using="default"):
+    """Whether a live tail listens on ``CHANNEL`` in any process."""
+    global _listeners_checked_at, _listeners_found
+    if get_request_log_broadcaster()._has_subscribers():
+        return True
+    now = time.monotonic()
+    if (
+        _listeners_checked_at is None
+        or now - _listeners_checked_at >= LISTENER_CHECK_INTERVAL
+    ):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_stat_activity "
+                "WHERE application_name = %s)",
+                [LISTENER_APPLICATION_NAME],
+            )
+            _listeners_found = cursor.fetchone()[0]
+        _listeners_checked_at = now
+    return _listeners_found
+
+
+def _payloads(rows):
+    """Split ``rows`` into JSON arrays that fit in a notification."""
+    chunk, size = [], 2
+    for row in rows:
+        encoded = json.dumps(row, cls=DjangoJSONEncoder)
+        if chunk and size + len(encoded.encode()) + 1 > MAX_PAYLOAD_BYTES:
+            yield f"[{','.join(chunk)}]"
+            chunk, size = [], 2
+        chunk.append(encoded)
+        size += len(encoded.encode()) + 1
+    if chunk:
+        yield f"[{','.join(chunk)}]"
+
+
+def notify_request_logs(logs, using="default"):
+    """
+    Send the stored RequestLog rows ``logs`` to the live tails, with the
+    path and username resolved so listeners never query for them.
+    Notifications are only delivered once the surrounding transaction commits.
+    """
+    connection = connections[using]
+    if not logs or connection.vendor != "postgresql":
+        return
+    try:
+        if not has_listeners(using):
+            return
+        paths = RequestPath.objects.in_bulk({log.path_id for log in logs})
+        usernames = dict(
+            User.objects.filter(
+                pk__in={log.user_id for log in logs if log.user_id}
+            ).values_list("pk", "username")
+        )
+        rows = [
+            {
+                "id": log.pk,
+                "timestamp": log.timestamp,
+                "method": log.method,
+                "path": paths[log.path_id].value,
+                "user": usernames.get(log.user_id),
+                "remote_ip": log.remote_ip,
+                "status_code": log.status_code,
+                "duration_ms": log.duration_ms,
+            }
+            for log in logs
+        ]
+        with connection.cursor() as cursor:
+            for payload in _payloads(rows):
+                cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+    except Exception as e:
+        logger.error(f"Failed to notify live tails of request logs: {str(e)}")
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.export import EXPORT_FORMATS, iter_export
+from audit.forms import RequestLogFilterForm
+from audit.queries import filter_request_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream request logs matching the log browser filters to a file or "
+        "stdout as CSV or NDJSON, oldest first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=list(EXPORT_FORMATS), default="csv", dest="format"
+        )
+        parser.add_argument(
+            "--output", help="File to write to (defaults to standard output)."
+        )
+        parser.add_argument("--user", help="Username.")
+        parser.add_argument("--method", help="HTTP method.")
+        parser.add_argument("--path", help="Path prefix.")
+        parser.add_argument("--remote-ip", help="Client IP address.")
+        parser.add_argument("--since", help="Earliest timestamp (inclusive).")
+        parser.add_argument("--until", help="Latest timestamp (exclusive).")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.AUDIT_EXPORT_CHUNK_SIZE,
+            help="Rows fetched from the database cursor at a time.",
+        )
+        parser.add_argument("--limit", type=int, help="Stop after this many rows.")
+
+    def handle(self, *args, **options):
+        form = RequestLogFilterForm(
+            {
+                field: options[field]
+                for field in ("user", "method", "path", "remote_ip", "since", "until")
+                if options[field]
+            }
+        )
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+
+        lines = iter_export(
+            filter_request_logs(form.cleaned_data),
+            options["format"],
+            chunk_size=options["chunk_size"],
+            max_rows=options["limit"],
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
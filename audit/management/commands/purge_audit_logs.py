@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from audit.partitions import ensure_partitions, purge_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop (or archive and drop) RequestLog partitions older than the "
+        "retention window and create the partitions for the coming months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.AUDIT_RETENTION_MONTHS,
+            help="Number of full months of request logs to keep.",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.AUDIT_ARCHIVE_DIR,
+            help="Export each expired partition to this directory before dropping.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the partitions that would be removed.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dry_run"]:
+            for name in ensure_partitions(
+                months_ahead=settings.AUDIT_PARTITION_MONTHS_AHEAD
+            ):
+                self.stdout.write(f"Created partition {name}")
+
+        purged = purge_partitions(
+            options["retention_months"],
+            archive_dir=options["archive_dir"],
+            dry_run=options["dry_run"],
+        )
+        action = "Would drop" if options["dry_run"] else "Dropped"
+        for name in purged:
+            self.stdout.write(f"{action} partition {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {len(purged)} expired partition(s).")
+        )
@@ -1,29 +1,33 @@
-from .models import RequestLog
+import time
+
+from django.db import connection
+
+from .policy import get_request_log_policy
+from .records import build_log_record
+from .sinks import get_request_log_sink
+from .timing import QueryTimer
 
 
 class RequestLoggingMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.sink = get_request_log_sink()
+        self.policy = get_request_log_policy()
 
     def __call__(self, request):
-        response = self.get_response(request)
+        if self.policy.is_excluded(request.path):
+            return self.get_response(request)
+
+        query_timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(query_timer):
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - started) * 1000
 
-        self.log_request(request)
+        if self.policy.should_log(request):
+            self.log_request(request, response, duration_ms, query_timer)
 
         return response
 
-    def log_request(self, request):
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0]
-        else:
-            ip = request.META.get("REMOTE_ADDR")
-
-        RequestLog.objects.create(
-            method=request.method,
-            path=request.path,
-            query_string=request.META.get("QUERY_STRING", ""),
-            remote_ip=ip,
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            user=request.user if request.user.is_authenticated else None,
-        )
+    def log_request(self, request, response, duration_ms, query_timer):
+        self.sink.write(build_log_record(request, response, duration_ms, query_timer))
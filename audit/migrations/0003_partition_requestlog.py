@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+# The partitioning as it was when this migration was written; later changes
+# to audit.partitions must not change what the migration does.
+TABLE = "audit_requestlog"
+OLD_TABLE = f"{TABLE}_unpartitioned"
+DEFAULT_PARTITION = f"{TABLE}_default"
+MONTHS_AHEAD = 2
+
+
+def _month_index(value):
+    return value.year * 12 + value.month - 1
+
+
+def _month(index):
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _create_partitions(cursor, first_month, last_month):
+    """Create a partition for every month from ``first_month`` to ``last_month``."""
+    for index in range(_month_index(first_month), _month_index(last_month) + 1):
+        start, end = _month(index), _month(index + 1)
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}_p{start:%Y_%m}" PARTITION OF "{TABLE}" '
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [start.isoformat(), end.isoformat()],
+        )
+
+
+def _finish_table(cursor, primary_key):
+    """Recreate the keys, the user index and the id sequence on TABLE."""
+    cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY ({primary_key})')
+    cursor.execute(
+        f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_user_id_fk_auth_user_id" '
+        f'FOREIGN KEY ("user_id") REFERENCES "auth_user" ("id") '
+        f"DEFERRABLE INITIALLY DEFERRED"
+    )
+    cursor.execute(f'CREATE INDEX "{TABLE}_user_id_idx" ON "{TABLE}" ("user_id")')
+    cursor.execute(f'CREATE SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}"."id"')
+    cursor.execute(
+        f"SELECT setval('\"{TABLE}_id_seq\"', "
+        f'COALESCE((SELECT MAX("id") FROM "{TABLE}"), 0) + 1, false)'
+    )
+    cursor.execute(
+        f'ALTER TABLE "{TABLE}" ALTER COLUMN "id" '
+        f"SET DEFAULT nextval('\"{TABLE}_id_seq\"')"
+    )
+
+
+def partition_request_log(apps, schema_editor):
+    """
+    Swap the plain RequestLog table for one range-partitioned by month.
+
+    PostgreSQL requires the partition key in every unique constraint, so the
+    primary key becomes ``(id, timestamp)``; ``id`` stays unique through its
+    sequence and Django keeps using it as the model's primary key.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD_TABLE}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{OLD_TABLE}") '
+            f'PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(
+            f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT'
+        )
+        cursor.execute(f'SELECT MIN("timestamp") FROM "{OLD_TABLE}"')
+        oldest = cursor.fetchone()[0]
+        now = datetime.now(timezone.utc)
+        last_month = _month(_month_index(now) + MONTHS_AHEAD)
+        _create_partitions(cursor, min(oldest or now, now), last_month)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{OLD_TABLE}"')
+        cursor.execute(f'DROP TABLE "{OLD_TABLE}"')
+        _finish_table(cursor, '"id", "timestamp"')
+
+
+def unpartition_request_log(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD_TABLE}"')
+        cursor.execute(f'CREATE TABLE "{TABLE}" (LIKE "{OLD_TABLE}")')
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{OLD_TABLE}"')
+        cursor.execute(f'DROP TABLE "{OLD_TABLE}"')
+        _finish_table(cursor, '"id"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0002_alter_requestlog_timestamp"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_request_log, unpartition_request_log),
+        migrations.AddIndex(
+            model_name="requestlog",
+            index=models.Index(fields=["timestamp"], name="audit_reqlog_ts_idx"),
+        ),
+    ]
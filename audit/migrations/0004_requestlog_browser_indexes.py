@@ -0,0 +1,77 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:11
+
+import warnings
+
+from django.db import migrations, models
+
+TRIGRAM_INDEX = "audit_reqlog_path_trgm_idx"
+
+
+def create_path_trigram_index(apps, schema_editor):
+    """
+    Index ``path`` with pg_trgm so prefix (and substring) filters avoid a scan.
+
+    pg_trgm ships with PostgreSQL's contrib package; on servers without it the
+    index is skipped and path filters fall back to the timestamp index.
+    Migration 0007 moves the index to ``audit_requestpath.value`` along with
+    the paths.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            warnings.warn("pg_trgm is not available, skipping the path index.")
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{TRIGRAM_INDEX}" '
+            f'ON "audit_requestlog" USING gin ("path" gin_trgm_ops)'
+        )
+
+
+def drop_path_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP INDEX IF EXISTS "{TRIGRAM_INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_partition_requestlog"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="requestlog",
+            name="audit_reqlog_ts_idx",
+        ),
+        migrations.AddIndex(
+            model_name="requestlog",
+            index=models.Index(
+                fields=["timestamp", "id"], name="audit_reqlog_ts_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requestlog",
+            index=models.Index(
+                fields=["user", "timestamp", "id"], name="audit_reqlog_user_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requestlog",
+            index=models.Index(
+                fields=["method", "timestamp", "id"], name="audit_reqlog_method_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requestlog",
+            index=models.Index(
+                fields=["remote_ip", "timestamp", "id"], name="audit_reqlog_ip_ts_idx"
+            ),
+        ),
+        migrations.RunPython(create_path_trigram_index, drop_path_trigram_index),
+    ]
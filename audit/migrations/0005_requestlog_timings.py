@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_requestlog_browser_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="requestlog",
+            name="db_query_count",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="requestlog",
+            name="db_time_ms",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="requestlog",
+            name="duration_ms",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="requestlog",
+            name="response_size",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="requestlog",
+            name="status_code",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
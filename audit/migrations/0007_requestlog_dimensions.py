@@ -0,0 +1,176 @@
+import warnings
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+LOG_TRIGRAM_INDEX = "audit_reqlog_path_trgm_idx"
+PATH_TRIGRAM_INDEX = "audit_reqpath_value_trgm_idx"
+
+
+def intern_values(apps, schema_editor):
+    """
+    Point every RequestLog row at the RequestPath/UserAgent for its text: one
+    INSERT ... SELECT DISTINCT per lookup table, then one joined UPDATE.
+    """
+    schema_editor.execute(
+        'INSERT INTO "audit_requestpath" ("value") '
+        'SELECT DISTINCT "path" FROM "audit_requestlog"'
+    )
+    schema_editor.execute(
+        'UPDATE "audit_requestlog" r SET "path_ref_id" = p."id" '
+        'FROM "audit_requestpath" p WHERE p."value" = r."path"'
+    )
+    schema_editor.execute(
+        """
+        INSERT INTO "audit_useragent" ("value", "digest")
+        SELECT "user_agent", encode(sha256(convert_to("user_agent", 'UTF8')), 'hex')
+        FROM (SELECT DISTINCT "user_agent" FROM "audit_requestlog"
+              WHERE "user_agent" IS NOT NULL AND "user_agent" <> '') agents
+        """
+    )
+    schema_editor.execute(
+        'UPDATE "audit_requestlog" r SET "user_agent_ref_id" = ua."id" '
+        'FROM "audit_useragent" ua WHERE ua."value" = r."user_agent"'
+    )
+
+    # Check the deferred foreign keys now, PostgreSQL refuses the ALTER TABLEs
+    # that follow while trigger events are pending.
+    schema_editor.connection.check_constraints()
+
+
+def restore_values(apps, schema_editor):
+    schema_editor.execute(
+        'UPDATE "audit_requestlog" r SET "path" = p."value" '
+        'FROM "audit_requestpath" p WHERE p."id" = r."path_ref_id"'
+    )
+    schema_editor.execute(
+        'UPDATE "audit_requestlog" r SET "user_agent" = ua."value" '
+        'FROM "audit_useragent" ua WHERE ua."id" = r."user_agent_ref_id"'
+    )
+    schema_editor.connection.check_constraints()
+
+
+def _create_trigram_index(schema_editor, name, table, column):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            warnings.warn("pg_trgm is not installed, skipping the path index.")
+            return
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" '
+            f'ON "{table}" USING gin ("{column}" gin_trgm_ops)'
+        )
+
+
+def move_path_trigram_index(apps, schema_editor):
+    """
+    Recreate the pg_trgm index of 0004 on the interned paths, as dropping the
+    ``path`` column drops it; prefix filters also have the
+    ``varchar_pattern_ops`` index Django adds for the unique ``value``.
+    """
+    _create_trigram_index(
+        schema_editor, PATH_TRIGRAM_INDEX, "audit_requestpath", "value"
+    )
+
+
+def restore_path_trigram_index(apps, schema_editor):
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{PATH_TRIGRAM_INDEX}"')
+    _create_trigram_index(schema_editor, LOG_TRIGRAM_INDEX, "audit_requestlog", "path")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0006_requestrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestPath",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("value", models.CharField(max_length=200, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UserAgent",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("value", models.TextField()),
+                ("digest", models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="requestlog",
+            name="path_ref",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="audit.requestpath",
+            ),
+        ),
+        migrations.AddField(
+            model_name="requestlog",
+            name="user_agent_ref",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="audit.useragent",
+            ),
+        ),
+        # Nullable before removal, so that unapplying re-adds it as a column
+        # restore_values can fill in before the NOT NULL comes back.
+        migrations.AlterField(
+            model_name="requestlog",
+            name="path",
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.RunPython(intern_values, restore_values),
+        migrations.RunPython(move_path_trigram_index, restore_path_trigram_index),
+        migrations.RemoveField(
+            model_name="requestlog",
+            name="path",
+        ),
+        migrations.RemoveField(
+            model_name="requestlog",
+            name="user_agent",
+        ),
+        migrations.RenameField(
+            model_name="requestlog",
+            old_name="path_ref",
+            new_name="path",
+        ),
+        migrations.RenameField(
+            model_name="requestlog",
+            old_name="user_agent_ref",
+            new_name="user_agent",
+        ),
+        migrations.AlterField(
+            model_name="requestlog",
+            name="path",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="request_logs",
+                to="audit.requestpath",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="requestlog",
+            name="user_agent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="request_logs",
+                to="audit.useragent",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requestlog",
+            index=models.Index(
+                fields=["path", "timestamp", "id"], name="audit_reqlog_path_ts_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+CHANNEL = "audit_request_log"
+FUNCTION = "audit_requestlog_notify"
+TRIGGER = "audit_requestlog_notify_trg"
+
+
+def create_notify_trigger(apps, schema_editor):
+    """
+    NOTIFY every inserted RequestLog row on CHANNEL for the live tail.
+
+    The payload carries the display fields with the path and username
+    resolved, so listeners never query for them. Notifications are only
+    delivered on commit.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION "{FUNCTION}"() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{CHANNEL}', json_build_object(
+                'id', NEW."id",
+                'timestamp', NEW."timestamp",
+                'method', NEW."method",
+                'path', (SELECT "value" FROM "audit_requestpath"
+                         WHERE "id" = NEW."path_id"),
+                'user', (SELECT "username" FROM "auth_user"
+                         WHERE "id" = NEW."user_id"),
+                'remote_ip', NEW."remote_ip",
+                'status_code', NEW."status_code",
+                'duration_ms', NEW."duration_ms"
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER "{TRIGGER}" AFTER INSERT ON "audit_requestlog" '
+        f'FOR EACH ROW EXECUTE FUNCTION "{FUNCTION}"()'
+    )
+
+
+def drop_notify_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f'DROP TRIGGER IF EXISTS "{TRIGGER}" ON "audit_requestlog"')
+    schema_editor.execute(f'DROP FUNCTION IF EXISTS "{FUNCTION}"()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0007_requestlog_dimensions"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_notify_trigger, drop_notify_trigger),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:30
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+def merge_anonymous_buckets(apps, schema_editor):
+    """Fold duplicate anonymous rollups, which the old constraint allowed."""
+    RequestRollup = apps.get_model("audit", "RequestRollup")
+    buckets = {}
+    for rollup in RequestRollup.objects.filter(user__isnull=True).order_by("id"):
+        key = (rollup.minute, rollup.method, rollup.path, rollup.status_class)
+        kept = buckets.setdefault(key, rollup)
+        if kept is rollup:
+            continue
+        kept.requests += rollup.requests
+        kept.timed_requests += rollup.timed_requests
+        kept.duration_sum_ms += rollup.duration_sum_ms
+        kept.latency_histogram = [
+            total + count
+            for total, count in zip(kept.latency_histogram, rollup.latency_histogram)
+        ]
+        kept.save()
+        rollup.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0008_requestlog_notify_trigger"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="requestrollup",
+            name="audit_rollup_unique_bucket",
+        ),
+        migrations.RunPython(merge_anonymous_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="requestrollup",
+            constraint=models.UniqueConstraint(
+                models.F("minute"),
+                models.F("method"),
+                models.F("path"),
+                models.F("status_class"),
+                django.db.models.functions.comparison.Coalesce("user", 0),
+                name="audit_rollup_unique_bucket",
+            ),
+        ),
+    ]
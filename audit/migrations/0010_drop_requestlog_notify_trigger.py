@@ -0,0 +1,26 @@
+from django.db import migrations
+
+FUNCTION = "audit_requestlog_notify"
+TRIGGER = "audit_requestlog_notify_trg"
+
+
+def drop_notify_trigger(apps, schema_editor):
+    """
+    Live tails are now notified by the code writing the rows, once per batch
+    and only while someone listens (see audit.live), instead of per row.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f'DROP TRIGGER IF EXISTS "{TRIGGER}" ON "audit_requestlog"')
+    schema_editor.execute(f'DROP FUNCTION IF EXISTS "{FUNCTION}"()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0009_requestrollup_unique_anonymous_bucket"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_notify_trigger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Add the insert time the rollups measure their safety lag on. The column
+    default is added in SQL, as the model default is the expression ``Now()``
+    which Django cannot write into ALTER TABLE; it also stamps rows inserted
+    outside the ORM.
+    """
+
+    dependencies = [
+        ("audit", "0010_drop_requestlog_notify_trigger"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE "audit_requestlog" ADD COLUMN "created_at" '
+                    "timestamp with time zone NOT NULL DEFAULT now()",
+                    'ALTER TABLE "audit_requestlog" DROP COLUMN "created_at"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name="requestlog",
+                    name="created_at",
+                    field=models.DateTimeField(
+                        default=django.db.models.functions.datetime.Now,
+                        editable=False,
+                    ),
+                ),
+            ],
+        ),
+    ]
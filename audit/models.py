@@ -1,13 +1,66 @@
+import hashlib
+
 from django.db import models
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+
+from .dimensions import DimensionManager
+
+
+class RequestPath(models.Model):
+    """A distinct request path referenced by RequestLog rows."""
+
+    id = models.AutoField(primary_key=True)
+    value = models.CharField(max_length=200, unique=True)
+
+    objects = DimensionManager()
+
+    @staticmethod
+    def lookup_for(value):
+        return {"value": value}
+
+    def __str__(self):
+        return self.value
+
+
+class UserAgent(models.Model):
+    """
+    A distinct User-Agent header. Agents can be longer than a btree entry
+    allows, so uniqueness is enforced on their SHA-256 digest.
+    """
+
+    id = models.AutoField(primary_key=True)
+    value = models.TextField()
+    digest = models.CharField(max_length=64, unique=True)
+
+    objects = DimensionManager()
+
+    @staticmethod
+    def lookup_for(value):
+        return {"digest": hashlib.sha256(value.encode()).hexdigest()}
+
+    def __str__(self):
+        return self.value
 
 
 class RequestLog(models.Model):
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+    # When the row was inserted, by the database's clock: buffered, spilled
+    # and streamed records arrive long after their request ``timestamp``.
+    created_at = models.DateTimeField(default=Now, editable=False)
     method = models.CharField(max_length=10)
-    path = models.CharField(max_length=200)
+    path = models.ForeignKey(
+        RequestPath, on_delete=models.PROTECT, related_name="request_logs"
+    )
     query_string = models.TextField(blank=True, null=True)
     remote_ip = models.GenericIPAddressField(null=True, blank=True)
-    user_agent = models.TextField(blank=True, null=True)
+    user_agent = models.ForeignKey(
+        UserAgent,
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name="request_logs",
+    )
     user = models.ForeignKey(
         "auth.User",
         null=True,
@@ -15,6 +68,77 @@ class RequestLog(models.Model):
         on_delete=models.SET_NULL,
         related_name="request_logs",
     )
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_size = models.PositiveBigIntegerField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    db_query_count = models.PositiveIntegerField(null=True, blank=True)
+    db_time_ms = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        # Every index ends in (timestamp, id) so the keyset pages of the log
+        # browser stay index range scans under each filter.
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="audit_reqlog_ts_id_idx"),
+            models.Index(
+                fields=["user", "timestamp", "id"], name="audit_reqlog_user_ts_idx"
+            ),
+            models.Index(
+                fields=["method", "timestamp", "id"], name="audit_reqlog_method_ts_idx"
+            ),
+            models.Index(
+                fields=["remote_ip", "timestamp", "id"], name="audit_reqlog_ip_ts_idx"
+            ),
+            models.Index(
+                fields=["path", "timestamp", "id"], name="audit_reqlog_path_ts_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.method} {self.path} ({self.timestamp})"
+
+
+class RequestRollup(models.Model):
+    """Request counts and latency for one minute of one kind of request."""
+
+    minute = models.DateTimeField()
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=200)
+    # First digit of the status code (2 for 2xx ...), 0 when it is unknown.
+    status_class = models.PositiveSmallIntegerField(default=0)
+    user = models.ForeignKey(
+        "auth.User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="request_rollups",
+    )
+    requests = models.PositiveIntegerField(default=0)
+    timed_requests = models.PositiveIntegerField(default=0)
+    duration_sum_ms = models.FloatField(default=0)
+    latency_histogram = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            # Coalesced so anonymous (NULL user) buckets are unique too.
+            models.UniqueConstraint(
+                "minute",
+                "method",
+                "path",
+                "status_class",
+                Coalesce("user", 0),
+                name="audit_rollup_unique_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.minute} {self.method} {self.path} ({self.requests})"
+
+
+class RollupWatermark(models.Model):
+    """Highest RequestLog id already counted into the rollups."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_id}"
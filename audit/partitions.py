@@ -0,0 +1,181 @@
+"""
+Monthly range partitions for the RequestLog table (PostgreSQL only).
+
+The table is partitioned by ``timestamp`` (see migration 0003). Each month
+lives in its own ``audit_requestlog_pYYYY_MM`` partition, with a default
+partition catching rows no monthly partition covers yet, so expiring a month
+is a partition drop instead of a large DELETE.
+"""
+
+import csv
+import gzip
+import os
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connection, transaction
+
+TABLE = "audit_requestlog"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME_RE = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat()
+
+
+def is_partitioned(using_connection=connection):
+    if using_connection.vendor != "postgresql":
+        return False
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(using_connection=connection):
+    """Return ``(month, name)`` for every monthly partition, oldest first."""
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            partitions.append((date(int(match[1]), int(match[2]), 1), name))
+    return sorted(partitions)
+
+
+def create_partition(month, using_connection=connection):
+    """
+    Create the partition for ``month`` unless it exists.
+
+    Rows for that month that already landed in the default partition are moved
+    into the new table before it is attached, since PostgreSQL refuses to
+    attach a partition whose range the default partition still holds rows for.
+    """
+    name = partition_name(month)
+    start, end = _bound(month), _bound(add_months(month, 1))
+    with transaction.atomic(using=using_connection.alias):
+        with using_connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            if cursor.fetchone()[0] is not None:
+                return False
+            cursor.execute(
+                f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING CONSTRAINTS)'
+            )
+            cursor.execute("SELECT to_regclass(%s)", [DEFAULT_PARTITION])
+            if cursor.fetchone()[0] is not None:
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+                    f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+                    f'INSERT INTO "{name}" SELECT * FROM moved',
+                    [start, end],
+                )
+            cursor.execute(
+                f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" '
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+    return True
+
+
+def ensure_partitions(months_ahead=2, today=None, using_connection=connection):
+    """Make sure partitions exist for this month and ``months_ahead`` after it."""
+    current = month_start(today or datetime.now(timezone.utc))
+    return [
+        partition_name(add_months(current, offset))
+        for offset in range(months_ahead + 1)
+        if create_partition(add_months(current, offset), using_connection)
+    ]
+
+
+def _archive_partition(name, archive_dir, using_connection):
+    os.makedirs(archive_dir, exist_ok=True)
+    archive_path = os.path.join(archive_dir, f"{name}.csv.gz")
+    with using_connection.cursor() as cursor:
+        # Paths and user agents are written out as text so the archive stands
+        # on its own once the lookup tables have moved on.
+        cursor.execute(
+            f'SELECT l.*, p."value" AS "path", ua."value" AS "user_agent" '
+            f'FROM "{name}" l JOIN "audit_requestpath" p ON p."id" = l."path_id" '
+            f'LEFT JOIN "audit_useragent" ua ON ua."id" = l."user_agent_id" '
+            f'ORDER BY l."timestamp", l."id"'
+        )
+        columns = [column[0] for column in cursor.description]
+        with gzip.open(archive_path, "wt", encoding="utf-8", newline="") as archive:
+            writer = csv.writer(archive)
+            writer.writerow(columns)
+            while rows := cursor.fetchmany(5000):
+                writer.writerows(rows)
+    return archive_path
+
+
+def purge_partitions(
+    retention_months,
+    archive_dir=None,
+    dry_run=False,
+    today=None,
+    using_connection=connection,
+):
+    """
+    Drop monthly partitions older than ``retention_months`` full months, after
+    writing each one to ``archive_dir`` as gzipped CSV when it is given.
+    Returns the names of the partitions that were (or would be) removed.
+
+    Without partitioning (another database backend) the expired rows are
+    deleted instead.
+    """
+    cutoff = add_months(
+        month_start(today or datetime.now(timezone.utc)), -retention_months
+    )
+    if not is_partitioned(using_connection):
+        if not dry_run:
+            with using_connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM "{TABLE}" WHERE "timestamp" < %s', [_bound(cutoff)]
+                )
+        return []
+
+    expired = [
+        name for month, name in list_partitions(using_connection) if month < cutoff
+    ]
+    if dry_run:
+        return expired
+
+    for name in expired:
+        if archive_dir:
+            _archive_partition(name, archive_dir, using_connection)
+        with transaction.atomic(using=using_connection.alias):
+            with using_connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+                cursor.execute(f'DROP TABLE "{name}"')
+
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" < %s',
+            [_bound(cutoff)],
+        )
+    return expired
@@ -0,0 +1,88 @@
+"""
+Which requests RequestLoggingMiddleware records, from the AUDIT_POLICY setting.
+
+The policy is compiled once per middleware instance: all exclusion patterns
+become a single alternation regex and the sampling rules a list of compiled
+(path, methods, rate) tuples checked first match wins, so a decision costs
+one regex search plus a few comparisons.
+"""
+
+import random
+import re
+
+from django.conf import settings
+
+DEFAULT_POLICY = {
+    # Path regexes (re.search) that are never logged.
+    "exclude": [],
+    # Sampling rules, first match wins. Each rule has an optional "path"
+    # regex, optional "methods" list and a "rate" between 0 and 1.
+    "sample": [],
+    # Rate for requests no sampling rule matches.
+    "default_rate": 1.0,
+    # Requests that bypass sampling (but not exclusion).
+    "always_log_authenticated": True,
+    "always_log_methods": ["POST", "PUT", "PATCH", "DELETE"],
+}
+
+
+class RequestLogPolicy:
+    def __init__(self, policy=None):
+        policy = {**DEFAULT_POLICY, **(policy or {})}
+
+        exclude = policy["exclude"]
+        self.exclude = (
+            re.compile("|".join(f"(?:{pattern})" for pattern in exclude))
+            if exclude
+            else None
+        )
+        self.rules = [self._compile_rule(rule) for rule in policy["sample"]]
+        self.default_rate = self._check_rate(policy["default_rate"])
+        self.always_log_authenticated = policy["always_log_authenticated"]
+        self.always_log_methods = frozenset(
+            method.upper() for method in policy["always_log_methods"]
+        )
+
+    @staticmethod
+    def _check_rate(rate):
+        rate = float(rate)
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Sample rate must be between 0 and 1, got {rate}.")
+        return rate
+
+    def _compile_rule(self, rule):
+        path = rule.get("path")
+        methods = rule.get("methods")
+        return (
+            re.compile(path) if path else None,
+            frozenset(method.upper() for method in methods) if methods else None,
+            self._check_rate(rule["rate"]),
+        )
+
+    def is_excluded(self, path):
+        return self.exclude is not None and self.exclude.search(path) is not None
+
+    def sample_rate(self, method, path):
+        for path_re, methods, rate in self.rules:
+            if methods is not None and method not in methods:
+                continue
+            if path_re is not None and path_re.search(path) is None:
+                continue
+            return rate
+        return self.default_rate
+
+    def should_log(self, request):
+        """Decide, once the response is ready, whether to record ``request``."""
+        if request.method in self.always_log_methods:
+            return True
+        if self.always_log_authenticated:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                return True
+
+        rate = self.sample_rate(request.method, request.path)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def get_request_log_policy():
+    return RequestLogPolicy(getattr(settings, "AUDIT_POLICY", None))
@@ -0,0 +1,67 @@
+import base64
+
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_datetime
+
+from .models import RequestLog
+
+
+def encode_cursor(log):
+    value = f"{log.timestamp.isoformat()}|{log.pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(value):
+    """Return the ``(timestamp, id)`` pair a cursor points at."""
+    try:
+        timestamp, pk = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+        parsed_timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor {value!r}.")
+    if parsed_timestamp is None:
+        raise ValueError(f"Invalid cursor {value!r}.")
+    return parsed_timestamp, pk
+
+
+def filter_request_logs(filters, queryset=None):
+    """Apply the cleaned RequestLogFilterForm data to ``queryset``."""
+    queryset = RequestLog.objects.all() if queryset is None else queryset
+    if filters.get("user"):
+        queryset = queryset.filter(user__username=filters["user"])
+    if filters.get("method"):
+        queryset = queryset.filter(method=filters["method"])
+    if filters.get("path"):
+        queryset = queryset.filter(path__value__startswith=filters["path"])
+    if filters.get("remote_ip"):
+        queryset = queryset.filter(remote_ip=filters["remote_ip"])
+    if filters.get("since"):
+        queryset = queryset.filter(timestamp__gte=filters["since"])
+    if filters.get("until"):
+        queryset = queryset.filter(timestamp__lt=filters["until"])
+    return queryset
+
+
+def paginate_request_logs(queryset, cursor=None, page_size=50):
+    """
+    Return one page of logs, newest first, and the cursor of the next page.
+
+    Pages are keyed on ``(timestamp, id)`` rather than an OFFSET, so fetching
+    page 1000 is the same index range scan as fetching page 1.
+    """
+    queryset = queryset.order_by("-timestamp", "-id")
+    if cursor is not None:
+        table = RequestLog._meta.db_table
+        queryset = queryset.filter(
+            RawSQL(
+                f'("{table}"."timestamp", "{table}"."id") < (%s, %s)',
+                cursor,
+                output_field=BooleanField(),
+            )
+        )
+    logs = list(queryset.select_related("user", "path", "user_agent")[: page_size + 1])
+    if len(logs) > page_size:
+        logs = logs[:page_size]
+        return logs, encode_cursor(logs[-1])
+    return logs, None
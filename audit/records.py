@@ -0,0 +1,53 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import RequestLog, RequestPath, UserAgent
+
+
+def get_client_ip(request):
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        return x_forwarded_for.split(",")[0]
+    return request.META.get("REMOTE_ADDR")
+
+
+def get_response_size(response):
+    """Body size in bytes, without consuming streaming responses."""
+    if not response.streaming:
+        return len(response.content)
+    content_length = response.get("Content-Length")
+    return int(content_length) if content_length else None
+
+
+def build_log_record(request, response, duration_ms, query_timer):
+    """Collect everything a RequestLog row needs while the request is at hand."""
+    return {
+        "timestamp": timezone.now(),
+        "method": request.method,
+        "path": request.path[: RequestPath._meta.get_field("value").max_length],
+        "query_string": request.META.get("QUERY_STRING", ""),
+        "remote_ip": get_client_ip(request),
+        "user_agent": request.META.get("HTTP_USER_AGENT", ""),
+        "user_id": request.user.pk if request.user.is_authenticated else None,
+        "status_code": response.status_code,
+        "response_size": get_response_size(response),
+        "duration_ms": round(duration_ms, 3),
+        "db_query_count": query_timer.count,
+        "db_time_ms": round(query_timer.duration_ms, 3),
+    }
+
+
+def serialize_record(record):
+    return {**record, "timestamp": record["timestamp"].isoformat()}
+
+
+def deserialize_record(data):
+    return {**data, "timestamp": parse_datetime(data["timestamp"])}
+
+
+def to_request_log(record):
+    """Build the RequestLog for ``record``, interning its path and user agent."""
+    record = dict(record)
+    record["path_id"] = RequestPath.objects.get_id(record.pop("path"))
+    record["user_agent_id"] = UserAgent.objects.get_id(record.pop("user_agent", None))
+    return RequestLog(**record)
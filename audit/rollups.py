@@ -0,0 +1,249 @@
+"""
+Per-minute request rollups maintained incrementally from RequestLog.
+
+``update_rollups`` aggregates the RequestLog rows added since the stored
+watermark (the highest RequestLog id already counted) into RequestRollup
+buckets keyed by (minute, method, normalized path, status class, user), so
+dashboards read a few rows per minute instead of every request.
+
+Ids are taken from a sequence when a row is inserted, not when it commits,
+so a row can become visible after rows with higher ids. Only rows inserted
+longer than a safety lag ago are counted (by ``created_at``, the database's
+insert time, as the request ``timestamp`` of a buffered or streamed row is
+already old when it lands), and the watermark stops before the first younger
+one, leaving time for slower transactions to commit before it moves past
+their ids.
+"""
+
+import re
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Q, Sum
+from django.db.models.functions import Cast, Coalesce, Now, TruncMinute
+
+from .models import RequestLog, RequestPath, RequestRollup, RollupWatermark
+
+WATERMARK_NAME = "request_rollup"
+
+# Upper bounds (ms) of the latency histogram buckets; the histogram has one
+# more slot counting requests slower than the last bound.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_PATH_ID_RE = re.compile(
+    r"/(?:\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?=/|$)",
+    re.IGNORECASE,
+)
+
+
+def normalize_path(path):
+    """Collapse numeric and UUID path segments: ``/cv/12/`` -> ``/cv/<id>/``."""
+    return _PATH_ID_RE.sub("/<id>", path)
+
+
+def _bucket_filters():
+    lower = None
+    for upper in LATENCY_BUCKETS_MS:
+        condition = Q(duration_ms__lte=upper)
+        if lower is not None:
+            condition &= Q(duration_ms__gt=lower)
+        yield condition
+        lower = upper
+    yield Q(duration_ms__gt=lower)
+
+
+def _aggregate(id_range):
+    buckets = {
+        f"bucket_{index}": Count("id", filter=condition)
+        for index, condition in enumerate(_bucket_filters())
+    }
+    return (
+        RequestLog.objects.filter(id__gt=id_range[0], id__lte=id_range[1])
+        .annotate(
+            minute=TruncMinute("timestamp"),
+            status_class=Coalesce(Cast(F("status_code") / 100, IntegerField()), 0),
+        )
+        .values("minute", "method", "path_id", "status_class", "user_id")
+        .annotate(
+            requests=Count("id"),
+            timed_requests=Count("duration_ms"),
+            duration_sum_ms=Coalesce(Sum("duration_ms"), 0.0),
+            **buckets,
+        )
+        .order_by()
+    )
+
+
+def _merge(groups):
+    """Fold aggregated groups into one entry per rollup key."""
+    groups = list(groups)
+    paths = RequestPath.objects.in_bulk({group["path_id"] for group in groups})
+    merged = {}
+    for group in groups:
+        key = (
+            group["minute"],
+            group["method"],
+            normalize_path(paths[group["path_id"]].value),
+            group["status_class"],
+            group["user_id"],
+        )
+        histogram = [
+            group[f"bucket_{index}"] for index in range(len(LATENCY_BUCKETS_MS) + 1)
+        ]
+        entry = merged.setdefault(
+            key,
+            {
+                "requests": 0,
+                "timed_requests": 0,
+                "duration_sum_ms": 0.0,
+                "latency_histogram": [0] * len(histogram),
+            },
+        )
+        entry["requests"] += group["requests"]
+        entry["timed_requests"] += group["timed_requests"]
+        entry["duration_sum_ms"] += group["duration_sum_ms"]
+        entry["latency_histogram"] = [
+            total + count for total, count in zip(entry["latency_histogram"], histogram)
+        ]
+    return merged
+
+
+def _store(merged):
+    minutes = {key[0] for key in merged}
+    existing = {
+        (r.minute, r.method, r.path, r.status_class, r.user_id): r
+        for r in RequestRollup.objects.filter(minute__in=minutes)
+    }
+
+    to_create, to_update = [], []
+    for key, entry in merged.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            minute, method, path, status_class, user_id = key
+            to_create.append(
+                RequestRollup(
+                    minute=minute,
+                    method=method,
+                    path=path,
+                    status_class=status_class,
+                    user_id=user_id,
+                    **entry,
+                )
+            )
+            continue
+        rollup.requests += entry["requests"]
+        rollup.timed_requests += entry["timed_requests"]
+        rollup.duration_sum_ms += entry["duration_sum_ms"]
+        rollup.latency_histogram = [
+            total + count
+            for total, count in zip(
+                rollup.latency_histogram, entry["latency_histogram"]
+            )
+        ]
+        to_update.append(rollup)
+
+    RequestRollup.objects.bulk_create(to_create)
+    RequestRollup.objects.bulk_update(
+        to_update,
+        ["requests", "timed_requests", "duration_sum_ms", "latency_histogram"],
+    )
+
+
+def update_rollups(batch_size=50000, max_batches=20, lag=60):
+    """
+    Count RequestLog rows past the watermark into the rollups, ``batch_size``
+    rows per transaction. Rows inserted in the last ``lag`` seconds, and any
+    row with a higher id, wait for a later run. Returns the number of rows
+    processed.
+    """
+    cutoff = Now() - timedelta(seconds=lag)
+    processed = 0
+    for _ in range(max_batches):
+        with transaction.atomic():
+            watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(
+                name=WATERMARK_NAME
+            )
+            pending = RequestLog.objects.filter(id__gt=watermark.last_id)
+            first_recent = (
+                pending.filter(created_at__gt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)
+                .first()
+            )
+            if first_recent is not None:
+                pending = pending.filter(id__lt=first_recent)
+            ids = list(pending.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+
+            _store(_merge(_aggregate((watermark.last_id, ids[-1]))))
+            watermark.last_id = ids[-1]
+            watermark.save(update_fields=["last_id"])
+        processed += len(ids)
+    return processed
+
+
+def histogram_percentile(histogram, percentile):
+    """
+    Estimate a latency percentile (0-1) from a bucket histogram, interpolating
+    linearly inside the bucket that holds it. Requests slower than the last
+    bucket bound are reported at that bound.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = percentile * total
+    seen, lower = 0, 0
+    for upper, count in zip(LATENCY_BUCKETS_MS, histogram):
+        if count and seen + count >= rank:
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+        lower = upper
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+def latency_by_path(rollups, limit=50):
+    """Per-path request count, average and p50/p95/p99 latency, slowest first."""
+    paths = {}
+    for rollup in rollups.values(
+        "path", "requests", "timed_requests", "duration_sum_ms", "latency_histogram"
+    ):
+        entry = paths.setdefault(
+            rollup["path"],
+            {
+                "requests": 0,
+                "timed_requests": 0,
+                "duration_sum_ms": 0.0,
+                "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            },
+        )
+        entry["requests"] += rollup["requests"]
+        entry["timed_requests"] += rollup["timed_requests"]
+        entry["duration_sum_ms"] += rollup["duration_sum_ms"]
+        entry["histogram"] = [
+            total + count
+            for total, count in zip(entry["histogram"], rollup["latency_histogram"])
+        ]
+
+    rows = [
+        {
+            "path": path,
+            "requests": entry["requests"],
+            "average": entry["duration_sum_ms"] / entry["timed_requests"],
+            "p50": histogram_percentile(entry["histogram"], 0.5),
+            "p95": histogram_percentile(entry["histogram"], 0.95),
+            "p99": histogram_percentile(entry["histogram"], 0.99),
+        }
+        for path, entry in paths.items()
+        if entry["timed_requests"]
+    ]
+    return sorted(rows, key=lambda row: row["p95"], reverse=True)[:limit]
+
+
+def traffic_by_status_class(rollups):
+    """Request totals per status class (``"2xx"`` ...) for the given rollups."""
+    totals = rollups.values("status_class").annotate(total=Sum("requests"))
+    return {
+        (f"{row['status_class']}xx" if row["status_class"] else "other"): row["total"]
+        for row in totals.order_by("status_class")
+    }
@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from .models import RequestLog
+
+
+class RequestLogSerializer(serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(slug_field="username", read_only=True)
+    path = serializers.SlugRelatedField(slug_field="value", read_only=True)
+    user_agent = serializers.SlugRelatedField(slug_field="value", read_only=True)
+
+    class Meta:
+        model = RequestLog
+        fields = [
+            "id",
+            "timestamp",
+            "method",
+            "path",
+            "query_string",
+            "remote_ip",
+            "user_agent",
+            "user",
+            "status_code",
+            "response_size",
+            "duration_ms",
+            "db_query_count",
+            "db_time_ms",
+        ]
@@ -0,0 +1,151 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .buffer import get_request_log_writer
+from .live import notify_request_logs
+from .records import serialize_record, to_request_log
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLogSink:
+    """Destination for the records built by RequestLoggingMiddleware."""
+
+    def write(self, record):
+        raise NotImplementedError
+
+
+class DatabaseSink(RequestLogSink):
+    """Insert every record into the RequestLog table inside the request."""
+
+    def write(self, record):
+        log = to_request_log(record)
+        log.save()
+        notify_request_logs([log])
+
+
+class BufferedDatabaseSink(RequestLogSink):
+    """Hand records to the background batch writer (see ``audit.buffer``)."""
+
+    def __init__(self, writer=None):
+        self.writer = writer or get_request_log_writer()
+
+    def write(self, record):
+        self.writer.enqueue(record)
+
+
+class JSONLFileSink(RequestLogSink):
+    """
+    Append records as JSON lines to a per-process file in ``directory``.
+
+    Once the file grows past ``max_bytes`` it is closed, renamed under a
+    timestamped name and a fresh file is started; the rotated file is
+    gzip-compressed by a background thread, so requests never wait for the
+    compression. Rotated files are never deleted here; shipping or pruning
+    them is left to the host.
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.path = os.path.join(
+            directory, f"requests-{socket.gethostname()}-{os.getpid()}.jsonl"
+        )
+        self._lock = threading.Lock()
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    @staticmethod
+    def _compress(path):
+        try:
+            with open(path, "rb") as source, gzip.open(f"{path}.gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+        except OSError as e:
+            logger.error(f"Failed to compress rotated request log {path}: {str(e)}")
+            return
+        os.remove(path)
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+
+        stamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+        rotated_path = f"{self.path[:-len('.jsonl')]}-{stamp}.jsonl"
+        os.rename(self.path, rotated_path)
+        threading.Thread(
+            target=self._compress,
+            args=(rotated_path,),
+            name="request-log-compressor",
+            daemon=True,
+        ).start()
+
+    def write(self, record):
+        line = json.dumps(serialize_record(record), ensure_ascii=False) + "\n"
+        with self._lock:
+            log_file = self._open()
+            log_file.write(line)
+            log_file.flush()
+            if log_file.tell() >= self.max_bytes:
+                self._rotate()
+
+
+class RedisStreamSink(RequestLogSink):
+    """
+    Publish records to a Redis stream; ``audit.tasks.drain_request_log_stream``
+    moves them into RequestLog in large batches. Calls time out after
+    ``AUDIT_REDIS_SOCKET_TIMEOUT`` seconds, dropping the record, so a stalled
+    Redis does not hold up the request.
+    """
+
+    def __init__(self, client=None, stream=None, max_length=None):
+        self.client = client or redis.Redis.from_url(
+            settings.AUDIT_REDIS_URL,
+            socket_timeout=settings.AUDIT_REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.AUDIT_REDIS_SOCKET_TIMEOUT,
+        )
+        self.stream = stream or settings.AUDIT_REDIS_STREAM
+        self.max_length = max_length or settings.AUDIT_REDIS_STREAM_MAX_LENGTH
+
+    def write(self, record):
+        try:
+            self.client.xadd(
+                self.stream,
+                {"record": json.dumps(serialize_record(record))},
+                maxlen=self.max_length,
+                approximate=True,
+            )
+        except redis.RedisError as e:
+            logger.error(f"Failed to publish request log to Redis: {str(e)}")
+
+
+SINKS = {
+    "database": DatabaseSink,
+    "buffered": BufferedDatabaseSink,
+    "jsonl": lambda: JSONLFileSink(
+        settings.AUDIT_JSONL_DIR, max_bytes=settings.AUDIT_JSONL_MAX_BYTES
+    ),
+    "redis": RedisStreamSink,
+}
+
+
+def get_request_log_sink():
+    """Build the sink named by ``AUDIT_SINK`` (a short name or a dotted path)."""
+    sink_name = settings.AUDIT_SINK
+    if sink_name in SINKS:
+        return SINKS[sink_name]()
+    return import_string(sink_name)()
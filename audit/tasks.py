@@ -0,0 +1,175 @@
+import json
+import logging
+
+import redis
+from celery import shared_task
+from django.conf import settings
+
+from .live import notify_request_logs
+from .models import RequestLog
+from .partitions import ensure_partitions, purge_partitions
+from .records import deserialize_record, to_request_log
+from .rollups import update_rollups
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds an entry stays unacknowledged before it is claimed back.
+CLAIM_IDLE_TIME = 60000
+
+
+def _ensure_consumer_group(client, stream, group):
+    try:
+        client.xgroup_create(stream, group, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _entry_log(fields):
+    return to_request_log(deserialize_record(json.loads(fields[b"record"])))
+
+
+def _store_entries(client, stream, group, entries):
+    """
+    Store ``entries`` in one batch; if that fails, store them one by one so
+    a single bad entry is left pending alone while the others are stored.
+    """
+    if not entries:
+        return 0
+    try:
+        logs = RequestLog.objects.bulk_create(
+            [_entry_log(fields) for _, fields in entries]
+        )
+        stored_ids = [entry_id for entry_id, _ in entries]
+    except Exception as e:
+        logger.error(f"Failed to store request log batch: {str(e)}")
+        logs, stored_ids = [], []
+        for entry_id, fields in entries:
+            try:
+                log = _entry_log(fields)
+                log.save()
+            except Exception as e:
+                logger.error(f"Failed to store request log {entry_id}: {str(e)}")
+                continue
+            logs.append(log)
+            stored_ids.append(entry_id)
+    notify_request_logs(logs)
+    if stored_ids:
+        client.xack(stream, group, *stored_ids)
+        client.xdel(stream, *stored_ids)
+    return len(stored_ids)
+
+
+def _dead_letter_entries(
+    client, stream, group, consumer, count, max_deliveries, dead_letter_stream
+):
+    """
+    Move pending entries delivered ``max_deliveries`` times already to
+    ``dead_letter_stream`` instead of claiming them back once more.
+    """
+    exhausted = [
+        pending["message_id"]
+        for pending in client.xpending_range(stream, group, "-", "+", count)
+        if pending["times_delivered"] >= max_deliveries
+        and pending["time_since_delivered"] >= CLAIM_IDLE_TIME
+    ]
+    if not exhausted:
+        return 0
+    entries = client.xclaim(
+        stream, group, consumer, CLAIM_IDLE_TIME, message_ids=exhausted
+    )
+    for entry_id, fields in entries:
+        client.xadd(dead_letter_stream, {**fields, b"entry_id": entry_id})
+    entry_ids = [entry_id for entry_id, _ in entries]
+    if entry_ids:
+        client.xack(stream, group, *entry_ids)
+        client.xdel(stream, *entry_ids)
+        logger.error(
+            f"Moved {len(entry_ids)} request logs that failed {max_deliveries} "
+            f"times to {dead_letter_stream}."
+        )
+    return len(entry_ids)
+
+
+def drain_stream(
+    client,
+    stream,
+    group,
+    consumer,
+    batch_size,
+    max_batches,
+    max_deliveries=5,
+    dead_letter_stream=None,
+):
+    """
+    Move request log records from the Redis stream into RequestLog.
+
+    Entries another consumer read but never acknowledged (a worker died
+    mid-batch, or storing them failed) are claimed back first, then new
+    entries are read until the stream is empty or ``max_batches`` batches
+    have been stored. An entry delivered ``max_deliveries`` times without
+    being stored is moved to ``dead_letter_stream`` (``<stream>:dead`` by
+    default) so it is not retried forever.
+    """
+    _ensure_consumer_group(client, stream, group)
+
+    _dead_letter_entries(
+        client,
+        stream,
+        group,
+        consumer,
+        count=batch_size,
+        max_deliveries=max_deliveries,
+        dead_letter_stream=dead_letter_stream or f"{stream}:dead",
+    )
+    stored = 0
+    _, claimed, _ = client.xautoclaim(
+        stream, group, consumer, min_idle_time=CLAIM_IDLE_TIME, count=batch_size
+    )
+    stored += _store_entries(client, stream, group, claimed)
+
+    for _ in range(max_batches):
+        response = client.xreadgroup(group, consumer, {stream: ">"}, count=batch_size)
+        entries = response[0][1] if response else []
+        if not entries:
+            break
+        stored += _store_entries(client, stream, group, entries)
+    return stored
+
+
+@shared_task
+def drain_request_log_stream():
+    client = redis.Redis.from_url(settings.AUDIT_REDIS_URL)
+    stored = drain_stream(
+        client,
+        stream=settings.AUDIT_REDIS_STREAM,
+        group=settings.AUDIT_REDIS_CONSUMER_GROUP,
+        consumer="request-log-drain",
+        batch_size=settings.AUDIT_REDIS_DRAIN_BATCH_SIZE,
+        max_batches=settings.AUDIT_REDIS_DRAIN_MAX_BATCHES,
+        max_deliveries=settings.AUDIT_REDIS_MAX_DELIVERIES,
+        dead_letter_stream=settings.AUDIT_REDIS_DEAD_LETTER_STREAM,
+    )
+    if stored:
+        logger.info(f"Stored {stored} request logs from the Redis stream.")
+    return stored
+
+
+@shared_task
+def maintain_request_log_partitions():
+    created = ensure_partitions(months_ahead=settings.AUDIT_PARTITION_MONTHS_AHEAD)
+    purged = purge_partitions(
+        settings.AUDIT_RETENTION_MONTHS, archive_dir=settings.AUDIT_ARCHIVE_DIR
+    )
+    logger.info(
+        f"Request log partitions created: {created or 'none'}, "
+        f"purged: {purged or 'none'}."
+    )
+    return {"created": created, "purged": purged}
+
+
+@shared_task
+def update_request_rollups():
+    return update_rollups(
+        batch_size=settings.AUDIT_ROLLUP_BATCH_SIZE, lag=settings.AUDIT_ROLLUP_LAG
+    )
@@ -1,8 +1,54 @@
+import csv
+import glob
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+import fakeredis
+import redis
+from asgiref.sync import sync_to_async
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TransactionTestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
 from main.tests import BaseTest
 
-from .models import RequestLog
+from .buffer import BufferedRequestLogWriter
+from .dimensions import clear_dimension_caches
+from .live import (
+    RequestLogBroadcaster,
+    Subscription,
+    has_listeners,
+    notify_request_logs,
+)
+from .models import RequestLog, RequestPath, RequestRollup, RollupWatermark, UserAgent
+from .partitions import create_partition, ensure_partitions, list_partitions
+from .policy import RequestLogPolicy
+from .queries import encode_cursor, filter_request_logs, paginate_request_logs
+from .records import to_request_log
+from .rollups import latency_by_path, normalize_path, update_rollups
+from .sinks import JSONLFileSink, RedisStreamSink
+from .tasks import drain_stream
+
+
+def make_record(path="/", user_id=None):
+    return {
+        "timestamp": timezone.now(),
+        "method": "GET",
+        "path": path,
+        "query_string": "",
+        "remote_ip": "127.0.0.1",
+        "user_agent": "test-agent",
+        "user_id": user_id,
+    }
 
 
 class RequestLoggingTestCase(BaseTest):
@@ -19,5 +65,796 @@ class RequestLoggingTestCase(BaseTest):
         log = RequestLog.objects.first()
         self.assertIsNotNone(log)
         self.assertEqual(log.method, "GET")
-        self.assertEqual(log.path, url)
+        self.assertEqual(log.path.value, url)
         self.assertEqual(log.user, self.user)
+
+    def test_logging_middleware_records_timings_and_response(self):
+        url = reverse("cv_list")
+        response = self.client.get(url)
+
+        log = RequestLog.objects.get()
+        self.assertEqual(log.status_code, 200)
+        self.assertEqual(log.response_size, len(response.content))
+        self.assertGreater(log.duration_ms, 0)
+        self.assertGreater(log.db_query_count, 0)
+        self.assertGreaterEqual(log.duration_ms, log.db_time_ms)
+
+    def test_logging_middleware_truncates_long_paths(self):
+        self.client.get("/" + "x" * 300)
+
+        self.assertEqual(len(RequestLog.objects.get().path.value), 200)
+
+    def test_logging_middleware_records_error_status(self):
+        self.client.get(reverse("cv_detail", args=[999999]))
+
+        self.assertEqual(RequestLog.objects.get().status_code, 404)
+
+    @override_settings(AUDIT_SINK="buffered")
+    def test_buffered_sink_defers_the_insert(self):
+        writer = BufferedRequestLogWriter(flush_interval=60)
+        with mock.patch("audit.sinks.get_request_log_writer", return_value=writer):
+            response = self.client.get(reverse("cv_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(RequestLog.objects.exists())
+        self.assertEqual(writer.counters["queued"], 1)
+
+        writer.flush()
+
+        log = RequestLog.objects.get()
+        self.assertEqual(log.path.value, reverse("cv_list"))
+        self.assertEqual(log.user, self.user)
+
+
+class RequestLogPolicyTestCase(BaseTest):
+    def test_excluded_paths_are_not_logged(self):
+        self.client.post(reverse("remove_message"), {"message": "x"}, format="json")
+        self.client.get("/static/css/styles.css")
+
+        self.assertFalse(RequestLog.objects.exists())
+
+    @override_settings(AUDIT_POLICY={"default_rate": 0})
+    def test_authenticated_requests_bypass_sampling(self):
+        self.client.get(reverse("cv_list"))
+        self.client.logout()
+        self.client.get(reverse("cv_list"))
+
+        self.assertEqual(RequestLog.objects.get().user, self.user)
+
+    @override_settings(
+        AUDIT_POLICY={"default_rate": 0, "always_log_authenticated": False}
+    )
+    def test_mutating_requests_bypass_sampling(self):
+        self.client.get(reverse("cv_list"))
+        self.client.post(reverse("cv_list"))
+
+        self.assertEqual(RequestLog.objects.get().method, "POST")
+
+    def test_sample_rules_first_match_wins(self):
+        policy = RequestLogPolicy(
+            {
+                "sample": [
+                    {"path": r"^/audit/", "methods": ["get"], "rate": 0.1},
+                    {"path": r"^/audit/", "rate": 0.5},
+                ],
+                "default_rate": 0.9,
+            }
+        )
+
+        self.assertEqual(policy.sample_rate("GET", "/audit/logs/"), 0.1)
+        self.assertEqual(policy.sample_rate("HEAD", "/audit/logs/"), 0.5)
+        self.assertEqual(policy.sample_rate("GET", "/"), 0.9)
+
+    def test_sampling_uses_the_rate(self):
+        policy = RequestLogPolicy(
+            {"default_rate": 0.25, "always_log_authenticated": False}
+        )
+        request = mock.Mock(method="GET", path="/")
+
+        with mock.patch("audit.policy.random.random", return_value=0.2):
+            self.assertTrue(policy.should_log(request))
+        with mock.patch("audit.policy.random.random", return_value=0.3):
+            self.assertFalse(policy.should_log(request))
+
+    def test_invalid_rate_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RequestLogPolicy({"default_rate": 2})
+
+
+class RequestLogDimensionTestCase(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(clear_dimension_caches)
+
+    def test_repeated_values_share_one_row(self):
+        for _ in range(2):
+            self.client.get(reverse("cv_list"), HTTP_USER_AGENT="agent/1.0")
+        self.client.get(reverse("cv_list"), HTTP_USER_AGENT="")
+
+        self.assertEqual(RequestPath.objects.count(), 1)
+        self.assertEqual(
+            list(UserAgent.objects.values_list("value", flat=True)), ["agent/1.0"]
+        )
+        self.assertEqual(
+            list(
+                RequestLog.objects.order_by("id").values_list(
+                    "user_agent__value", flat=True
+                )
+            ),
+            ["agent/1.0", "agent/1.0", None],
+        )
+
+    def test_committed_ids_are_served_from_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            path_id = RequestPath.objects.get_id("/cached/")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(RequestPath.objects.get_id("/cached/"), path_id)
+
+    def test_uncommitted_ids_are_not_cached(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            path_id = RequestPath.objects.get_id("/pending/")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(RequestPath.objects.get_id("/pending/"), path_id)
+
+    def test_cache_evicts_least_recently_used(self):
+        manager = RequestPath.objects
+        with mock.patch.object(manager, "cache_size", 2):
+            with self.captureOnCommitCallbacks(execute=True):
+                for value in ("/a/", "/b/", "/a/", "/c/"):
+                    manager.get_id(value)
+
+            self.assertEqual(list(manager._cache), ["/a/", "/c/"])
+
+
+class BufferedRequestLogWriterTestCase(BaseTest):
+    def test_flush_writes_in_batches(self):
+        writer = BufferedRequestLogWriter(batch_size=2, flush_interval=60)
+        for index in range(5):
+            writer.enqueue(make_record(path=f"/page/{index}/"))
+
+        writer.flush()
+
+        self.assertEqual(RequestLog.objects.count(), 5)
+        self.assertEqual(
+            writer.counters,
+            {"queued": 5, "flushed": 5, "dropped": 0, "spilled": 0, "pending": 0},
+        )
+
+    def test_drop_policy_discards_overflow(self):
+        writer = BufferedRequestLogWriter(max_queue_size=2, flush_interval=60)
+        for _ in range(3):
+            writer.enqueue(make_record())
+
+        writer.flush()
+
+        self.assertEqual(RequestLog.objects.count(), 2)
+        self.assertEqual(writer.counters["dropped"], 1)
+
+    def test_block_policy_drops_after_timeout(self):
+        writer = BufferedRequestLogWriter(
+            max_queue_size=1, overflow_policy="block", block_timeout=0.01
+        )
+        writer.enqueue(make_record())
+        writer.enqueue(make_record())
+
+        self.assertEqual(writer.counters["queued"], 1)
+        self.assertEqual(writer.counters["dropped"], 1)
+
+    def test_spill_policy_reloads_overflow_on_flush(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            spill_path = os.path.join(spill_dir, "spill.jsonl")
+            writer = BufferedRequestLogWriter(
+                max_queue_size=1, overflow_policy="spill", spill_path=spill_path
+            )
+            writer.enqueue(make_record(path="/first/"))
+            writer.enqueue(make_record(path="/second/", user_id=self.user.pk))
+            self.assertTrue(os.path.exists(spill_path))
+
+            writer.flush()
+
+            self.assertFalse(os.path.exists(spill_path))
+        self.assertEqual(writer.counters["spilled"], 1)
+        self.assertEqual(writer.counters["flushed"], 2)
+        spilled_log = RequestLog.objects.get(path__value="/second/")
+        self.assertEqual(spilled_log.user, self.user)
+
+    def test_bad_record_is_dropped_alone(self):
+        writer = BufferedRequestLogWriter(flush_interval=60)
+        for index in range(5):
+            writer.enqueue(make_record(path=f"/page/{index}/"))
+        writer.enqueue(make_record(path="/" + "x" * 300))
+
+        writer.flush()
+
+        self.assertEqual(RequestLog.objects.count(), 5)
+        self.assertEqual(writer.counters["flushed"], 5)
+        self.assertEqual(writer.counters["dropped"], 1)
+
+    def test_bad_record_is_not_spilled(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            spill_path = os.path.join(spill_dir, "spill.jsonl")
+            writer = BufferedRequestLogWriter(
+                overflow_policy="spill", spill_path=spill_path
+            )
+            writer.enqueue(make_record(path="/" + "x" * 300))
+            writer.enqueue(make_record(path="/good/"))
+
+            writer.flush()
+
+            self.assertFalse(os.path.exists(spill_path))
+        self.assertEqual(writer.counters["spilled"], 0)
+        self.assertEqual(RequestLog.objects.get().path.value, "/good/")
+
+    def test_spill_policy_requires_path(self):
+        with self.assertRaises(ValueError):
+            BufferedRequestLogWriter(overflow_policy="spill")
+
+
+class RequestLogSinkTestCase(BaseTest):
+    def test_jsonl_sink_rotates_into_compressed_files(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            sink = JSONLFileSink(log_dir, max_bytes=300)
+            for index in range(4):
+                sink.write(make_record(path=f"/page/{index}/"))
+            for thread in threading.enumerate():
+                if thread.name == "request-log-compressor":
+                    thread.join()
+
+            self.assertFalse(
+                [
+                    path
+                    for path in glob.glob(os.path.join(log_dir, "*.jsonl"))
+                    if path != sink.path
+                ]
+            )
+            rotated = sorted(glob.glob(os.path.join(log_dir, "*.jsonl.gz")))
+            self.assertTrue(rotated)
+            lines = []
+            for path in rotated:
+                with gzip.open(path, "rt", encoding="utf-8") as rotated_file:
+                    lines.extend(rotated_file)
+            if os.path.exists(sink.path):
+                with open(sink.path, encoding="utf-8") as current_file:
+                    lines.extend(current_file)
+
+        paths = [json.loads(line)["path"] for line in lines]
+        self.assertEqual(paths, [f"/page/{index}/" for index in range(4)])
+
+    @override_settings(AUDIT_REDIS_SOCKET_TIMEOUT=0.1)
+    def test_redis_stream_sink_times_out_instead_of_hanging(self):
+        with mock.patch("audit.sinks.redis.Redis.from_url") as from_url:
+            sink = RedisStreamSink()
+        from_url.assert_called_once_with(
+            mock.ANY, socket_timeout=0.1, socket_connect_timeout=0.1
+        )
+
+        sink.client.xadd.side_effect = redis.TimeoutError("Timeout reading")
+        sink.write(make_record())
+
+    def test_redis_stream_is_drained_into_request_logs(self):
+        client = fakeredis.FakeRedis()
+        sink = RedisStreamSink(client=client, stream="test:logs", max_length=100)
+        sink.write(make_record(path="/one/"))
+        sink.write(make_record(path="/two/", user_id=self.user.pk))
+        self.assertFalse(RequestLog.objects.exists())
+
+        stored = drain_stream(
+            client,
+            stream="test:logs",
+            group="audit",
+            consumer="test",
+            batch_size=1,
+            max_batches=10,
+        )
+
+        self.assertEqual(stored, 2)
+        self.assertEqual(client.xlen("test:logs"), 0)
+        self.assertEqual(
+            list(RequestLog.objects.order_by("id").values_list("path__value", "user")),
+            [("/one/", None), ("/two/", self.user.pk)],
+        )
+
+    @mock.patch("audit.tasks.CLAIM_IDLE_TIME", 0)
+    def test_redis_entries_failing_repeatedly_move_to_dead_letter_stream(self):
+        client = fakeredis.FakeRedis()
+        sink = RedisStreamSink(client=client, stream="test:logs", max_length=100)
+        client.xadd("test:logs", {"record": "not json"})
+        sink.write(make_record(path="/good/"))
+        drain = {
+            "stream": "test:logs",
+            "group": "audit",
+            "consumer": "test",
+            "batch_size": 10,
+            "max_batches": 10,
+            "max_deliveries": 2,
+        }
+
+        self.assertEqual(drain_stream(client, **drain), 1)
+        self.assertEqual(drain_stream(client, **drain), 0)
+        self.assertEqual(client.xlen("test:logs"), 1)
+        self.assertEqual(drain_stream(client, **drain), 0)
+
+        self.assertEqual(client.xlen("test:logs"), 0)
+        dead_letters = client.xrange("test:logs:dead")
+        self.assertEqual(len(dead_letters), 1)
+        self.assertEqual(dead_letters[0][1][b"record"], b"not json")
+        self.assertEqual(
+            list(RequestLog.objects.values_list("path__value", flat=True)),
+            ["/good/"],
+        )
+
+
+class RequestLogPartitionTestCase(BaseTest):
+    def partition_row_count(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{name}"')
+            return cursor.fetchone()[0]
+
+    def test_new_partition_takes_over_rows_from_default(self):
+        RequestLog.objects.create(
+            method="GET",
+            path_id=RequestPath.objects.get_id("/future/"),
+            timestamp=datetime(2031, 1, 15, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(self.partition_row_count("audit_requestlog_default"), 1)
+
+        created = ensure_partitions(months_ahead=1, today=date(2031, 1, 1))
+
+        self.assertEqual(
+            created, ["audit_requestlog_p2031_01", "audit_requestlog_p2031_02"]
+        )
+        self.assertEqual(self.partition_row_count("audit_requestlog_default"), 0)
+        self.assertEqual(self.partition_row_count("audit_requestlog_p2031_01"), 1)
+        self.assertEqual(RequestLog.objects.get().path.value, "/future/")
+
+    def test_purge_drops_expired_partitions_only(self):
+        create_partition(date(2020, 1, 1))
+        RequestLog.objects.create(
+            method="GET",
+            path_id=RequestPath.objects.get_id("/old/"),
+            timestamp=datetime(2020, 1, 10, tzinfo=dt_timezone.utc),
+        )
+        RequestLog.objects.create(
+            method="GET", path_id=RequestPath.objects.get_id("/recent/")
+        )
+        # Fire the deferred FK checks so the partition can be dropped in-test.
+        connection.check_constraints()
+
+        call_command("purge_audit_logs", "--retention-months=3", "--dry-run")
+        self.assertEqual(RequestLog.objects.count(), 2)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            call_command(
+                "purge_audit_logs",
+                "--retention-months=3",
+                f"--archive-dir={archive_dir}",
+            )
+            archive_path = os.path.join(archive_dir, "audit_requestlog_p2020_01.csv.gz")
+            with gzip.open(archive_path, "rt", encoding="utf-8") as archive:
+                self.assertIn("/old/", archive.read())
+
+        self.assertNotIn(
+            "audit_requestlog_p2020_01", [name for _, name in list_partitions()]
+        )
+        self.assertEqual(
+            list(RequestLog.objects.values_list("path__value", flat=True)), ["/recent/"]
+        )
+
+
+class RequestLogBrowserTestCase(BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        same_moment = timezone.now() - timezone.timedelta(minutes=5)
+        RequestLog.objects.bulk_create(
+            [
+                RequestLog(
+                    timestamp=same_moment,
+                    method="GET" if index % 2 else "POST",
+                    path_id=RequestPath.objects.get_id(f"/page/{index}/"),
+                    remote_ip="10.0.0.1",
+                    user=cls.user if index < 3 else None,
+                )
+                for index in range(7)
+            ]
+        )
+
+    def test_keyset_pages_cover_every_row_once(self):
+        queryset = filter_request_logs({"path": "/page/"})
+        seen, cursor = [], None
+        while True:
+            logs, cursor = paginate_request_logs(queryset, cursor=cursor, page_size=3)
+            seen.extend(log.path.value for log in logs)
+            if cursor is None:
+                break
+            cursor = (logs[-1].timestamp, logs[-1].pk)
+
+        self.assertEqual(seen, [f"/page/{index}/" for index in reversed(range(7))])
+
+    def test_filters_combine(self):
+        logs = filter_request_logs(
+            {"user": self.user.username, "method": "GET", "path": "/page/"}
+        )
+        self.assertEqual(sorted(log.path.value for log in logs), ["/page/1/"])
+
+    def test_browser_renders_filtered_page_with_next_link(self):
+        response = self.client.get(
+            reverse("recent_logs"), {"path": "/page/", "method": "POST"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [log.path.value for log in response.context["logs"]],
+            ["/page/6/", "/page/4/", "/page/2/", "/page/0/"],
+        )
+        self.assertIsNone(response.context["next_page_query"])
+
+    def test_browser_rejects_bad_cursor(self):
+        response = self.client.get(reverse("recent_logs"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["logs"], [])
+        self.assertContains(response, "Invalid page cursor.")
+
+    def test_api_returns_results_and_cursor(self):
+        url = reverse("request_logs_api")
+        response = self.client.get(url, {"path": "/page/", "limit": 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertEqual(response.data["results"][0]["path"], "/page/6/")
+        self.assertEqual(response.data["results"][-1]["user"], None)
+
+        response = self.client.get(
+            url, {"path": "/page/", "cursor": response.data["next_cursor"]}
+        )
+        self.assertEqual(
+            [log["path"] for log in response.data["results"]],
+            ["/page/2/", "/page/1/", "/page/0/"],
+        )
+        self.assertEqual(response.data["results"][0]["user"], self.user.username)
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_cursor_round_trip(self):
+        log = RequestLog.objects.first()
+        response = self.client.get(
+            reverse("request_logs_api"), {"cursor": encode_cursor(log), "limit": 500}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(log.pk, [row["id"] for row in response.data["results"]])
+
+
+class RequestLogExportTestCase(BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        start = timezone.now() - timezone.timedelta(minutes=5)
+        RequestLog.objects.bulk_create(
+            [
+                RequestLog(
+                    timestamp=start + timezone.timedelta(seconds=index),
+                    method="GET",
+                    path_id=RequestPath.objects.get_id(f"/page/{index}/"),
+                    user_agent_id=UserAgent.objects.get_id("agent, with comma"),
+                    user=cls.user if index == 0 else None,
+                    status_code=200,
+                )
+                for index in range(3)
+            ]
+        )
+
+    def export(self, **params):
+        response = self.client.get(reverse("export_logs"), params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_export_streams_filtered_rows_oldest_first(self):
+        response, content = self.export(format="csv", path="/page/")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            [row["path"] for row in rows], ["/page/0/", "/page/1/", "/page/2/"]
+        )
+        self.assertEqual(rows[0]["user_agent"], "agent, with comma")
+        self.assertEqual(rows[0]["user"], self.user.username)
+
+    def test_ndjson_export(self):
+        response, content = self.export(format="ndjson", path="/page/1/")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["path"], "/page/1/")
+        self.assertEqual(records[0]["status_code"], 200)
+
+    @override_settings(AUDIT_EXPORT_MAX_ROWS=2)
+    def test_web_export_is_capped(self):
+        _, content = self.export(format="ndjson", path="/page/")
+
+        self.assertEqual(len(content.splitlines()), 2)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(reverse("export_logs"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_command(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            output = os.path.join(export_dir, "logs.ndjson")
+            call_command(
+                "export_audit_logs",
+                "--format=ndjson",
+                "--path=/page/",
+                "--limit=2",
+                f"--output={output}",
+            )
+            with open(output, encoding="utf-8") as export_file:
+                paths = [json.loads(line)["path"] for line in export_file]
+
+        self.assertEqual(paths, ["/page/0/", "/page/1/"])
+
+    def test_export_command_rejects_invalid_filters(self):
+        with self.assertRaises(CommandError):
+            call_command("export_audit_logs", "--since=yesterday")
+
+
+class LiveTailTestCase(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.broadcaster = RequestLogBroadcaster()
+        patcher = mock.patch.object(self.broadcaster, "_start")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_broadcaster_fans_out_to_every_subscriber(self):
+        first = self.broadcaster.subscribe(Subscription())
+        second = self.broadcaster.subscribe(Subscription(max_size=1))
+        self.broadcaster._start.assert_called()
+
+        self.broadcaster.publish("one")
+        self.broadcaster.publish("two")
+        self.broadcaster.unsubscribe(first)
+        self.broadcaster.publish("three")
+
+        self.assertEqual(
+            [first.get(0), first.get(0), first.get(0)], ["one", "two", None]
+        )
+        self.assertEqual(second.get(0), "one")
+        self.assertEqual(second.dropped, 2)
+
+    @override_settings(AUDIT_LIVE_TAIL_HEARTBEAT=0.01, AUDIT_LIVE_TAIL_MAX_SECONDS=0.5)
+    def test_stream_sends_published_events(self):
+        with mock.patch(
+            "audit.views.get_request_log_broadcaster", return_value=self.broadcaster
+        ):
+            response = self.client.get(reverse("live_tail_stream"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        events = iter(response.streaming_content)
+        self.assertEqual(next(events), b"retry: 3000\n\n")
+        self.assertEqual(next(events), b": keepalive\n\n")
+        self.broadcaster.publish(json.dumps({"id": 7, "path": "/"}))
+        self.assertEqual(
+            next(events),
+            b'id: 7\nevent: request\ndata: {"id": 7, "path": "/"}\n\n',
+        )
+
+        list(events)
+        self.assertFalse(self.broadcaster._subscribers)
+        self.assertFalse(RequestLog.objects.exists())
+
+    @override_settings(AUDIT_LIVE_TAIL_HEARTBEAT=0.01)
+    async def test_stream_reads_from_the_event_loop_under_asgi(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        with mock.patch(
+            "audit.views.get_request_log_broadcaster", return_value=self.broadcaster
+        ):
+            response = await self.async_client.get(reverse("live_tail_stream"))
+
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b"retry: 3000\n\n")
+        self.broadcaster.publish(json.dumps({"id": 8}))
+        self.assertIn(
+            await anext(events),
+            (b": keepalive\n\n", b'id: 8\nevent: request\ndata: {"id": 8}\n\n'),
+        )
+        await events.aclose()
+
+    def test_live_tail_page(self):
+        response = self.client.get(reverse("live_tail"))
+        self.assertContains(response, reverse("live_tail_stream"))
+
+
+class RequestLogNotifyTestCase(TransactionTestCase):
+    def tearDown(self):
+        clear_dimension_caches()
+
+    @mock.patch("audit.live.LISTENER_CHECK_INTERVAL", 0)
+    def test_stored_rows_reach_subscribers(self):
+        broadcaster = RequestLogBroadcaster(reconnect_delay=0.1)
+        subscription = broadcaster.subscribe(Subscription())
+        thread = broadcaster._thread
+        try:
+            self.assertTrue(broadcaster.listening.wait(5))
+            self.assertTrue(has_listeners())
+            logs = RequestLog.objects.bulk_create(
+                [to_request_log(make_record(path=f"/notified/{i}/")) for i in range(80)]
+            )
+            notify_request_logs(logs)
+            payloads = [subscription.get(timeout=5) for _ in logs]
+        finally:
+            broadcaster.unsubscribe(subscription)
+            thread.join(5)
+
+        self.assertEqual(
+            [json.loads(payload)["path"] for payload in payloads],
+            [f"/notified/{i}/" for i in range(80)],
+        )
+        self.assertFalse(thread.is_alive())
+
+    @mock.patch("audit.live.LISTENER_CHECK_INTERVAL", 0)
+    def test_nothing_is_sent_without_listeners(self):
+        log = to_request_log(make_record())
+        log.save()
+
+        with mock.patch("audit.live._payloads") as payloads:
+            notify_request_logs([log])
+
+        self.assertFalse(has_listeners())
+        payloads.assert_not_called()
+
+
+class RequestRollupTestCase(BaseTest):
+    def test_rollups_group_by_minute_and_normalized_path(self):
+        minute = timezone.now().replace(second=0, microsecond=0)
+        RequestLog.objects.bulk_create(
+            [
+                RequestLog(
+                    timestamp=minute + timezone.timedelta(seconds=index),
+                    method="GET",
+                    path_id=RequestPath.objects.get_id(f"/cv/{index}/"),
+                    status_code=200,
+                    duration_ms=20,
+                    user=self.user,
+                )
+                for index in range(3)
+            ]
+            + [
+                RequestLog(
+                    timestamp=minute,
+                    method="GET",
+                    path_id=RequestPath.objects.get_id("/cv/9/"),
+                    status_code=404,
+                )
+            ]
+        )
+
+        self.assertEqual(update_rollups(lag=0), 4)
+
+        rollups = RequestRollup.objects.order_by("status_class")
+        self.assertEqual(
+            [(r.path, r.status_class, r.requests, r.user_id) for r in rollups],
+            [("/cv/<id>/", 2, 3, self.user.pk), ("/cv/<id>/", 4, 1, None)],
+        )
+        self.assertEqual(rollups[0].timed_requests, 3)
+        self.assertEqual(rollups[0].duration_sum_ms, 60)
+        self.assertEqual(rollups[0].latency_histogram[1], 3)
+        self.assertEqual(rollups[1].timed_requests, 0)
+
+    def test_rollups_only_process_rows_past_the_watermark(self):
+        minute = timezone.now().replace(second=0, microsecond=0)
+        RequestLog.objects.create(
+            timestamp=minute,
+            method="GET",
+            path_id=RequestPath.objects.get_id("/"),
+            status_code=200,
+        )
+        self.assertEqual(update_rollups(lag=0), 1)
+        self.assertEqual(update_rollups(lag=0), 0)
+
+        RequestLog.objects.create(
+            timestamp=minute,
+            method="GET",
+            path_id=RequestPath.objects.get_id("/"),
+            status_code=200,
+        )
+        self.assertEqual(update_rollups(lag=0), 1)
+
+        rollup = RequestRollup.objects.get()
+        self.assertEqual(rollup.requests, 2)
+        self.assertEqual(
+            RollupWatermark.objects.get().last_id, RequestLog.objects.latest("id").id
+        )
+
+    def test_rollups_wait_for_rows_inserted_within_the_lag(self):
+        # Buffered and streamed rows arrive with request timestamps already
+        # older than the lag; only their insert time counts.
+        long_ago = timezone.now() - timezone.timedelta(minutes=5)
+        old, recent, late = [
+            RequestLog.objects.create(
+                timestamp=long_ago,
+                method="GET",
+                path_id=RequestPath.objects.get_id("/"),
+                status_code=200,
+            )
+            for _ in range(3)
+        ]
+        RequestLog.objects.filter(id__in=[old.id, late.id]).update(created_at=long_ago)
+
+        self.assertEqual(update_rollups(lag=60), 1)
+        self.assertEqual(RollupWatermark.objects.get().last_id, old.id)
+
+        RequestLog.objects.filter(id=recent.id).update(
+            created_at=timezone.now() - timezone.timedelta(minutes=2)
+        )
+        self.assertEqual(update_rollups(lag=60), 2)
+        self.assertEqual(RollupWatermark.objects.get().last_id, late.id)
+
+    def test_rollups_of_anonymous_requests_share_a_bucket(self):
+        minute = timezone.now().replace(second=0, microsecond=0)
+        RequestRollup.objects.create(minute=minute, method="GET", path="/")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RequestRollup.objects.create(minute=minute, method="GET", path="/")
+
+    def test_normalize_path(self):
+        self.assertEqual(
+            normalize_path("/cv/12/download-pdf/"), "/cv/<id>/download-pdf/"
+        )
+        self.assertEqual(
+            normalize_path("/api/x/6f1c1e2a-8a5b-4c9a-9d7e-0a1b2c3d4e5f"),
+            "/api/x/<id>",
+        )
+        self.assertEqual(normalize_path("/audit/logs/"), "/audit/logs/")
+
+
+class LatencyDashboardTestCase(BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        RequestLog.objects.bulk_create(
+            [
+                RequestLog(
+                    method="GET",
+                    path_id=RequestPath.objects.get_id("/slow/"),
+                    duration_ms=duration,
+                )
+                for duration in range(1, 101)
+            ]
+            + [
+                RequestLog(
+                    method="GET",
+                    path_id=RequestPath.objects.get_id("/fast/"),
+                    duration_ms=1,
+                )
+                for _ in range(3)
+            ]
+            + [
+                RequestLog(
+                    method="GET", path_id=RequestPath.objects.get_id("/untimed/")
+                )
+            ]
+        )
+        update_rollups(lag=0)
+
+    def test_latency_by_path_percentiles(self):
+        rows = {
+            row["path"]: row for row in latency_by_path(RequestRollup.objects.all())
+        }
+
+        self.assertEqual(set(rows), {"/slow/", "/fast/"})
+        self.assertEqual(rows["/slow/"]["requests"], 100)
+        self.assertAlmostEqual(rows["/slow/"]["average"], 50.5)
+        self.assertAlmostEqual(rows["/slow/"]["p50"], 50)
+        self.assertAlmostEqual(rows["/slow/"]["p95"], 95)
+        self.assertAlmostEqual(rows["/slow/"]["p99"], 99)
+        self.assertAlmostEqual(rows["/fast/"]["p99"], 9.9)
+
+    def test_dashboard_lists_slowest_paths_first(self):
+        response = self.client.get(reverse("latency_dashboard"), {"hours": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["path"] for row in response.context["rows"]], ["/slow/", "/fast/"]
+        )
+
+    def test_log_browser_shows_traffic_summary(self):
+        response = self.client.get(reverse("recent_logs"))
+        self.assertEqual(response.context["traffic"], {"other": 104})
@@ -0,0 +1,24 @@
+import time
+
+
+class QueryTimer:
+    """
+    Database execute wrapper (see ``connection.execute_wrapper``) counting the
+    queries run while it is installed and the time they took.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
@@ -6,4 +6,17 @@ from . import views
 
 urlpatterns = [
     path(LOGS_BASE_URL, views.recent_logs, name="recent_logs"),
+    path(
+        f"{LOGS_BASE_URL}api/",
+        views.RequestLogListAPIView.as_view(),
+        name="request_logs_api",
+    ),
+    path(f"{LOGS_BASE_URL}export/", views.export_logs, name="export_logs"),
+    path(f"{LOGS_BASE_URL}live/", views.live_tail, name="live_tail"),
+    path(
+        f"{LOGS_BASE_URL}live/stream/",
+        views.live_tail_stream,
+        name="live_tail_stream",
+    ),
+    path(f"{LOGS_BASE_URL}latency/", views.latency_dashboard, name="latency_dashboard"),
 ]
@@ -1,21 +1,265 @@
+import json
+import time
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from CVProject.constants import AUDIT_BASE_URL, SETTINGS_BASE_URL
 
-from .models import RequestLog
+from .export import EXPORT_FORMATS, iter_export
+from .forms import LatencyFilterForm, RequestLogFilterForm
+from .live import AsyncSubscription, Subscription, get_request_log_broadcaster
+from .models import RequestRollup
+from .queries import filter_request_logs, paginate_request_logs
+from .rollups import latency_by_path, traffic_by_status_class
+from .serializers import RequestLogSerializer
+
+LOGS_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+LATENCY_DEFAULT_HOURS = 24
+TRAFFIC_SUMMARY_MINUTES = 60
+LIVE_TAIL_ROWS = 100
+LIVE_TAIL_RETRY_MS = 3000
 
 
 @login_required
 def recent_logs(request):
-    logs = RequestLog.objects.order_by("-timestamp")[:10]
+    form = RequestLogFilterForm(request.GET)
+    logs, next_page_query = [], None
+    first_page_query = request.GET.copy()
+    first_page_query.pop("cursor", None)
+    export_query = first_page_query.copy()
+    if form.is_valid():
+        logs, next_cursor = paginate_request_logs(
+            filter_request_logs(form.cleaned_data),
+            cursor=form.cleaned_data["cursor"],
+            page_size=LOGS_PAGE_SIZE,
+        )
+        if next_cursor:
+            query = request.GET.copy()
+            query["cursor"] = next_cursor
+            next_page_query = query.urlencode()
+
+    traffic = traffic_by_status_class(
+        RequestRollup.objects.filter(
+            minute__gte=timezone.now()
+            - timezone.timedelta(minutes=TRAFFIC_SUMMARY_MINUTES)
+        )
+    )
+
     context = {
-        "title": "Recent Request Logs",
+        "title": "Request Logs",
+        "form": form,
         "logs": logs,
+        "traffic": traffic,
+        "traffic_title": f"Requests in the last {TRAFFIC_SUMMARY_MINUTES} minutes",
+        "next_page_query": next_page_query,
+        "first_page_query": (
+            first_page_query.urlencode() if "cursor" in request.GET else None
+        ),
+        "export_query": export_query.urlencode(),
+        "export_formats": list(EXPORT_FORMATS),
+        "export_btn_title": "Export",
         "home_btn_title": "< Home",
         "settings_url": f"/{SETTINGS_BASE_URL}",
+        "latency_url": reverse("latency_dashboard"),
+        "latency_btn_title": "Latency",
+        "live_tail_url": reverse("live_tail"),
+        "live_tail_btn_title": "Live tail",
+        "filter_btn_title": "Filter",
+        "reset_btn_title": "Reset",
+        "newest_btn_title": "Newest",
+        "older_btn_title": "Older >",
+        "no_logs_message": "No request logs match these filters.",
         "column_one_title": "Timestamp",
         "column_two_title": "Method",
         "column_three_title": "Path",
+        "column_four_title": "User",
+        "column_five_title": "IP",
+        "column_six_title": "Status",
+        "column_seven_title": "Duration (ms)",
+        "column_eight_title": "Queries",
+        "column_nine_title": "Size (bytes)",
     }
     return render(request, f"{AUDIT_BASE_URL}recent_logs.html", context)
+
+
+@login_required
+def latency_dashboard(request):
+    form = LatencyFilterForm(request.GET)
+    rows = []
+    if form.is_valid():
+        hours = form.cleaned_data["hours"] or LATENCY_DEFAULT_HOURS
+        rollups = RequestRollup.objects.filter(
+            minute__gte=timezone.now() - timezone.timedelta(hours=hours)
+        )
+        if form.cleaned_data["path"]:
+            rollups = rollups.filter(path__startswith=form.cleaned_data["path"])
+        rows = latency_by_path(rollups)
+
+    context = {
+        "title": "Request Latency",
+        "form": form,
+        "rows": rows,
+        "home_btn_title": "< Home",
+        "audit_logs_url": reverse("recent_logs"),
+        "audit_logs_btn_title": "Request logs",
+        "settings_url": f"/{SETTINGS_BASE_URL}",
+        "filter_btn_title": "Show",
+        "no_rows_message": "No timed requests in this window.",
+        "column_one_title": "Path",
+        "column_two_title": "Requests",
+        "column_three_title": "Avg (ms)",
+        "column_four_title": "p50 (ms)",
+        "column_five_title": "p95 (ms)",
+        "column_six_title": "p99 (ms)",
+    }
+    return render(request, f"{AUDIT_BASE_URL}latency.html", context)
+
+
+@login_required
+def export_logs(request):
+    """
+    Stream the logs matching the browser filters as CSV or NDJSON, oldest
+    first, capped at AUDIT_EXPORT_MAX_ROWS rows; larger extracts go through
+    the ``export_audit_logs`` management command.
+    """
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest(f"Unknown export format {export_format!r}.")
+    form = RequestLogFilterForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+
+    response = StreamingHttpResponse(
+        iter_export(
+            filter_request_logs(form.cleaned_data),
+            export_format,
+            chunk_size=settings.AUDIT_EXPORT_CHUNK_SIZE,
+            max_rows=settings.AUDIT_EXPORT_MAX_ROWS,
+        ),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    filename = f"request-logs-{timezone.now():%Y%m%dT%H%M%S}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["X-Export-Row-Limit"] = str(settings.AUDIT_EXPORT_MAX_ROWS)
+    return response
+
+
+@login_required
+def live_tail(request):
+    context = {
+        "title": "Live Request Tail",
+        "stream_url": reverse("live_tail_stream"),
+        "max_rows": LIVE_TAIL_ROWS,
+        "home_btn_title": "< Home",
+        "audit_logs_url": reverse("recent_logs"),
+        "audit_logs_btn_title": "Request logs",
+        "settings_url": f"/{SETTINGS_BASE_URL}",
+        "waiting_message": "Waiting for requests...",
+        "column_one_title": "Timestamp",
+        "column_two_title": "Method",
+        "column_three_title": "Path",
+        "column_four_title": "User",
+        "column_five_title": "IP",
+        "column_six_title": "Status",
+        "column_seven_title": "Duration (ms)",
+    }
+    return render(request, f"{AUDIT_BASE_URL}live_tail.html", context)
+
+
+def _sse_event(payload):
+    event_id = json.loads(payload).get("id", "")
+    return f"id: {event_id}\nevent: request\ndata: {payload}\n\n"
+
+
+def _sync_tail_events(broadcaster, heartbeat, lifetime):
+    subscription = broadcaster.subscribe(Subscription())
+    try:
+        yield f"retry: {LIVE_TAIL_RETRY_MS}\n\n"
+        deadline = time.monotonic() + lifetime
+        while time.monotonic() < deadline:
+            payload = subscription.get(timeout=heartbeat)
+            yield ": keepalive\n\n" if payload is None else _sse_event(payload)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+async def _async_tail_events(broadcaster, heartbeat, lifetime):
+    subscription = broadcaster.subscribe(AsyncSubscription())
+    try:
+        yield f"retry: {LIVE_TAIL_RETRY_MS}\n\n"
+        deadline = time.monotonic() + lifetime
+        while time.monotonic() < deadline:
+            payload = await subscription.get(timeout=heartbeat)
+            yield ": keepalive\n\n" if payload is None else _sse_event(payload)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@login_required
+def live_tail_stream(request):
+    """
+    Server-Sent Events feed of new request logs.
+
+    Under ASGI the events are read from the event loop, so an open tail holds
+    no worker thread; under WSGI each open tail holds one. Either way the
+    stream ends after AUDIT_LIVE_TAIL_MAX_SECONDS and the browser reconnects,
+    which bounds streams whose client went away unnoticed.
+    """
+    events = (
+        _async_tail_events if isinstance(request, ASGIRequest) else _sync_tail_events
+    )
+    response = StreamingHttpResponse(
+        events(
+            get_request_log_broadcaster(),
+            settings.AUDIT_LIVE_TAIL_HEARTBEAT,
+            settings.AUDIT_LIVE_TAIL_MAX_SECONDS,
+        ),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class RequestLogListAPIView(APIView):
+    """
+    JSON variant of the log browser. Accepts the same filters plus ``limit``,
+    and returns ``next_cursor`` to pass back as ``cursor`` for the next page.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        form = RequestLogFilterForm(request.query_params)
+        if not form.is_valid():
+            return Response(form.errors, status=400)
+
+        try:
+            limit = min(
+                int(request.query_params.get("limit", LOGS_PAGE_SIZE)),
+                API_MAX_PAGE_SIZE,
+            )
+        except ValueError:
+            return Response({"limit": ["Enter a whole number."]}, status=400)
+
+        logs, next_cursor = paginate_request_logs(
+            filter_request_logs(form.cleaned_data),
+            cursor=form.cleaned_data["cursor"],
+            page_size=max(limit, 1),
+        )
+        return Response(
+            {
+                "results": RequestLogSerializer(logs, many=True).data,
+                "next_cursor": next_cursor,
+            }
+        )
@@ -7,8 +7,11 @@ from .models import (
     CandidateSkill,
     Contact,
     ContactType,
+    CVTranslation,
     Project,
+    ProjectTranslation,
     Skill,
+    TranslationUnit,
 )
 
 admin.site.register(Candidate)
@@ -19,3 +22,6 @@ admin.site.register(ContactType)
 admin.site.register(Contact)
 admin.site.register(CandidateSkill)
 admin.site.register(CandidateProject)
+admin.site.register(CVTranslation)
+admin.site.register(TranslationUnit)
+admin.site.register(ProjectTranslation)
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.pdf.export import export_candidates, iter_cv_archive
+from main.views.helpers import _get_languages
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a ZIP archive of the CV PDFs of the selected candidates (all of "
+        "them by default), reusing cached PDFs and rendering the others in "
+        "parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="ZIP file to write.")
+        parser.add_argument(
+            "--id",
+            type=int,
+            action="append",
+            dest="ids",
+            help="Candidate id (repeatable).",
+        )
+        parser.add_argument("--search", help="Words of the candidate's name.")
+        parser.add_argument("--skill", help="Skill name.")
+        parser.add_argument("--language", help="Translate the CVs into this language.")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.PDF_EXPORT_CONCURRENCY,
+            help="Number of PDFs rendered at the same time.",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+        if options["language"] and options["language"] not in _get_languages():
+            raise CommandError(f"Unsupported language: {options['language']}.")
+
+        candidate_ids = list(
+            export_candidates(
+                options["ids"], options["search"], options["skill"]
+            ).values_list("pk", flat=True)
+        )
+        if not candidate_ids:
+            raise CommandError("No candidates match.")
+
+        with open(options["output"], "wb") as output:
+            for chunk in iter_cv_archive(
+                candidate_ids, options["language"], options["concurrency"]
+            ):
+                output.write(chunk)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {len(candidate_ids)} CV(s) to {options['output']}."
+            )
+        )
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from main.models import Candidate
+from main.translation.prewarm import warm_translations
+from main.views.helpers import _get_languages
+
+
+class Command(BaseCommand):
+    help = (
+        "Translate the CVs of all candidates into every translating language, "
+        "candidate by candidate in ascending id order. Translations that are "
+        "already cached are skipped, so an interrupted run can simply be "
+        "started again (or resumed with --start-after)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            action="append",
+            dest="languages",
+            help="Language name (repeatable; defaults to TRANSLATING_LANGUAGES).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.TRANSLATION_PREWARM_CONCURRENCY,
+            help="Number of candidates translated at the same time.",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="Skip candidates with an id up to and including this one.",
+        )
+
+    def warm(self, candidate_id, languages):
+        try:
+            return warm_translations(candidate_id, languages)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        languages = options["languages"] or _get_languages()
+        candidate_ids = list(
+            Candidate.objects.filter(pk__gt=options["start_after"])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        if options["concurrency"] == 1:
+            results = (
+                warm_translations(candidate_id, languages)
+                for candidate_id in candidate_ids
+            )
+            self.report(candidate_ids, results)
+        else:
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+                results = executor.map(
+                    self.warm, candidate_ids, [languages] * len(candidate_ids)
+                )
+                self.report(candidate_ids, results)
+
+    def report(self, candidate_ids, results):
+        failures = 0
+        for candidate_id, failed in zip(candidate_ids, results):
+            failures += len(failed)
+            status = f", failed: {', '.join(failed)}" if failed else ""
+            self.stdout.write(f"Candidate {candidate_id} done{status}")
+
+        if failures:
+            raise CommandError(
+                f"{failures} translation(s) failed; run the command again to retry."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Translated {len(candidate_ids)} candidate CV(s).")
+        )
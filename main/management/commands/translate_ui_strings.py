@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.translation.catalogs import (
+    has_same_placeholders,
+    language_code,
+    read_catalog,
+    write_catalog,
+)
+from main.translation.client import TranslationUnavailable
+from main.views.helpers import (
+    CV_DETAIL_UI_STRINGS,
+    _get_languages,
+    translate_units_in_chunks,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Translate the CV page labels into every translating language and "
+        "write them to gettext catalogs in LOCALE_PATHS. Labels already in a "
+        "catalog are kept unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            action="append",
+            dest="languages",
+            help="Language name (repeatable; defaults to TRANSLATING_LANGUAGES).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Translate every label again.",
+        )
+
+    def handle(self, *args, **options):
+        msgids = sorted(set(CV_DETAIL_UI_STRINGS.values()))
+        failed = []
+
+        for language in options["languages"] or _get_languages():
+            existing = {} if options["force"] else read_catalog(language, msgids)
+            missing = [msgid for msgid in msgids if msgid not in existing]
+            translated = {}
+            if missing:
+                try:
+                    reply = translate_units_in_chunks(
+                        language, {msgid: msgid for msgid in missing}
+                    )
+                except TranslationUnavailable as e:
+                    self.stderr.write(f"{language}: {str(e)}")
+                    failed.append(language)
+                    continue
+                translated = {
+                    msgid: reply[msgid]
+                    for msgid in missing
+                    if isinstance(reply.get(msgid), str)
+                    and has_same_placeholders(msgid, reply[msgid])
+                }
+
+            directory = write_catalog(language, {**existing, **translated})
+            self.stdout.write(
+                f"{language} ({language_code(language)}): "
+                f"{len(existing) + len(translated)}/{len(msgids)} labels, "
+                f"{len(translated)} newly translated, written to {directory}"
+            )
+
+        if failed:
+            raise CommandError(f"Translation failed for: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("UI catalogs are up to date."))
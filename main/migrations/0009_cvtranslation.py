@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0008_alter_project_project_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CVTranslation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("language", models.CharField(max_length=100)),
+                ("content_hash", models.CharField(max_length=64)),
+                ("data", models.JSONField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "candidate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="translations",
+                        to="main.candidate",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="cvtranslation",
+            constraint=models.UniqueConstraint(
+                fields=("candidate", "language"), name="main_cv_translation_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0009_cvtranslation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TranslationUnit",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=100)),
+                ("language", models.CharField(max_length=100)),
+                ("source_hash", models.CharField(max_length=64)),
+                ("translation", models.JSONField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "candidate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="translation_units",
+                        to="main.candidate",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="translationunit",
+            constraint=models.UniqueConstraint(
+                fields=("candidate", "key", "language"),
+                name="main_translation_unit_unique",
+            ),
+        ),
+    ]
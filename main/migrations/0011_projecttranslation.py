@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_project_units(apps, schema_editor):
+    # Project translations are now shared in ProjectTranslation.
+    TranslationUnit = apps.get_model("main", "TranslationUnit")
+    TranslationUnit.objects.filter(key__startswith="project:").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0010_translationunit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectTranslation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("language", models.CharField(max_length=100)),
+                ("source_hash", models.CharField(max_length=64)),
+                ("project_name", models.TextField()),
+                ("project_description", models.TextField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="translations",
+                        to="main.project",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="projecttranslation",
+            constraint=models.UniqueConstraint(
+                fields=("project", "language"), name="main_project_translation_unique"
+            ),
+        ),
+        migrations.RunPython(delete_project_units, migrations.RunPython.noop),
+    ]
@@ -81,3 +81,80 @@ class Contact(models.Model):
             f"{self.contact_type.contact_type}: {self.contact} "
             f"({self.candidate.first_name} {self.candidate.last_name})"
         )
+
+
+class CVTranslation(models.Model):
+    """Translated CV content of a candidate, for the payload with ``content_hash``."""
+
+    candidate = models.ForeignKey(
+        Candidate, on_delete=models.CASCADE, related_name="translations"
+    )
+    language = models.CharField(max_length=100)
+    content_hash = models.CharField(max_length=64)
+    data = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["candidate", "language"], name="main_cv_translation_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.candidate} ({self.language})"
+
+
+class TranslationUnit(models.Model):
+    """
+    One translated piece of a candidate's CV (a text field or a project),
+    valid while the source still hashes to ``source_hash``.
+    """
+
+    candidate = models.ForeignKey(
+        Candidate, on_delete=models.CASCADE, related_name="translation_units"
+    )
+    key = models.CharField(max_length=100)
+    language = models.CharField(max_length=100)
+    source_hash = models.CharField(max_length=64)
+    translation = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["candidate", "key", "language"],
+                name="main_translation_unit_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.candidate} {self.key} ({self.language})"
+
+
+class ProjectTranslation(models.Model):
+    """
+    A project's name and description in one language, shared by every
+    candidate listing the project and valid while the source still hashes to
+    ``source_hash``.
+    """
+
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="translations"
+    )
+    language = models.CharField(max_length=100)
+    source_hash = models.CharField(max_length=64)
+    project_name = models.TextField()
+    project_description = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "language"],
+                name="main_project_translation_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.project} ({self.language})"
@@ -0,0 +1 @@
+"""Rendering and caching of candidate CV PDFs (see ``main.views.helpers``)."""
@@ -0,0 +1,218 @@
+"""
+Cache of rendered CV PDFs.
+
+A PDF is stored under ``<candidate id>/<language>-<version>.pdf`` in the
+``PDF_CACHE_STORAGE`` storage (a directory on the local filesystem by
+default). The version hashes everything the document shows (the candidate's
+content as translated, the labels) together with ``PDF_TEMPLATE_VERSION``,
+so an edit or a template change yields a new file name and a stale PDF is
+never served; the signals in ``main.signals`` also delete the files of a
+candidate whose data changed. The version doubles as the strong ETag of the
+download.
+
+The cache is kept under ``PDF_CACHE_MAX_BYTES`` by evicting the least
+recently used files: a hit refreshes the modification time of the file
+(on storages exposing local paths) and eviction removes the oldest first.
+The total size is counted in the shared cache as files are stored and
+deleted, so the storage is only walked once the count crosses the limit
+(and again whenever the count is lost, or on every store while the shared
+cache is unavailable). A file evicted between its lookup
+and its read is treated as a miss and rendered again.
+"""
+
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse
+from django.utils.module_loading import import_string
+
+from main.translation.cache import content_hash
+from main.translation.catalogs import language_code
+
+logger = logging.getLogger(__name__)
+
+# Shared cache key counting the bytes of the cached PDFs.
+SIZE_KEY = "pdf-cache:bytes"
+
+
+def get_pdf_storage():
+    return import_string(settings.PDF_CACHE_STORAGE)(location=settings.PDF_CACHE_DIR)
+
+
+def _project_content(project):
+    if isinstance(project, dict):
+        return project
+    return {
+        "project_name": project.project_name,
+        "project_description": project.project_description,
+    }
+
+
+def pdf_version(cv_detail_context, selected_language=None):
+    """Hash of everything the PDF of ``cv_detail_context`` is rendered from."""
+    # main.views.helpers imports this module.
+    from main.views.helpers import CV_DETAIL_UI_STRINGS
+
+    candidate = cv_detail_context["candidate"]
+    document = {
+        "template": settings.PDF_TEMPLATE_VERSION,
+        "language": selected_language or None,
+        "name": [candidate.first_name, candidate.last_name],
+        "bio": cv_detail_context.get("bio"),
+        "skills": [skill["skill_name"] for skill in cv_detail_context["skills"]],
+        "projects": [
+            _project_content(project) for project in cv_detail_context["projects"]
+        ],
+        "contacts": [
+            [contact.contact_type.contact_type, contact.contact]
+            for contact in cv_detail_context["contacts"]
+        ],
+        "labels": {key: cv_detail_context.get(key) for key in CV_DETAIL_UI_STRINGS},
+    }
+    return content_hash(document)
+
+
+def pdf_cache_name(candidate_id, version, selected_language=None):
+    language = language_code(selected_language) if selected_language else "default"
+    return f"{candidate_id}/{language}-{version}.pdf"
+
+
+def _touch(storage, name):
+    try:
+        os.utime(storage.path(name))
+    except (NotImplementedError, FileNotFoundError):
+        pass
+
+
+def get_cached_pdf(name):
+    """Whether the PDF ``name`` is cached; marks it as recently used."""
+    storage = get_pdf_storage()
+    if not storage.exists(name):
+        return False
+    _touch(storage, name)
+    return True
+
+
+def read_cached_pdf(name):
+    """The cached PDF ``name``, or None on a miss; marks it as recently used."""
+    storage = get_pdf_storage()
+    try:
+        with storage.open(name) as pdf_file:
+            content = pdf_file.read()
+    except FileNotFoundError:
+        return None
+    _touch(storage, name)
+    return content
+
+
+def _set_bytes(total):
+    try:
+        caches["shared"].set(SIZE_KEY, total, timeout=None)
+    except Exception as e:
+        logger.warning(f"Failed to store the PDF cache size: {str(e)}")
+
+
+def _count_bytes(delta):
+    """
+    Add ``delta`` to the size of the cache; return the new size, or None if
+    the shared cache is unavailable.
+    """
+    try:
+        return caches["shared"].incr(SIZE_KEY, delta)
+    except ValueError:
+        total = sum(size for _, size, _ in _cached_files(get_pdf_storage()))
+        _set_bytes(total)
+        return total
+    except Exception as e:
+        logger.warning(f"Failed to count the PDF cache size: {str(e)}")
+        return None
+
+
+def store_pdf(name, content):
+    storage = get_pdf_storage()
+    if storage.exists(name):
+        return
+    saved_name = storage.save(name, ContentFile(content))
+    if saved_name != name:
+        # Another worker stored the same PDF meanwhile.
+        storage.delete(saved_name)
+        return
+    total = _count_bytes(len(content))
+    if total is None or total > settings.PDF_CACHE_MAX_BYTES:
+        evict_pdfs(keep=name)
+
+
+def _cached_files(storage):
+    if not storage.exists(""):
+        return
+    for directory in storage.listdir("")[0]:
+        for file_name in storage.listdir(directory)[1]:
+            name = f"{directory}/{file_name}"
+            try:
+                yield storage.get_modified_time(name), storage.size(name), name
+            except FileNotFoundError:
+                continue
+
+
+def evict_pdfs(keep=None, max_bytes=None):
+    """Delete the least recently used PDFs until the cache fits ``max_bytes``."""
+    if max_bytes is None:
+        max_bytes = settings.PDF_CACHE_MAX_BYTES
+    storage = get_pdf_storage()
+    files = sorted(_cached_files(storage))
+    total_size = sum(size for _, size, _ in files)
+    for _, size, name in files:
+        if total_size <= max_bytes:
+            break
+        if name == keep:
+            continue
+        storage.delete(name)
+        total_size -= size
+        logger.debug(f"Evicted cached PDF {name}")
+    _set_bytes(total_size)
+
+
+def invalidate_candidate_pdfs(candidate_ids):
+    """Delete the cached PDFs of ``candidate_ids``."""
+    storage = get_pdf_storage()
+    freed = 0
+    for candidate_id in set(candidate_ids):
+        try:
+            file_names = storage.listdir(str(candidate_id))[1]
+        except FileNotFoundError:
+            continue
+        for file_name in file_names:
+            name = f"{candidate_id}/{file_name}"
+            try:
+                freed += storage.size(name)
+            except FileNotFoundError:
+                continue
+            storage.delete(name)
+    if freed:
+        _count_bytes(-freed)
+
+
+def cached_pdf_response(name, filename, etag):
+    """
+    Serve the cached PDF ``name``: handed to the web server through
+    ``X-Accel-Redirect`` or ``X-Sendfile`` when ``PDF_CACHE_SENDFILE`` says
+    so, streamed from the storage otherwise. Raises FileNotFoundError if the
+    file is gone.
+    """
+    if settings.PDF_CACHE_SENDFILE == "x-accel-redirect":
+        response = HttpResponse(content_type="application/pdf")
+        response["X-Accel-Redirect"] = f"{settings.PDF_CACHE_SENDFILE_URL}{name}"
+    elif settings.PDF_CACHE_SENDFILE == "x-sendfile":
+        response = HttpResponse(content_type="application/pdf")
+        response["X-Sendfile"] = get_pdf_storage().path(name)
+    else:
+        response = FileResponse(
+            get_pdf_storage().open(name), content_type="application/pdf"
+        )
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,129 @@
+"""
+Bulk export of CV PDFs as a ZIP archive streamed while it is built.
+
+Up to ``PDF_EXPORT_CONCURRENCY`` threads each build the CV of a candidate,
+translation included, and take its PDF from the cache (see
+``main.pdf.cache``) or hand the print HTML to the render pool. Each PDF is
+written to the archive as soon as it is ready and the bytes are yielded
+right away, so the download starts early and memory holds at most the PDFs
+in flight. Candidates that could not be exported, whatever the error, are
+listed in ``errors.txt`` at the end of the archive.
+"""
+
+import logging
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.text import get_valid_filename
+
+from main.models import Candidate
+from main.views.helpers import process_cv_context, read_candidate_pdf
+
+logger = logging.getLogger(__name__)
+
+
+class ZipStream:
+    """Unseekable file-like object collecting what ZipFile writes."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def take(self):
+        """Return and forget what was written since the last call."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_candidates(ids=None, search=None, skill=None):
+    """Candidates to export: the given ids and/or a name or skill filter."""
+    candidates = Candidate.objects.order_by("pk")
+    if ids:
+        candidates = candidates.filter(pk__in=ids)
+    if search:
+        for term in search.split():
+            candidates = candidates.filter(
+                Q(first_name__icontains=term) | Q(last_name__icontains=term)
+            )
+    if skill:
+        candidates = candidates.filter(
+            candidate_skills__skill__skill_name__iexact=skill
+        )
+    return candidates.distinct()
+
+
+def _filename(candidate):
+    return get_valid_filename(
+        f"{candidate.pk}_{candidate.first_name}_{candidate.last_name}_CV.pdf"
+    )
+
+
+def _export_pdf(candidate_id, language):
+    """Build the CV of ``candidate_id``; return its file name and PDF."""
+    try:
+        cv_detail_context = process_cv_context(candidate_id, language)
+        return (
+            _filename(cv_detail_context["candidate"]),
+            read_candidate_pdf(cv_detail_context, language),
+        )
+    finally:
+        # Export threads open database connections of their own.
+        connections.close_all()
+
+
+def iter_cv_archive(candidate_ids, language=None, concurrency=None):
+    """Yield the bytes of a ZIP archive of the CV PDFs of ``candidate_ids``."""
+    concurrency = concurrency or settings.PDF_EXPORT_CONCURRENCY
+    stream = ZipStream()
+    archive = zipfile.ZipFile(stream, "w", zipfile.ZIP_STORED)
+    errors = []
+    exporting = {}
+
+    def write(done):
+        for future in done:
+            candidate_id = exporting.pop(future)
+            try:
+                filename, pdf = future.result()
+            except Http404:
+                errors.append(f"Candidate {candidate_id}: not found")
+                continue
+            except Exception as e:
+                logger.error(f"Failed to export CV {candidate_id}: {str(e)}")
+                errors.append(f"Candidate {candidate_id}: {str(e)}")
+                continue
+            archive.writestr(filename, pdf)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for candidate_id in candidate_ids:
+            future = executor.submit(_export_pdf, candidate_id, language)
+            exporting[future] = candidate_id
+            if len(exporting) >= concurrency:
+                done, _ = wait(exporting, return_when=FIRST_COMPLETED)
+                write(done)
+                yield stream.take()
+
+        while exporting:
+            done, _ = wait(exporting, return_when=FIRST_COMPLETED)
+            write(done)
+            yield stream.take()
+
+    if errors:
+        archive.writestr("errors.txt", "\n".join(errors) + "\n")
+    archive.close()
+    yield stream.take()
@@ -0,0 +1,75 @@
+"""
+Background rendering of the PDFs of CVs whose data changed.
+
+The signals in ``main.signals`` call ``schedule_prerender`` after a change
+to a candidate or anything shown on their CV. The first change schedules a
+Celery task ``PDF_PRERENDER_DELAY`` seconds ahead and marks the candidate in
+the shared cache, which every web and Celery process sees; later changes
+find the mark and are picked up by the same task, which clears the mark
+when it starts and renders the PDF in the default language and in
+``PDF_PRERENDER_LANGUAGES`` into the PDF cache, so downloads find a ready
+file.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from main.models import Candidate
+from main.views.helpers import candidate_pdf, process_cv_context
+
+logger = logging.getLogger(__name__)
+
+
+def _debounce_key(candidate_id):
+    return f"pdf-prerender:{candidate_id}"
+
+
+def schedule_prerender(candidate_ids):
+    """Schedule a PDF render of each candidate unless one is pending."""
+    if not settings.PDF_PRERENDER:
+        return
+    # main.tasks imports this module.
+    from main.tasks import prerender_candidate_pdfs
+
+    for candidate_id in set(candidate_ids):
+        if caches["shared"].add(
+            _debounce_key(candidate_id),
+            True,
+            timeout=settings.PDF_PRERENDER_DELAY * 10,
+        ):
+            transaction.on_commit(
+                lambda candidate_id=candidate_id: (
+                    prerender_candidate_pdfs.apply_async(
+                        (candidate_id,), countdown=settings.PDF_PRERENDER_DELAY
+                    )
+                )
+            )
+
+
+def clear_pending_prerender(candidate_id):
+    caches["shared"].delete(_debounce_key(candidate_id))
+
+
+def prerender_pdfs(candidate_id, languages):
+    """
+    Render and cache the PDF of a candidate's CV in each of ``languages``
+    (None being the untranslated CV); return the languages that failed, for
+    whatever reason, after trying all of them.
+    """
+    if not Candidate.objects.filter(pk=candidate_id).exists():
+        return []
+
+    failed = []
+    for language in languages:
+        try:
+            candidate_pdf(process_cv_context(candidate_id, language), language)
+        except Exception as e:
+            logger.error(
+                f"Failed to pre-render the PDF of CV {candidate_id} "
+                f"({language or 'default'}): {str(e)}"
+            )
+            failed.append(language)
+    return failed
@@ -0,0 +1,170 @@
+"""
+Pool of warm WeasyPrint processes rendering the CV PDFs.
+
+Web workers hand the HTML of a CV to ``render_document`` and wait for the
+bytes; the layout itself runs in ``PDF_RENDER_WORKERS`` spawned processes
+kept warm by ``main.pdf.worker.warm_up``, which also parses the print
+stylesheets once per worker. At most ``PDF_RENDER_QUEUE_SIZE``
+renders wait for a free worker, further ones fail at once with RenderError.
+A render taking longer than ``PDF_RENDER_TIMEOUT`` seconds kills the pool
+(the renders it was running fail too) and the next call starts a fresh
+one. The pool is also replaced, letting the running renders finish, once a
+worker has run ``PDF_RENDER_MAX_TASKS`` renders or grown past
+``PDF_RENDER_MAX_RSS_MB``, which contains WeasyPrint's memory growth.
+
+With ``PDF_RENDER_WORKERS = 0``, and inside daemonic processes such as
+Celery's prefork workers, which may not start children, PDFs are rendered
+in the calling process.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+from main.pdf.worker import render_pdf, run, warm_up
+
+logger = logging.getLogger(__name__)
+
+# Stylesheets of the print template (main/cv_print.html), as static paths.
+PRINT_STYLESHEETS = ["css/cv_print.css"]
+
+
+class RenderError(Exception):
+    """The render queue is full, or a worker timed out or died."""
+
+
+class RenderPool:
+    def __init__(
+        self,
+        workers,
+        timeout,
+        queue_size,
+        max_tasks,
+        max_rss,
+        initializer=warm_up,
+        initargs=(),
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.max_tasks = max_tasks
+        self.max_rss = max_rss
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor = None
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = threading.BoundedSemaphore(workers)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                    initargs=self.initargs,
+                )
+            return self._executor
+
+    def _recycle(self, executor, kill=False):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        if kill:
+            # ProcessPoolExecutor cannot cancel a running call.
+            for process in list(executor._processes.values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=kill)
+
+    def _admit(self):
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_size:
+                raise RenderError("Too many PDFs are being rendered.")
+            self._admitted += 1
+
+    def _leave(self):
+        with self._lock:
+            self._admitted -= 1
+
+    def call(self, function, *args):
+        """Run ``function(*args)`` in a worker and return its result."""
+        self._admit()
+        try:
+            with self._running:
+                executor = self._get_executor()
+                future = executor.submit(run, function, *args)
+                try:
+                    result, renders, rss = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    logger.error("PDF render timed out; restarting the render pool.")
+                    self._recycle(executor, kill=True)
+                    raise RenderError("Rendering the PDF timed out.")
+                except BrokenProcessPool as e:
+                    self._recycle(executor)
+                    raise RenderError(f"A PDF render worker died: {str(e)}") from e
+                if renders >= self.max_tasks or rss >= self.max_rss:
+                    logger.info(
+                        f"Recycling the PDF render pool after {renders} renders "
+                        f"({rss // 1024**2} MB)."
+                    )
+                    self._recycle(executor)
+                return result
+        finally:
+            self._leave()
+
+    def render(self, html, base_url=None, stylesheets=()):
+        return self.call(render_pdf, html, base_url, stylesheets)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def print_stylesheets():
+    """Absolute paths of the stylesheets of the print template."""
+    return [finders.find(path) for path in PRINT_STYLESHEETS]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """
+    Return the process-wide render pool, or None if PDFs are rendered in the
+    calling process.
+    """
+    global _pool
+    if not settings.PDF_RENDER_WORKERS or multiprocessing.current_process().daemon:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool(
+                workers=settings.PDF_RENDER_WORKERS,
+                timeout=settings.PDF_RENDER_TIMEOUT,
+                queue_size=settings.PDF_RENDER_QUEUE_SIZE,
+                max_tasks=settings.PDF_RENDER_MAX_TASKS,
+                max_rss=settings.PDF_RENDER_MAX_RSS_MB * 1024**2,
+                initargs=(print_stylesheets(),),
+            )
+        return _pool
+
+
+def render_document(html, base_url=None, stylesheets=()):
+    """
+    Render ``html`` with the stylesheets at the ``stylesheets`` paths to PDF
+    bytes; raises RenderError if the pool fails.
+    """
+    pool = get_render_pool()
+    if pool is None:
+        return render_pdf(html, base_url, stylesheets)
+    return pool.render(html, base_url, stylesheets)
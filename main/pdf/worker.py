@@ -0,0 +1,65 @@
+"""
+Code run inside the PDF render processes (see ``main.pdf.render``).
+
+Only WeasyPrint is imported here, not Django, so a worker starts quickly.
+``warm_up`` runs once per worker and pays WeasyPrint's cold costs (font
+discovery, Pango setup, parsing the stylesheets) before the first real
+render; the font configuration and the parsed stylesheets are then reused
+by every render of the process.
+"""
+
+import os
+import resource
+import sys
+
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+_font_config = None
+_stylesheets = {}
+_renders = 0
+
+
+def _get_font_config():
+    global _font_config
+    if _font_config is None:
+        _font_config = FontConfiguration()
+    return _font_config
+
+
+def _get_stylesheet(path):
+    """The parsed stylesheet at ``path``, parsed again only if the file changed."""
+    modified = os.path.getmtime(path)
+    parsed_at, stylesheet = _stylesheets.get(path, (None, None))
+    if parsed_at != modified:
+        stylesheet = CSS(filename=path, font_config=_get_font_config())
+        _stylesheets[path] = modified, stylesheet
+    return stylesheet
+
+
+def warm_up(stylesheets=()):
+    render_pdf("<p>CV</p>", stylesheets=stylesheets)
+
+
+def render_pdf(html, base_url=None, stylesheets=()):
+    """Lay out ``html`` with the stylesheets at ``stylesheets``; return the PDF."""
+    return HTML(string=html, base_url=base_url).write_pdf(
+        stylesheets=[_get_stylesheet(path) for path in stylesheets],
+        font_config=_get_font_config(),
+    )
+
+
+def peak_rss():
+    """Peak resident set size of this process, in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run(function, *args):
+    """
+    Call ``function``; return its result with the number of calls this
+    worker has run and its peak RSS, so the pool can decide to recycle it.
+    """
+    global _renders
+    _renders += 1
+    return function(*args), _renders, peak_rss()
@@ -16,6 +16,7 @@ from .models import (
     Project,
     Skill,
 )
+from .views.helpers import _get_languages
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -170,6 +171,32 @@ class ContactTypeSerializer(serializers.ModelSerializer):
         fields = ["id", "contact_type"]
 
 
+class CandidateTranslationSerializer(serializers.Serializer):
+    languages = serializers.ListField(
+        child=serializers.CharField(max_length=100), allow_empty=False
+    )
+
+    def validate_languages(self, value):
+        unsupported = [
+            language for language in value if language not in _get_languages()
+        ]
+        if unsupported:
+            raise ValidationError(f"Unsupported languages: {', '.join(unsupported)}.")
+        return value
+
+
+class CandidateExportSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    search = serializers.CharField(max_length=100, required=False)
+    skill = serializers.CharField(max_length=100, required=False)
+    language = serializers.CharField(max_length=100, required=False)
+
+    def validate_language(self, value):
+        if value not in _get_languages():
+            raise ValidationError(f"Unsupported language: {value}.")
+        return value
+
+
 class CandidateSummarySerializer(serializers.ModelSerializer):
     bio = BioItemSerializer()
     skills = serializers.SerializerMethodField()
@@ -0,0 +1,85 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from main.models import (
+    BioItem,
+    Candidate,
+    CandidateProject,
+    CandidateSkill,
+    Contact,
+    Project,
+)
+from main.pdf.cache import invalidate_candidate_pdfs
+from main.pdf.prerender import schedule_prerender
+from main.translation.cache import invalidate_translations
+from main.translation.prewarm import schedule_prewarm
+from main.translation.units import invalidate_project_translations
+
+
+@receiver([post_save, post_delete], sender=BioItem)
+@receiver([post_save, post_delete], sender=CandidateProject)
+def invalidate_candidate_translations(sender, instance, **kwargs):
+    invalidate_translations([instance.candidate_id])
+
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_project_cv_translations(sender, instance, **kwargs):
+    invalidate_translations(
+        instance.candidate_projects.values_list("candidate_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Project)
+def invalidate_shared_project_translations(sender, instance, **kwargs):
+    invalidate_project_translations(instance)
+
+
+@receiver([post_save, post_delete], sender=BioItem)
+@receiver([post_save, post_delete], sender=CandidateProject)
+def prewarm_candidate_translations(sender, instance, **kwargs):
+    schedule_prewarm([instance.candidate_id])
+
+
+@receiver(post_save, sender=Project)
+def prewarm_project_translations(sender, instance, **kwargs):
+    schedule_prewarm(instance.candidate_projects.values_list("candidate_id", flat=True))
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+def invalidate_candidate_pdf(sender, instance, **kwargs):
+    invalidate_candidate_pdfs([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=BioItem)
+@receiver([post_save, post_delete], sender=CandidateSkill)
+@receiver([post_save, post_delete], sender=CandidateProject)
+@receiver([post_save, post_delete], sender=Contact)
+def invalidate_candidate_item_pdfs(sender, instance, **kwargs):
+    invalidate_candidate_pdfs([instance.candidate_id])
+
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_project_pdfs(sender, instance, **kwargs):
+    invalidate_candidate_pdfs(
+        instance.candidate_projects.values_list("candidate_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Candidate)
+def prerender_candidate_pdf(sender, instance, **kwargs):
+    schedule_prerender([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=BioItem)
+@receiver([post_save, post_delete], sender=CandidateSkill)
+@receiver([post_save, post_delete], sender=CandidateProject)
+@receiver([post_save, post_delete], sender=Contact)
+def prerender_candidate_item_pdfs(sender, instance, **kwargs):
+    schedule_prerender([instance.candidate_id])
+
+
+@receiver(post_save, sender=Project)
+def prerender_project_pdfs(sender, instance, **kwargs):
+    schedule_prerender(
+        instance.candidate_projects.values_list("candidate_id", flat=True)
+    )
@@ -4,6 +4,15 @@ from celery import shared_task
 from django.conf import settings
 from django.core.mail import EmailMessage
 
+from main.pdf.prerender import clear_pending_prerender, prerender_pdfs
+from main.translation.jobs import finish_translation_job
+from main.translation.prewarm import clear_pending_prewarm, warm_translations
+from main.views.helpers import (
+    _get_cv_detail_context,
+    _get_languages,
+    translate_cv_detail_context,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,3 +46,33 @@ def send_candidate_pdf_email(first_name, last_name, email, pdf_content):
             exc_info=True,
         )
         raise
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def prewarm_candidate_translations(self, candidate_id, languages=None):
+    clear_pending_prewarm(candidate_id)
+    failed = warm_translations(candidate_id, languages or _get_languages())
+    if failed:
+        raise self.retry(kwargs={"candidate_id": candidate_id, "languages": failed})
+    return f"CV {candidate_id} translated"
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def prerender_candidate_pdfs(self, candidate_id, languages=None):
+    clear_pending_prerender(candidate_id)
+    if languages is None:
+        languages = [None, *settings.PDF_PRERENDER_LANGUAGES]
+    failed = prerender_pdfs(candidate_id, languages)
+    if failed:
+        raise self.retry(kwargs={"candidate_id": candidate_id, "languages": failed})
+    return f"CV {candidate_id} PDFs rendered"
+
+
+@shared_task
+def translate_candidate_cv(candidate_id, language):
+    try:
+        cv_detail_context = _get_cv_detail_context(candidate_id, language)
+        content = translate_cv_detail_context(cv_detail_context, language)
+    finally:
+        finish_translation_job(candidate_id, language)
+    return {"candidate_id": candidate_id, "language": language, "content": content}
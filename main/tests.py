@@ -1,7 +1,27 @@
+import asyncio
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from unittest import mock
+
+import fakeredis
+import httpx
+import openai
+from celery.exceptions import Retry
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 
 from CVProject.constants import API_URLS
 from main.models import (
@@ -11,11 +31,54 @@ from main.models import (
     CandidateSkill,
     Contact,
     ContactType,
+    CVTranslation,
     Project,
+    ProjectTranslation,
     Skill,
+    TranslationUnit,
+)
+from main.pdf import worker
+from main.pdf.cache import get_cached_pdf, get_pdf_storage, store_pdf
+from main.pdf.prerender import clear_pending_prerender
+from main.pdf.render import RenderError, RenderPool, print_stylesheets
+from main.tasks import (
+    prerender_candidate_pdfs,
+    prewarm_candidate_translations,
+    translate_candidate_cv,
+)
+from main.translation.backends import LocalBackend
+from main.translation.batch import translate_cv_languages
+from main.translation.cache import compact_json, get_cached_translation
+from main.translation.client import (
+    TranslationClient,
+    TranslationUnavailable,
+    get_translation_client,
+)
+from main.translation.jobs import get_translation_job
+from main.translation.prewarm import clear_pending_prewarm
+from main.translation.units import chunk_units
+from main.views.helpers import (
+    _get_cv_context,
+    _get_cv_detail_context,
+    _get_cv_detail_ui_context,
+    cv_content_to_translate,
+    get_cached_cv_translation,
+    process_cv_context,
 )
 
+# The shared cache is an in-memory Redis in tests; every instance of the
+# alias talks to the same fake server, as processes would to a real one.
+TEST_CACHES = {
+    **settings.CACHES,
+    "shared": {
+        **settings.CACHES["shared"],
+        "LOCATION": "redis://localhost:6379/15",
+        "OPTIONS": {"connection_class": fakeredis.FakeConnection},
+    },
+}
 
+
+@override_settings(CACHES=TEST_CACHES)
 class BaseTest(APITestCase):
     fixtures = ["users.json"]
 
@@ -25,6 +88,7 @@ class BaseTest(APITestCase):
         cls.user = User.objects.get(username="test_user")
 
     def setUp(self):
+        caches["shared"].clear()
         # Login user
         self.client.login(username="test_user", password="test_password")
 
@@ -84,6 +148,1155 @@ class CVViewTests(BaseTest):
         self.assertContains(response, "john.doe@example.com")
 
 
+def prompt_content(call):
+    """The JSON payload of a mocked ``client.responses.create`` call."""
+    return json.loads(call.kwargs["input"].split("\n\n", 1)[1])
+
+
+def fake_translation(**kwargs):
+    def translate(value):
+        if isinstance(value, dict):
+            return {key: translate(item) for key, item in value.items()}
+        return f"[BR] {value}"
+
+    return mock.Mock(
+        output_text=json.dumps(translate(prompt_content(mock.call(**kwargs))))
+    )
+
+
+def patch_translation_client(test):
+    """
+    Replace the OpenAI client of the translation backend by a mock answering
+    with ``fake_translation``; returns its ``responses.create``.
+    """
+    client = get_translation_client()
+    client.breaker.reset()
+    patcher = mock.patch.object(client.backend, "openai")
+    create = patcher.start().responses.create
+    test.addCleanup(patcher.stop)
+    create.side_effect = fake_translation
+    return create
+
+
+def patch_async_openai(test, delay=0, failing=()):
+    """
+    Replace AsyncOpenAI in the translation backend by a client answering like
+    ``fake_translation`` after ``delay`` seconds, failing for ``failing``
+    languages. Returns the mocked ``responses.create``.
+    """
+
+    async def create(**kwargs):
+        await asyncio.sleep(delay)
+        language = re.search(r"JSON to (.+)\.\n", kwargs["input"]).group(1)
+        if language in failing:
+            raise RuntimeError(f"{language} is unavailable")
+        return fake_translation(**kwargs)
+
+    get_translation_client().breaker.reset()
+    async_client = mock.Mock()
+    async_client.responses.create = mock.AsyncMock(side_effect=create)
+    async_client.close = mock.AsyncMock()
+    patcher = mock.patch(
+        "main.translation.backends.AsyncOpenAI", return_value=async_client
+    )
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return async_client.responses.create
+
+
+def finished_job(result=None, error=None):
+    return mock.Mock(
+        **{
+            "failed.return_value": error is not None,
+            "successful.return_value": error is None,
+            "result": error if error is not None else result,
+        }
+    )
+
+
+class EagerTranslationJobMixin:
+    """Run translation jobs inline and keep their results for the status view."""
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = {}
+        apply_patcher = mock.patch.object(
+            translate_candidate_cv, "apply_async", side_effect=self.run_job
+        )
+        self.apply_async = apply_patcher.start()
+        self.addCleanup(apply_patcher.stop)
+        job_patcher = mock.patch(
+            "main.views.frontend_views.get_translation_job", side_effect=self.jobs.get
+        )
+        job_patcher.start()
+        self.addCleanup(job_patcher.stop)
+
+    def run_job(self, args, task_id):
+        try:
+            self.jobs[task_id] = finished_job(result=translate_candidate_cv(*args))
+        except Exception as e:
+            self.jobs[task_id] = finished_job(error=e)
+
+    def page(self, language="Breton", candidate=None):
+        candidate = candidate or self.candidate
+        return self.client.get(
+            reverse("cv_detail", args=[candidate.id]), {"language": language}
+        )
+
+    def view(self, language="Breton", candidate=None):
+        """The translated CV card, from the cache or from a translation job."""
+        response = self.page(language, candidate)
+        status_url = response.context["translation_status_url"]
+        return self.client.get(status_url) if status_url else response
+
+
+class CVTranslationTests(EagerTranslationJobMixin, BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        cls.bio = BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+        cls.project = Project.objects.create(
+            project_name="Test Project",
+            project_description="A test project description.",
+        )
+        cls.other_project = Project.objects.create(
+            project_name="Other Project",
+            project_description="Another description.",
+        )
+        CandidateProject.objects.create(candidate=cls.candidate, project=cls.project)
+        cls.other_candidate_project = CandidateProject.objects.create(
+            candidate=cls.candidate, project=cls.other_project
+        )
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+        self.create = patch_translation_client(self)
+
+    def test_repeat_views_are_served_from_the_cache(self):
+        self.assertContains(self.view(), "[BR] A seasoned software engineer.")
+        self.assertContains(self.view(), "[BR] A seasoned software engineer.")
+
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual(CVTranslation.objects.get().language, "Breton")
+
+    def test_languages_are_cached_separately(self):
+        self.view("Breton")
+        self.view("Manx")
+
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_cached_translation_needs_no_query(self):
+        self.view()
+        cv_detail_context = _get_cv_context(self.candidate.pk)
+        cv_detail_context.update(_get_cv_detail_ui_context(self.candidate, "Breton"))
+        payload = cv_content_to_translate(cv_detail_context)
+
+        with self.assertNumQueries(0):
+            translation = get_cached_translation(self.candidate.pk, "Breton", payload)
+        self.assertEqual(translation["bio"], "[BR] A seasoned software engineer.")
+
+    def test_bio_change_invalidates_the_translation(self):
+        self.view()
+        self.bio.bio_item = "A retired software engineer."
+        self.bio.save()
+
+        self.assertFalse(CVTranslation.objects.exists())
+        self.assertContains(self.view(), "[BR] A retired software engineer.")
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_project_change_only_retranslates_that_project(self):
+        self.view()
+        self.project.project_description = "Rewritten."
+        self.project.save()
+
+        self.assertFalse(CVTranslation.objects.exists())
+        response = self.view()
+
+        self.assertEqual(
+            prompt_content(self.create.call_args),
+            {
+                f"project:{self.project.pk}": {
+                    "project_name": "Test Project",
+                    "project_description": "Rewritten.",
+                }
+            },
+        )
+        self.assertContains(response, "[BR] Rewritten.")
+        self.assertContains(response, "[BR] Another description.")
+        self.assertContains(response, "[BR] A seasoned software engineer.")
+
+    def test_units_missing_from_the_reply_stay_untranslated(self):
+        self.create.side_effect = None
+        self.create.return_value = mock.Mock(
+            output_text=json.dumps({"bio": "Un ijinour skiant."})
+        )
+
+        response = self.view()
+
+        self.assertContains(response, "Un ijinour skiant.")
+        self.assertContains(response, "A test project description.")
+        self.assertEqual(
+            list(TranslationUnit.objects.values_list("key", flat=True)), ["bio"]
+        )
+        self.assertFalse(CVTranslation.objects.exists())
+
+    def test_shared_projects_are_translated_once(self):
+        self.view()
+        colleague = Candidate.objects.create(first_name="Jane", last_name="Roe")
+        BioItem.objects.create(bio_item="A data engineer.", candidate=colleague)
+        CandidateProject.objects.create(candidate=colleague, project=self.project)
+
+        response = self.view(candidate=colleague)
+
+        self.assertNotIn(
+            f"project:{self.project.pk}", prompt_content(self.create.call_args)
+        )
+        self.assertContains(response, "[BR] A test project description.")
+        self.assertEqual(
+            ProjectTranslation.objects.filter(project=self.project).count(), 1
+        )
+
+    def test_project_text_change_drops_its_shared_translations(self):
+        self.view()
+        self.view("Manx")
+        self.project.save()
+        self.assertEqual(
+            ProjectTranslation.objects.filter(project=self.project).count(), 2
+        )
+
+        self.project.project_name = "Renamed Project"
+        self.project.save()
+
+        self.assertFalse(
+            ProjectTranslation.objects.filter(project=self.project).exists()
+        )
+        self.assertTrue(
+            ProjectTranslation.objects.filter(project=self.other_project).exists()
+        )
+
+    def test_unparseable_translation_is_not_stored(self):
+        self.create.side_effect = None
+        self.create.return_value = mock.Mock(output_text="not json")
+
+        response = self.page()
+
+        self.assertContains(response, "A seasoned software engineer.")
+        status = self.client.get(response.context["translation_status_url"]).json()
+        self.assertEqual(status["status"], "failed")
+        self.assertFalse(CVTranslation.objects.exists())
+        self.assertFalse(TranslationUnit.objects.exists())
+
+
+@override_settings(TRANSLATION_CHUNK_MAX_CHARS=200)
+class CVChunkedTranslationTests(EagerTranslationJobMixin, BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+        for number in range(1, 7):
+            project = Project.objects.create(
+                project_name=f"Project {number}",
+                project_description=f"Description of project number {number}.",
+            )
+            CandidateProject.objects.create(candidate=cls.candidate, project=project)
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+        self.create = patch_translation_client(self)
+
+    def test_large_cv_is_translated_in_bounded_compact_chunks(self):
+        response = self.view()
+
+        self.assertGreater(self.create.call_count, 1)
+        for call in self.create.call_args_list:
+            payload = call.kwargs["input"].split("\n\n", 1)[1]
+            self.assertLessEqual(len(payload), 200)
+            self.assertEqual(payload, compact_json(json.loads(payload)))
+        for number in range(1, 7):
+            self.assertContains(
+                response, f"[BR] Description of project number {number}."
+            )
+        self.assertTrue(CVTranslation.objects.exists())
+
+    def test_failed_chunk_leaves_only_its_units_untranslated(self):
+        def fail_for_project_three(**kwargs):
+            if "Project 3" in kwargs["input"]:
+                raise RuntimeError("Timed out")
+            return fake_translation(**kwargs)
+
+        self.create.side_effect = fail_for_project_three
+        response = self.view()
+
+        self.assertContains(response, "Description of project number 3.")
+        self.assertNotContains(response, "[BR] Description of project number 3.")
+        self.assertContains(response, "[BR] Description of project number 4.")
+        self.assertFalse(CVTranslation.objects.exists())
+
+        self.create.reset_mock()
+        self.create.side_effect = fake_translation
+        self.view()
+        self.assertEqual(self.create.call_count, 1)
+        self.assertIn("Project 3", self.create.call_args.kwargs["input"])
+
+    def test_oversized_unit_gets_a_chunk_of_its_own(self):
+        units = {"bio": "x" * 300, "project:1": {"project_name": "A"}}
+
+        self.assertEqual(
+            chunk_units(units, 200),
+            [{"bio": "x" * 300}, {"project:1": {"project_name": "A"}}],
+        )
+
+
+class UICatalogTests(EagerTranslationJobMixin, BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+        locale_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(locale_dir.cleanup)
+        settings_override = override_settings(LOCALE_PATHS=[locale_dir.name])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.create = patch_translation_client(self)
+
+    def test_labels_come_from_the_compiled_catalog(self):
+        call_command("translate_ui_strings", languages=["Breton"], stdout=mock.Mock())
+        self.create.reset_mock()
+
+        response = self.page()
+
+        self.assertContains(response, "[BR] Download PDF")
+        self.assertContains(response, "[BR] John Doe CV")
+        self.assertEqual(
+            prompt_content(self.create.call_args),
+            {"bio": "A seasoned software engineer."},
+        )
+
+    def test_existing_catalog_entries_are_not_translated_again(self):
+        call_command("translate_ui_strings", languages=["Breton"], stdout=mock.Mock())
+        call_command("translate_ui_strings", languages=["Breton"], stdout=mock.Mock())
+
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_missing_catalog_translates_labels_with_the_cv(self):
+        response = self.view("Manx")
+
+        self.assertContains(response, "[BR] Bio")
+        self.assertContains(response, "[BR] A seasoned software engineer.")
+        self.assertEqual(
+            prompt_content(self.create.call_args)["download_btn_title"],
+            "Download PDF",
+        )
+
+
+class TranslationJobTests(EagerTranslationJobMixin, BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+        cls.other_candidate = Candidate.objects.create(
+            first_name="Jane", last_name="Roe"
+        )
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+        self.create = patch_translation_client(self)
+
+    def test_page_is_rendered_untranslated_while_the_job_runs(self):
+        self.apply_async.side_effect = None
+
+        with mock.patch(
+            "main.views.frontend_views.get_translation_job",
+            side_effect=get_translation_job,
+        ):
+            response = self.page()
+            job_status = self.client.get(response.context["translation_status_url"])
+
+        self.assertContains(response, "A seasoned software engineer.")
+        self.assertNotContains(response, "[BR]")
+        self.create.assert_not_called()
+        self.assertEqual(job_status.json(), {"status": "pending"})
+
+    def test_concurrent_views_attach_to_the_running_job(self):
+        self.apply_async.side_effect = None
+
+        first = self.page().context["translation_status_url"]
+        second = self.page().context["translation_status_url"]
+
+        self.assertEqual(first, second)
+        self.apply_async.assert_called_once()
+
+    def test_finished_job_is_swapped_in_and_then_served_from_the_cache(self):
+        status = self.view().json()
+
+        self.assertEqual(status["status"], "ready")
+        self.assertIn("[BR] A seasoned software engineer.", status["html"])
+        response = self.page()
+        self.assertIsNone(response.context["translation_status_url"])
+        self.assertContains(response, "[BR] A seasoned software engineer.")
+
+    def test_pending_job_of_another_candidate_is_not_found(self):
+        self.apply_async.side_effect = None
+        job_id = self.page().context["translation_status_url"].split("/")[-2]
+
+        with mock.patch(
+            "main.views.frontend_views.get_translation_job",
+            side_effect=get_translation_job,
+        ):
+            response = self.client.get(
+                reverse("cv_translation_status", args=[self.other_candidate.id, job_id])
+            )
+            unknown = self.client.get(
+                reverse("cv_translation_status", args=[self.candidate.id, "x"])
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(unknown.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_job_of_another_candidate_is_not_found(self):
+        job_id = self.page().context["translation_status_url"].split("/")[-2]
+
+        response = self.client.get(
+            reverse("cv_translation_status", args=[self.other_candidate.id, job_id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TranslationPrewarmTests(BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        cls.bio = BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+        cls.project = Project.objects.create(
+            project_name="Test Project",
+            project_description="A test project description.",
+        )
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+        self.create = patch_async_openai(self)
+
+    @override_settings(TRANSLATION_PREWARM=True)
+    def test_burst_of_edits_schedules_one_job(self):
+        with mock.patch.object(
+            prewarm_candidate_translations, "apply_async"
+        ) as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.bio.bio_item = "A retired software engineer."
+                self.bio.save()
+                CandidateProject.objects.create(
+                    candidate=self.candidate, project=self.project
+                )
+                self.project.project_description = "Rewritten."
+                self.project.save()
+
+        apply_async.assert_called_once_with(
+            (self.candidate.id,), countdown=settings.TRANSLATION_PREWARM_DELAY
+        )
+
+    @override_settings(TRANSLATION_PREWARM=True)
+    def test_mark_cleared_by_another_process_lets_the_next_edit_schedule(self):
+        self.assertNotIsInstance(caches["shared"], LocMemCache)
+        with mock.patch.object(
+            prewarm_candidate_translations, "apply_async"
+        ) as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.bio.save()
+            # The task clears the mark from the Celery worker's own cache.
+            worker_cache = caches.create_connection("shared")
+            with mock.patch(
+                "main.translation.prewarm.caches", {"shared": worker_cache}
+            ):
+                clear_pending_prewarm(self.candidate.id)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.bio.save()
+
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_job_translates_into_every_language(self):
+        prewarm_candidate_translations(self.candidate.id, ["Breton", "Manx"])
+
+        self.assertEqual(
+            set(CVTranslation.objects.values_list("language", flat=True)),
+            {"Breton", "Manx"},
+        )
+
+    def test_prewarmed_page_is_served_from_the_cache(self):
+        prewarm_candidate_translations(self.candidate.id, ["Breton"])
+
+        with mock.patch(
+            "main.views.frontend_views.start_translation_job"
+        ) as start_translation_job:
+            response = self.client.get(
+                reverse("cv_detail", args=[self.candidate.id]), {"language": "Breton"}
+            )
+
+        start_translation_job.assert_not_called()
+        self.assertIsNone(response.context["translation_status_url"])
+        self.assertContains(response, "[BR] A seasoned software engineer.")
+        self.assertContains(response, "[BR] Bio")
+
+    def test_backfill_skips_warm_translations(self):
+        call_command(
+            "prewarm_translations",
+            languages=["Breton"],
+            concurrency=1,
+            stdout=mock.Mock(),
+        )
+        call_command(
+            "prewarm_translations",
+            languages=["Breton", "Manx"],
+            concurrency=1,
+            stdout=mock.Mock(),
+        )
+
+        self.assertEqual(self.create.call_count, 2)
+        self.assertEqual(CVTranslation.objects.count(), 2)
+
+
+class CVBatchTranslationTests(BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+        project = Project.objects.create(
+            project_name="Test Project",
+            project_description="A test project description.",
+        )
+        CandidateProject.objects.create(candidate=cls.candidate, project=project)
+        cls.url = f"{API_URLS['candidates']}{cls.candidate.id}/translations/"
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+
+    def test_languages_are_translated_concurrently(self):
+        self.create = patch_async_openai(self, delay=0.3)
+        languages = ["Breton", "Manx", "Cornish", "Occitan", "Romani"]
+
+        started = time.monotonic()
+        results, errors = translate_cv_languages(self.candidate.id, languages)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(list(results), languages)
+        self.assertEqual(errors, {})
+        self.assertEqual(CVTranslation.objects.count(), len(languages))
+
+    def test_failures_are_reported_per_language(self):
+        self.create = patch_async_openai(self, failing=["Manx"])
+
+        results, errors = translate_cv_languages(self.candidate.id, ["Breton", "Manx"])
+
+        self.assertEqual(results["Breton"]["bio"], "[BR] A seasoned software engineer.")
+        self.assertEqual(errors, {"Manx": "Translation failed: Manx is unavailable"})
+        self.assertFalse(CVTranslation.objects.filter(language="Manx").exists())
+
+    def test_stored_languages_are_not_sent_again(self):
+        self.create = patch_async_openai(self)
+
+        translate_cv_languages(self.candidate.id, ["Breton"])
+        translate_cv_languages(self.candidate.id, ["Breton", "Manx"])
+
+        self.assertEqual(self.create.await_count, 2)
+
+    def test_translations_endpoint(self):
+        self.create = patch_async_openai(self, failing=["Manx"])
+
+        response = self.client.post(
+            self.url, {"languages": ["Breton", "Manx"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"]["Breton"]["projects"][0]["project_name"],
+            "[BR] Test Project",
+        )
+        self.assertEqual(
+            response.data["errors"], {"Manx": "Translation failed: Manx is unavailable"}
+        )
+
+    def test_translations_endpoint_matches_the_cv_page(self):
+        self.create = patch_async_openai(self)
+
+        response = self.client.post(self.url, {"languages": ["Breton"]}, format="json")
+
+        self.assertEqual(response.data["results"]["Breton"]["bio_title"], "[BR] Bio")
+        self.assertEqual(
+            get_cached_cv_translation(
+                _get_cv_detail_context(self.candidate.id, "Breton"), "Breton"
+            ),
+            response.data["results"]["Breton"],
+        )
+
+    def test_translations_endpoint_rejects_unsupported_languages(self):
+        response = self.client.post(self.url, {"languages": ["Klingon"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+def api_error(error_class, status_code=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    if status_code is None:
+        return error_class(request=request)
+    response = httpx.Response(status_code, request=request)
+    return error_class("Provider error", response=response, body=None)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TranslationClientTests(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.translator = TranslationClient(
+            {"backoff": 0.01, "max_retries": 2, "breaker_threshold": 2}
+        )
+        self.create = mock.Mock(side_effect=fake_translation)
+        self.translator.backend.openai = mock.Mock(**{"responses.create": self.create})
+
+    def test_transient_errors_are_retried(self):
+        self.create.side_effect = [
+            api_error(openai.APITimeoutError),
+            api_error(openai.InternalServerError, 503),
+            fake_translation(input="Breton\n\n" + json.dumps({"bio": "Hi"})),
+        ]
+
+        self.assertEqual(
+            self.translator.translate("Breton", {"bio": "Hi"}), {"bio": "[BR] Hi"}
+        )
+        self.assertEqual(self.create.call_count, 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.create.side_effect = api_error(openai.BadRequestError, 400)
+
+        with self.assertRaises(TranslationUnavailable):
+            self.translator.translate("Breton", {"bio": "Hi"})
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_calls_are_bounded_by_the_deadline(self):
+        self.translator.deadline = 0.5
+        self.translator.backoff = 10
+        self.create.side_effect = api_error(openai.APITimeoutError)
+
+        started = time.monotonic()
+        with self.assertRaises(TranslationUnavailable):
+            self.translator.translate("Breton", {"bio": "Hi"})
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertLessEqual(self.create.call_args.kwargs["timeout"], 0.5)
+
+    def test_breaker_fails_fast_and_probes_after_the_reset_timeout(self):
+        self.create.side_effect = api_error(openai.APIConnectionError)
+        for _ in range(2):
+            with self.assertRaises(TranslationUnavailable):
+                self.translator.translate("Breton", {"bio": "Hi"})
+        calls = self.create.call_count
+
+        with self.assertRaises(TranslationUnavailable):
+            self.translator.translate("Breton", {"bio": "Hi"})
+        self.assertEqual(self.create.call_count, calls)
+        self.assertTrue(self.translator.breaker.is_open)
+
+        self.translator.breaker._opened_at -= self.translator.breaker.reset_timeout
+        self.create.side_effect = fake_translation
+        self.assertEqual(
+            self.translator.translate("Breton", {"bio": "Hi"}), {"bio": "[BR] Hi"}
+        )
+        self.assertFalse(self.translator.breaker.is_open)
+
+    def test_breaker_opened_by_another_process_fails_fast(self):
+        worker_breaker = TranslationClient({"breaker_threshold": 1}).breaker
+        worker_breaker.record_failure()
+
+        self.assertTrue(self.translator.breaker.is_open)
+        with self.assertRaises(TranslationUnavailable):
+            self.translator.translate("Breton", {"bio": "Hi"})
+        self.create.assert_not_called()
+
+
+@override_settings(TRANSLATION_BACKEND="local")
+class LocalBackendTests(BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+
+    def local_client(self, **options):
+        translator = TranslationClient({"backoff": 0.01, "max_retries": 2})
+        translator.backend = LocalBackend(latency=0, jitter=0, **options)
+        return translator
+
+    def test_replies_are_deterministic_for_a_seed(self):
+        backends = [LocalBackend(error_rate=0.5, seed=7) for _ in range(2)]
+        outcomes = [[backend.plan(1)[1] for _ in range(20)] for backend in backends]
+
+        self.assertEqual(outcomes[0], outcomes[1])
+        self.assertIn("error", outcomes[0])
+        self.assertIn("ok", outcomes[0])
+
+    def test_errors_are_retried_then_reported(self):
+        translator = self.local_client(error_rate=1)
+
+        with self.assertRaisesMessage(TranslationUnavailable, "Local backend failed."):
+            translator.translate("Breton", {"bio": "Hi"})
+
+    def test_malformed_replies_are_reported(self):
+        translator = self.local_client(malformed_rate=1)
+
+        with self.assertRaisesMessage(TranslationUnavailable, "valid JSON"):
+            translator.translate("Breton", {"bio": "Hi"})
+
+    def test_cv_is_translated_offline(self):
+        with mock.patch("main.translation.client._client", self.local_client()):
+            results, errors = translate_cv_languages(
+                self.candidate.id, ["Breton", "Manx"]
+            )
+
+        self.assertEqual(errors, {})
+        self.assertEqual(results["Manx"]["bio"], "[Manx] A seasoned software engineer.")
+
+
+class TranslationFallbackTests(BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        caches["translations"].clear()
+        self.create = patch_translation_client(self)
+
+    def test_pdf_context_falls_back_to_the_untranslated_cv(self):
+        self.create.side_effect = api_error(openai.BadRequestError, 400)
+
+        cv_detail_context = process_cv_context(self.candidate.id, "Breton")
+
+        self.assertEqual(cv_detail_context["bio"], "A seasoned software engineer.")
+
+    def test_open_breaker_serves_the_page_without_starting_a_job(self):
+        # Translations fail in a Celery worker, not in the web process.
+        worker_breaker = TranslationClient().breaker
+        for _ in range(worker_breaker.threshold):
+            worker_breaker.record_failure()
+
+        with mock.patch.object(translate_candidate_cv, "apply_async") as apply_async:
+            response = self.client.get(
+                reverse("cv_detail", args=[self.candidate.id]), {"language": "Breton"}
+            )
+
+        apply_async.assert_not_called()
+        self.assertContains(response, "A seasoned software engineer.")
+        self.assertContains(response, "Translation is temporarily unavailable.")
+
+
+class InlinePDFRenderMixin:
+    """
+    Cache PDFs in a temporary directory and render them in the test process
+    with a mocked WeasyPrint producing ``%PDF <render number>``.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        settings_override = override_settings(
+            PDF_CACHE_DIR=cache_dir.name, PDF_RENDER_WORKERS=0
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = mock.patch("main.pdf.worker.HTML")
+        self.html = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.html.return_value.write_pdf.side_effect = lambda **kwargs: (
+            f"%PDF {self.html.call_count}".encode()
+        )
+
+
+class PDFCacheTests(InlinePDFRenderMixin, BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        cls.bio = BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+        cls.url = reverse("cv_generate_pdf", kwargs={"pk": cls.candidate.id})
+
+    def download(self, **headers):
+        response = self.client.get(self.url, **headers)
+        if response.streaming:
+            response.content_bytes = b"".join(response.streaming_content)
+        return response
+
+    def cached_files(self):
+        return get_pdf_storage().listdir(str(self.candidate.id))[1]
+
+    def test_repeat_download_is_served_from_the_cache(self):
+        first = self.download()
+        second = self.download()
+
+        self.assertEqual(self.html.call_count, 1)
+        self.assertEqual(second.content_bytes, b"%PDF 1")
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("John_Doe_CV.pdf", second["Content-Disposition"])
+
+    def test_pdf_uses_the_print_template_and_stylesheet(self):
+        self.download()
+
+        html = self.html.call_args.kwargs["string"]
+        self.assertIn("<h1>John Doe</h1>", html)
+        self.assertNotIn("<script", html)
+        self.assertNotIn("navbar", html)
+        self.assertEqual(
+            len(self.html.return_value.write_pdf.call_args.kwargs["stylesheets"]), 1
+        )
+
+    def test_stylesheets_are_parsed_once_per_process(self):
+        with (
+            mock.patch.dict(worker._stylesheets, clear=True),
+            mock.patch("main.pdf.worker.CSS") as css,
+        ):
+            for _ in range(2):
+                worker.render_pdf("<p>CV</p>", stylesheets=print_stylesheets())
+
+        self.assertEqual(css.call_count, 1)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.download()["ETag"]
+
+        response = self.download(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.html.call_count, 1)
+
+    def test_edit_replaces_the_cached_pdf(self):
+        etag = self.download()["ETag"]
+        self.bio.bio_item = "A software architect."
+        self.bio.save()
+
+        response = self.download(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.content_bytes, b"%PDF 2")
+        self.assertEqual(len(self.cached_files()), 1)
+
+    @override_settings(PDF_CACHE_MAX_BYTES=25)
+    def test_least_recently_used_pdfs_are_evicted(self):
+        storage = get_pdf_storage()
+        for timestamp, name in enumerate(["1/a.pdf", "1/b.pdf"]):
+            store_pdf(name, b"x" * 10)
+            os.utime(storage.path(name), (timestamp, timestamp))
+        self.assertTrue(get_cached_pdf("1/a.pdf"))
+
+        store_pdf("1/c.pdf", b"x" * 10)
+
+        self.assertEqual(sorted(storage.listdir("1")[1]), ["a.pdf", "c.pdf"])
+
+    def test_storing_under_the_limit_does_not_walk_the_cache(self):
+        store_pdf("1/a.pdf", b"x" * 10)
+
+        with mock.patch(
+            "main.pdf.cache._cached_files", side_effect=AssertionError
+        ) as cached_files:
+            store_pdf("1/b.pdf", b"x" * 10)
+            store_pdf("2/a.pdf", b"x" * 10)
+
+        cached_files.assert_not_called()
+        self.assertEqual(caches["shared"].get("pdf-cache:bytes"), 30)
+
+    def test_shared_cache_outage_does_not_break_downloads_or_edits(self):
+        outage = ConnectionError("Redis is down")
+        shared = mock.Mock(**{"incr.side_effect": outage, "set.side_effect": outage})
+        with mock.patch("main.pdf.cache.caches", {"shared": shared}):
+            first = self.download()
+            self.bio.bio_item = "A software architect."
+            self.bio.save()
+            second = self.download()
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content_bytes, b"%PDF 2")
+        self.assertEqual(len(self.cached_files()), 1)
+
+    def test_pdf_evicted_after_the_lookup_is_rendered_again(self):
+        self.download()
+        for file_name in self.cached_files():
+            get_pdf_storage().delete(f"{self.candidate.id}/{file_name}")
+
+        with mock.patch("main.views.helpers.get_cached_pdf", return_value=True):
+            response = self.download()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content_bytes, b"%PDF 2")
+
+    def test_busy_render_pool_is_reported(self):
+        with mock.patch(
+            "main.views.helpers.render_document",
+            side_effect=RenderError("Too many PDFs are being rendered."),
+        ):
+            response = self.download()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "5")
+
+    @override_settings(PDF_CACHE_SENDFILE="x-accel-redirect")
+    def test_web_server_can_send_the_file(self):
+        response = self.download()
+
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            f"/protected/pdf/{self.candidate.id}/{self.cached_files()[0]}",
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CVExportTests(InlinePDFRenderMixin, APITransactionTestCase):
+    # The CVs are built in export threads, which only see committed rows.
+    fixtures = ["users.json"]
+    url = f"{API_URLS['candidates']}export/"
+
+    def setUp(self):
+        super().setUp()
+        caches["shared"].clear()
+        caches["translations"].clear()
+        self.john = Candidate.objects.create(first_name="John", last_name="Doe")
+        self.jane = Candidate.objects.create(first_name="Jane", last_name="Roe")
+        self.max = Candidate.objects.create(first_name="Max", last_name="Doe")
+        self.client.login(username="test_user", password="test_password")
+
+    def export(self, data):
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        return {name: archive.read(name) for name in archive.namelist()}
+
+    def test_selected_cvs_are_exported(self):
+        files = self.export({"ids": [self.john.id, self.jane.id]})
+
+        self.assertEqual(
+            sorted(files),
+            [f"{self.john.id}_John_Doe_CV.pdf", f"{self.jane.id}_Jane_Roe_CV.pdf"],
+        )
+        self.assertTrue(all(pdf.startswith(b"%PDF") for pdf in files.values()))
+
+    def test_cached_pdfs_are_reused(self):
+        self.client.get(reverse("cv_generate_pdf", kwargs={"pk": self.john.id}))
+
+        files = self.export({"search": "doe"})
+
+        self.assertEqual(len(files), 2)
+        self.assertEqual(files[f"{self.john.id}_John_Doe_CV.pdf"], b"%PDF 1")
+        self.assertEqual(self.html.call_count, 2)
+
+    def test_failed_renders_are_listed(self):
+        with mock.patch(
+            "main.views.helpers.render_document",
+            side_effect=RenderError("Rendering the PDF timed out."),
+        ):
+            files = self.export({"ids": [self.john.id]})
+
+        self.assertEqual(list(files), ["errors.txt"])
+        self.assertIn(b"timed out", files["errors.txt"])
+
+    def test_any_failure_is_listed_and_the_export_goes_on(self):
+        with mock.patch(
+            "main.views.helpers.store_pdf",
+            side_effect=[OSError("No space left on device"), None],
+        ):
+            files = self.export({"ids": [self.john.id, self.jane.id]})
+
+        self.assertEqual(len(files), 2)
+        self.assertIn(b"No space left on device", files["errors.txt"])
+
+    def test_translated_cvs_are_exported(self):
+        patch_translation_client(self)
+        BioItem.objects.create(bio_item="An engineer.", candidate=self.jane)
+
+        files = self.export({"ids": [self.jane.id], "language": "Breton"})
+
+        self.assertEqual(list(files), [f"{self.jane.id}_Jane_Roe_CV.pdf"])
+        self.assertTrue(
+            CVTranslation.objects.filter(
+                candidate=self.jane, language="Breton"
+            ).exists()
+        )
+
+    @override_settings(PDF_EXPORT_MAX_CANDIDATES=2)
+    def test_large_exports_are_refused(self):
+        response = self.client.post(self.url, {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_writes_the_archive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "cvs.zip")
+            call_command("export_cvs", output, ids=[self.max.id], stdout=mock.Mock())
+
+            with zipfile.ZipFile(output) as archive:
+                self.assertEqual(archive.namelist(), [f"{self.max.id}_Max_Doe_CV.pdf"])
+
+
+class PDFPrerenderTests(InlinePDFRenderMixin, BaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = Candidate.objects.create(first_name="John", last_name="Doe")
+        cls.bio = BioItem.objects.create(
+            bio_item="A seasoned software engineer.", candidate=cls.candidate
+        )
+        cls.skill = Skill.objects.create(skill_name="Django")
+
+    def setUp(self):
+        super().setUp()
+        caches["translations"].clear()
+
+    @override_settings(PDF_PRERENDER=True)
+    def test_burst_of_edits_schedules_one_render(self):
+        with mock.patch.object(prerender_candidate_pdfs, "apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.candidate.last_name = "Smith"
+                self.candidate.save()
+                self.bio.bio_item = "A retired software engineer."
+                self.bio.save()
+                CandidateSkill.objects.create(
+                    candidate=self.candidate, skill=self.skill
+                )
+
+        apply_async.assert_called_once_with(
+            (self.candidate.id,), countdown=settings.PDF_PRERENDER_DELAY
+        )
+
+    @override_settings(PDF_PRERENDER=True)
+    def test_mark_cleared_by_another_process_lets_the_next_edit_schedule(self):
+        with mock.patch.object(prerender_candidate_pdfs, "apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.candidate.save()
+            worker_cache = caches.create_connection("shared")
+            with mock.patch("main.pdf.prerender.caches", {"shared": worker_cache}):
+                clear_pending_prerender(self.candidate.id)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.candidate.save()
+
+        self.assertEqual(apply_async.call_count, 2)
+
+    @override_settings(PDF_PRERENDER_LANGUAGES=["Breton"])
+    def test_downloads_find_the_prerendered_pdfs(self):
+        patch_translation_client(self)
+        prerender_candidate_pdfs(self.candidate.id)
+        self.assertEqual(self.html.call_count, 2)
+
+        for language in ["", "Breton"]:
+            response = self.client.get(
+                reverse("cv_generate_pdf", kwargs={"pk": self.candidate.id}),
+                {"language": language},
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.html.call_count, 2)
+
+    def test_failed_languages_are_retried(self):
+        patch_translation_client(self)
+        with (
+            mock.patch(
+                "main.pdf.prerender.candidate_pdf",
+                side_effect=[
+                    OSError("No space left on device"),
+                    RenderError("Rendering the PDF timed out."),
+                ],
+            ),
+            mock.patch.object(
+                prerender_candidate_pdfs, "retry", side_effect=Retry
+            ) as retry,
+        ):
+            with self.assertRaises(Retry):
+                prerender_candidate_pdfs(self.candidate.id, [None, "Breton"])
+
+        retry.assert_called_once_with(
+            kwargs={"candidate_id": self.candidate.id, "languages": [None, "Breton"]}
+        )
+
+
+class RenderPoolTests(SimpleTestCase):
+    def pool(self, **options):
+        options = {
+            "workers": 1,
+            "timeout": 5,
+            "queue_size": 0,
+            "max_tasks": 100,
+            "max_rss": 1024**3,
+            "initializer": None,
+            **options,
+        }
+        pool = RenderPool(**options)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_hung_render_is_killed_and_the_pool_recovers(self):
+        pool = self.pool(timeout=3)
+
+        with self.assertRaisesMessage(RenderError, "timed out"):
+            pool.call(time.sleep, 30)
+
+        self.assertEqual(pool.call(abs, -1), 1)
+
+    def test_workers_are_recycled_after_max_tasks(self):
+        pool = self.pool(max_tasks=2)
+
+        pids = [pool.call(os.getpid) for _ in range(3)]
+
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_renders_beyond_the_queue_are_rejected(self):
+        pool = self.pool()
+        busy = threading.Thread(target=pool.call, args=(time.sleep, 1))
+        busy.start()
+        self.addCleanup(busy.join)
+        while not pool._admitted:
+            time.sleep(0.01)
+
+        with self.assertRaisesMessage(RenderError, "Too many PDFs"):
+            pool.call(abs, -1)
+
+
 class CVCRUDTests(BaseTest):
     @classmethod
     def setUpTestData(cls):
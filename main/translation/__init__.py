@@ -0,0 +1 @@
+"""Translation of candidate CVs (see ``main.views.helpers.process_cv_context``)."""
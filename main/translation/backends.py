@@ -0,0 +1,194 @@
+"""
+Translation backends.
+
+A backend turns ``(target_language, content)`` into the raw text of a reply
+(JSON, unless something goes wrong); TranslationClient adds deadlines,
+retries, the circuit breaker and parsing on top, so every backend shares the
+same caching and failure handling. ``TRANSLATION_BACKEND`` picks one by
+short name ("openai" or "local") or dotted path.
+
+Each backend offers ``complete`` and, through ``async_backend``, an async
+counterpart for one event loop with ``complete`` and ``aclose`` coroutines.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+
+import httpx
+from django.conf import settings
+from django.utils.module_loading import import_string
+from openai import AsyncOpenAI, OpenAI
+
+from main.translation.cache import compact_json
+
+
+class TransientBackendError(Exception):
+    """A failure worth retrying (timeouts, overload ...)."""
+
+
+def translation_request(target_language, content):
+    """Keyword arguments of the ``responses.create`` call translating ``content``."""
+    content_to_translate = compact_json(content)
+    prompt = (
+        f"You are a professional translator.\n"
+        f"Translate the values of the following JSON to {target_language}.\n"
+        f"Keep every key unchanged.\n"
+        f"Return only valid JSON without comments or extra text.\n\n"
+        f"{content_to_translate}"
+    )
+    return {
+        "model": "gpt-4o",
+        "instructions": "You are a professional translator.",
+        "input": prompt,
+        "temperature": 0.3,
+    }
+
+
+class OpenAIBackend:
+    name = "openai"
+
+    def __init__(self, config):
+        self.timeout = config["timeout"]
+        self.limits = httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_keepalive_connections"],
+            keepalive_expiry=config["keepalive_expiry"],
+        )
+        self.openai = OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            timeout=self.timeout,
+            http_client=httpx.Client(limits=self.limits, timeout=self.timeout),
+        )
+
+    def complete(self, target_language, content, timeout):
+        response = self.openai.responses.create(
+            **translation_request(target_language, content), timeout=timeout
+        )
+        return response.output_text
+
+    def async_backend(self):
+        return AsyncOpenAIBackend(self)
+
+
+class AsyncOpenAIBackend:
+    def __init__(self, backend):
+        self.openai = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            timeout=backend.timeout,
+            http_client=httpx.AsyncClient(
+                limits=backend.limits, timeout=backend.timeout
+            ),
+        )
+
+    async def complete(self, target_language, content, timeout):
+        response = await self.openai.responses.create(
+            **translation_request(target_language, content), timeout=timeout
+        )
+        return response.output_text
+
+    async def aclose(self):
+        await self.openai.close()
+
+
+class LocalBackend:
+    """
+    Offline backend for development, CI, benchmarks and chaos testing.
+
+    Every string value is "translated" to ``[<language>] <value>`` after
+    ``latency`` seconds (plus up to ``jitter`` more). A share of the calls
+    (``error_rate``) fails with a transient error and another
+    (``malformed_rate``) returns broken JSON. The outcomes are drawn from a
+    generator seeded with ``seed``, so a run can be replayed exactly.
+    """
+
+    name = "local"
+
+    def __init__(self, config=None, **options):
+        options = {**settings.TRANSLATION_LOCAL_BACKEND, **options}
+        self.latency = options["latency"]
+        self.jitter = options["jitter"]
+        self.error_rate = options["error_rate"]
+        self.malformed_rate = options["malformed_rate"]
+        self._random = random.Random(options["seed"])
+        self._lock = threading.Lock()
+
+    def _translate(self, target_language, value):
+        if isinstance(value, dict):
+            return {
+                key: self._translate(target_language, item)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self._translate(target_language, item) for item in value]
+        if isinstance(value, str):
+            return f"[{target_language}] {value}"
+        return value
+
+    def plan(self, timeout):
+        """Draw the delay and outcome ("ok", "error" or "malformed") of a call."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            roll = self._random.random()
+        if delay > timeout:
+            return timeout, "timeout"
+        if roll < self.error_rate:
+            return delay, "error"
+        if roll < self.error_rate + self.malformed_rate:
+            return delay, "malformed"
+        return delay, "ok"
+
+    def reply(self, target_language, content, outcome):
+        if outcome == "timeout":
+            raise TransientBackendError("Local backend timed out.")
+        if outcome == "error":
+            raise TransientBackendError("Local backend failed.")
+        reply = json.dumps(
+            self._translate(target_language, content), ensure_ascii=False
+        )
+        if outcome == "malformed":
+            half = len(reply) // 2
+            return reply[:half]
+        return reply
+
+    def complete(self, target_language, content, timeout):
+        delay, outcome = self.plan(timeout)
+        time.sleep(delay)
+        return self.reply(target_language, content, outcome)
+
+    def async_backend(self):
+        return AsyncLocalBackend(self)
+
+
+class AsyncLocalBackend:
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def complete(self, target_language, content, timeout):
+        delay, outcome = self.backend.plan(timeout)
+        await asyncio.sleep(delay)
+        return self.backend.reply(target_language, content, outcome)
+
+    async def aclose(self):
+        pass
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "local": LocalBackend,
+}
+
+
+def get_translation_backend(config):
+    """
+    Build the backend named by ``TRANSLATION_BACKEND`` (a short name or a
+    dotted path), passing it the ``TRANSLATION_CLIENT`` settings.
+    """
+    backend_name = settings.TRANSLATION_BACKEND
+    if backend_name in BACKENDS:
+        return BACKENDS[backend_name](config)
+    return import_string(backend_name)(config)
@@ -0,0 +1,121 @@
+"""
+Translation of one CV into several languages at once.
+
+Stored translations are looked up first; the languages that still need the
+model are then translated concurrently on the async translation client, at most
+``TRANSLATION_BATCH_CONCURRENCY`` calls at a time, so the batch takes about
+as long as its slowest language instead of the sum of all of them. Large
+CVs are split into chunks (see ``chunk_units``) that share the same limit.
+"""
+
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+from main.translation.cache import get_cached_translation
+from main.translation.client import get_translation_client
+from main.translation.units import (
+    chunk_units,
+    cv_units,
+    merge_chunk_replies,
+    pending_units,
+    save_units,
+)
+from main.views.helpers import (
+    _get_cv_context,
+    _get_cv_detail_ui_context,
+    complete_translation,
+    cv_content_to_translate,
+)
+
+
+async def _translate(client, semaphore, language, units):
+    async with semaphore:
+        return await client.translate(language, units)
+
+
+def _merge(replies):
+    try:
+        return merge_chunk_replies(replies)
+    except Exception as e:
+        return e
+
+
+async def _translate_languages(pending, concurrency):
+    """
+    Translate ``pending`` ({language: units}), each language split into
+    chunks; failed languages map to their error.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    chunks = {
+        language: chunk_units(units, settings.TRANSLATION_CHUNK_MAX_CHARS)
+        for language, units in pending.items()
+    }
+    client = get_translation_client().async_client()
+    try:
+        replies = await asyncio.gather(
+            *[
+                _translate(client, semaphore, language, chunk)
+                for language, language_chunks in chunks.items()
+                for chunk in language_chunks
+            ],
+            return_exceptions=True,
+        )
+    finally:
+        await client.aclose()
+
+    replies = iter(replies)
+    return {
+        language: _merge([next(replies) for _ in language_chunks])
+        for language, language_chunks in chunks.items()
+    }
+
+
+def translate_cv_languages(pk, languages, concurrency=None):
+    """
+    Translate the CV of candidate ``pk`` into each of ``languages``.
+
+    Returns ``(results, errors)``: the translated CV content and the error
+    message of each language, keyed by language. Each language is translated
+    from the same content as the CV page in that language, labels included,
+    so the stored translations are the ones the page looks up.
+    """
+    cv_context = _get_cv_context(pk)
+
+    results, errors, pending = {}, {}, {}
+    for language in dict.fromkeys(languages):
+        cv_detail_context = {
+            **cv_context,
+            **_get_cv_detail_ui_context(cv_context["candidate"], language),
+        }
+        payload = cv_content_to_translate(cv_detail_context)
+        units = cv_units(payload, cv_detail_context["projects"])
+        cached = get_cached_translation(pk, language, payload)
+        if cached is not None:
+            results[language] = cached
+            continue
+        stored, missing = pending_units(pk, language, units)
+        if missing:
+            pending[language] = (payload, units, stored, missing)
+        else:
+            results[language] = complete_translation(
+                pk, language, payload, units, stored
+            )
+
+    if pending:
+        replies = async_to_sync(_translate_languages)(
+            {language: missing for language, (*_, missing) in pending.items()},
+            concurrency or settings.TRANSLATION_BATCH_CONCURRENCY,
+        )
+        for language, reply in replies.items():
+            if isinstance(reply, Exception):
+                errors[language] = str(reply)
+                continue
+            payload, units, stored, missing = pending[language]
+            translated = {**stored, **save_units(pk, language, missing, reply)}
+            results[language] = complete_translation(
+                pk, language, payload, units, translated
+            )
+
+    return results, errors
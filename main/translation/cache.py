@@ -0,0 +1,71 @@
+"""
+Cache of translated CV content.
+
+A translation is stored per candidate and language together with the hash of
+the payload it was made from, and is only served while the candidate's
+current payload still hashes the same. The ``translations`` cache alias (an
+in-process LRU by default) sits in front of the CVTranslation table, so a
+repeat view costs neither an API call nor a query.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import caches
+
+from main.models import CVTranslation
+
+CACHE_ALIAS = "translations"
+
+
+def compact_json(payload):
+    """JSON without indentation or spaces, as sent to the translation API."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def content_hash(payload):
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _cache_key(candidate_id, language, payload_hash):
+    return f"cv-translation:{candidate_id}:{language}:{payload_hash}"
+
+
+def get_cached_translation(candidate_id, language, payload):
+    """Return the stored translation of ``payload``, or None."""
+    payload_hash = content_hash(payload)
+    cache = caches[CACHE_ALIAS]
+    key = _cache_key(candidate_id, language, payload_hash)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    data = (
+        CVTranslation.objects.filter(
+            candidate_id=candidate_id, language=language, content_hash=payload_hash
+        )
+        .values_list("data", flat=True)
+        .first()
+    )
+    if data is not None:
+        cache.set(key, data)
+    return data
+
+
+def store_translation(candidate_id, language, payload, data):
+    payload_hash = content_hash(payload)
+    CVTranslation.objects.update_or_create(
+        candidate_id=candidate_id,
+        language=language,
+        defaults={"content_hash": payload_hash, "data": data},
+    )
+    caches[CACHE_ALIAS].set(_cache_key(candidate_id, language, payload_hash), data)
+
+
+def invalidate_translations(candidate_ids):
+    """
+    Drop the stored translations of ``candidate_ids``. Cached entries need no
+    eviction: their key holds the old payload hash, which no longer matches.
+    """
+    CVTranslation.objects.filter(candidate_id__in=candidate_ids).delete()
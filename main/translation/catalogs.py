@@ -0,0 +1,153 @@
+"""
+gettext catalogs for the static UI strings of the CV pages.
+
+The labels are translated once per language by the
+``translate_ui_strings`` command and written to
+``locale/<code>/LC_MESSAGES/django.po`` and ``.mo`` under the first
+``LOCALE_PATHS`` entry, so views only need ``gettext`` for them. The labels
+of a language without a catalog are translated with the CV content on each
+request instead (see ``main.views.helpers``).
+"""
+
+import gettext
+import re
+import struct
+from pathlib import Path
+
+from django.conf import settings
+
+# Locale codes of the default ``TRANSLATING_LANGUAGES``; other names are
+# turned into a code by ``language_code``.
+LANGUAGE_CODES = {
+    "Bislama": "bi",
+    "Breton": "br",
+    "Chuvash": "cv",
+    "Cornish": "kw",
+    "Inuktitut": "iu",
+    "Kalaallisut": "kl",
+    "Kashubian": "csb",
+    "Ladino": "lad",
+    "Livonian": "liv",
+    "Manx": "gv",
+    "Northern Sami": "se",
+    "Occitan": "oc",
+    "Romani": "rom",
+    "Saramaccan": "srm",
+    "Tsakonian": "tsd",
+    "Upper Sorbian": "hsb",
+    "Zazaki": "zza",
+}
+
+DOMAIN = "django"
+
+PLACEHOLDER_RE = re.compile(r"%\(\w+\)s")
+
+
+def language_code(language):
+    """Return the locale code used for the catalog of ``language``."""
+    name = language.strip()
+    if name in LANGUAGE_CODES:
+        return LANGUAGE_CODES[name]
+    return re.sub(r"[^a-z]+", "_", name.lower()).strip("_")
+
+
+def catalog_dir(language):
+    return Path(settings.LOCALE_PATHS[0]) / language_code(language) / "LC_MESSAGES"
+
+
+def has_same_placeholders(source, translation):
+    return sorted(PLACEHOLDER_RE.findall(source)) == sorted(
+        PLACEHOLDER_RE.findall(translation)
+    )
+
+
+def has_catalog(language):
+    return (catalog_dir(language) / f"{DOMAIN}.mo").exists()
+
+
+def read_catalog(language, msgids):
+    """Return the translations of ``msgids`` already compiled for ``language``."""
+    path = catalog_dir(language) / f"{DOMAIN}.mo"
+    if not path.exists():
+        return {}
+    with open(path, "rb") as mo_file:
+        catalog = gettext.GNUTranslations(mo_file)
+    translations = {msgid: catalog.gettext(msgid) for msgid in msgids}
+    return {msgid: msgstr for msgid, msgstr in translations.items() if msgstr != msgid}
+
+
+def _header(language):
+    return (
+        f"Language: {language_code(language)}\n"
+        "MIME-Version: 1.0\n"
+        "Content-Type: text/plain; charset=UTF-8\n"
+        "Content-Transfer-Encoding: 8bit\n"
+        "Plural-Forms: nplurals=2; plural=(n != 1);\n"
+    )
+
+
+def _po_string(value):
+    escaped = (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\t", "\\t")
+    )
+    return f'"{escaped}"'
+
+
+def write_po(path, language, messages):
+    lines = [
+        f"# {language} translations of the CV page labels.",
+        "#",
+        'msgid ""',
+        'msgstr ""',
+        *[_po_string(line + "\n") for line in _header(language).splitlines()],
+    ]
+    for msgid, msgstr in sorted(messages.items()):
+        lines += ["", f"msgid {_po_string(msgid)}", f"msgstr {_po_string(msgstr)}"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def write_mo(path, language, messages):
+    """Write a GNU .mo file (the format ``msgfmt`` produces)."""
+    entries = sorted({"": _header(language), **messages}.items())
+    ids = [msgid.encode() for msgid, _ in entries]
+    strs = [msgstr.encode() for _, msgstr in entries]
+
+    # Magic, revision, count, offsets of the id and string tables, hash size
+    # and offset, followed by the two tables and the strings themselves.
+    ids_start = 7 * 4 + 2 * len(entries) * 8
+    id_table, str_table = [], []
+    offset = ids_start
+    for value in ids:
+        id_table += [len(value), offset]
+        offset += len(value) + 1
+    for value in strs:
+        str_table += [len(value), offset]
+        offset += len(value) + 1
+
+    output = struct.pack(
+        "Iiiiiii",
+        0x950412DE,
+        0,
+        len(entries),
+        7 * 4,
+        7 * 4 + len(entries) * 8,
+        0,
+        0,
+    )
+    output += struct.pack(f"{len(id_table)}i", *id_table)
+    output += struct.pack(f"{len(str_table)}i", *str_table)
+    output += b"".join(value + b"\0" for value in ids)
+    output += b"".join(value + b"\0" for value in strs)
+    path.write_bytes(output)
+
+
+def write_catalog(language, messages):
+    """Write the .po and .mo catalogs of ``language``; return the directory."""
+    directory = catalog_dir(language)
+    directory.mkdir(parents=True, exist_ok=True)
+    write_po(directory / f"{DOMAIN}.po", language, messages)
+    write_mo(directory / f"{DOMAIN}.mo", language, messages)
+    return directory
@@ -0,0 +1,291 @@
+"""
+Client for the translation API.
+
+Every call gets a deadline (``deadline`` seconds including retries, each
+attempt at most ``timeout``). Timeouts, connection errors, rate limits and
+server errors are retried with jittered exponential backoff while the
+deadline allows. The calls themselves go to the configured backend (see
+``main.translation.backends``). A circuit breaker counts calls that still
+failed; after ``breaker_threshold`` of them in a row it opens and calls fail
+at once with TranslationUnavailable for ``breaker_reset`` seconds, after
+which one call is let through to probe the provider. An opened breaker is
+also recorded in the shared cache, so the web processes see the failures of
+the Celery workers, where most calls run, and stop starting jobs.
+
+Callers get parsed JSON or TranslationUnavailable, never a hung socket.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+
+import openai
+from django.conf import settings
+from django.core.cache import caches
+
+from main.translation.backends import TransientBackendError, get_translation_backend
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    TransientBackendError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+# Shared cache key holding the time until which the breaker is open.
+BREAKER_CACHE_KEY = "translation-breaker:open-until"
+
+
+class TranslationUnavailable(Exception):
+    """The translation API failed, timed out or is switched off by the breaker."""
+
+
+def extract_clean_json(text: str):
+    text = text.strip()
+    text = text.replace('"```json"', "```json").replace('"```"', "```")
+
+    match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
+
+    if match:
+        json_str = match.group(1)
+    else:
+        json_str = text
+
+    json_str = re.sub(r",\s*([\]}])", r"\1", json_str)
+
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError as e:
+        logger.warning(f"JSON decode error: {str(e)}; raw string was: {json_str!r}")
+        return None
+
+
+def parse_translation(translation_data):
+    parsed_translation_data = extract_clean_json(translation_data)
+    if not isinstance(parsed_translation_data, dict):
+        raise TranslationUnavailable("Translation did not return valid JSON.")
+    return parsed_translation_data
+
+
+class CircuitBreaker:
+    """
+    Per-process breaker; with a ``shared_key`` the time until which it is
+    open is also kept in the shared cache, and a breaker opened by another
+    process makes this one fail fast too.
+    """
+
+    def __init__(self, threshold, reset_timeout, shared_key=None):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.shared_key = shared_key
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def _shared_is_open(self):
+        if self.shared_key is None:
+            return False
+        try:
+            open_until = caches["shared"].get(self.shared_key)
+        except Exception as e:
+            logger.warning(f"Failed to read the shared circuit breaker: {str(e)}")
+            return False
+        return open_until is not None and open_until > time.time()
+
+    def _share(self, open_until):
+        if self.shared_key is None:
+            return
+        try:
+            if open_until is None:
+                caches["shared"].delete(self.shared_key)
+            else:
+                caches["shared"].set(
+                    self.shared_key,
+                    open_until,
+                    timeout=math.ceil(self.reset_timeout) + 1,
+                )
+        except Exception as e:
+            logger.warning(f"Failed to share the circuit breaker state: {str(e)}")
+
+    @property
+    def is_open(self):
+        with self._lock:
+            if (
+                self._opened_at is not None
+                and time.monotonic() - self._opened_at < self.reset_timeout
+            ):
+                return True
+        return self._shared_is_open()
+
+    def allow(self):
+        """Whether a call may go out; once the breaker cools down, one probe may."""
+        with self._lock:
+            if self._opened_at is not None:
+                if (
+                    self._probing
+                    or time.monotonic() - self._opened_at < self.reset_timeout
+                ):
+                    return False
+                self._probing = True
+                return True
+        return not self._shared_is_open()
+
+    def record_success(self):
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        if was_open:
+            self._share(None)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            opened = self._probing or self._failures >= self.threshold
+            if opened:
+                if self._opened_at is None:
+                    logger.warning("Translation API circuit breaker opened.")
+                self._opened_at = time.monotonic()
+                self._probing = False
+        if opened:
+            self._share(time.time() + self.reset_timeout)
+
+
+class TranslationClient:
+    def __init__(self, config=None):
+        config = {**settings.TRANSLATION_CLIENT, **(config or {})}
+        self.timeout = config["timeout"]
+        self.deadline = config["deadline"]
+        self.max_retries = config["max_retries"]
+        self.backoff = config["backoff"]
+        self.max_backoff = config["max_backoff"]
+        self.breaker = CircuitBreaker(
+            config["breaker_threshold"],
+            config["breaker_reset"],
+            shared_key=BREAKER_CACHE_KEY,
+        )
+        self.backend = get_translation_backend(config)
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            raise TranslationUnavailable("Translation is temporarily unavailable.")
+
+    def _retry_delay(self, attempt, remaining):
+        """Full-jitter exponential backoff, or None if there is no time left."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        return delay if delay < remaining else None
+
+    def _failed(self, error, attempt, remaining):
+        """
+        Return how long to wait before retrying after ``error``, or raise
+        TranslationUnavailable if the call should not be retried.
+        """
+        if isinstance(error, TranslationUnavailable):
+            self.breaker.record_success()
+            raise error
+        retryable = isinstance(error, RETRYABLE_ERRORS)
+        delay = self._retry_delay(attempt, remaining) if retryable else None
+        if delay is None or attempt >= self.max_retries:
+            self.breaker.record_failure()
+            logger.error(f"Error translating CV content: {str(error)}")
+            raise TranslationUnavailable(f"Translation failed: {str(error)}") from error
+        return delay
+
+    def _succeeded(self, target_language, content, started):
+        self.breaker.record_success()
+        logger.debug(
+            f"Translated {len(content)} unit(s) into {target_language} with the "
+            f"{self.backend.name} backend in "
+            f"{(time.monotonic() - started) * 1000:.0f} ms"
+        )
+
+    def translate(self, target_language, content):
+        """Translate the values of ``content``; return the parsed JSON reply."""
+        self._check_breaker()
+        started = time.monotonic()
+        deadline = started + self.deadline
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                translation = parse_translation(
+                    self.backend.complete(
+                        target_language,
+                        content,
+                        max(0.1, min(self.timeout, remaining)),
+                    )
+                )
+            except Exception as e:
+                time.sleep(self._failed(e, attempt, deadline - time.monotonic()))
+                attempt += 1
+                continue
+            self._succeeded(target_language, content, started)
+            return translation
+
+    def async_client(self):
+        """An AsyncTranslationClient sharing this client's settings and breaker."""
+        return AsyncTranslationClient(self)
+
+
+class AsyncTranslationClient:
+    """
+    Async counterpart of TranslationClient for one event loop; close it with
+    ``aclose`` when done.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.backend = client.backend.async_backend()
+
+    async def translate(self, target_language, content):
+        self.client._check_breaker()
+        started = time.monotonic()
+        deadline = started + self.client.deadline
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                translation = parse_translation(
+                    await self.backend.complete(
+                        target_language,
+                        content,
+                        max(0.1, min(self.client.timeout, remaining)),
+                    )
+                )
+            except Exception as e:
+                delay = self.client._failed(e, attempt, deadline - time.monotonic())
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.client._succeeded(target_language, content, started)
+            return translation
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_translation_client():
+    """Return the process-wide translation client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TranslationClient()
+        return _client
@@ -0,0 +1,68 @@
+"""
+CV translations run as Celery jobs.
+
+``cv_detail`` renders the untranslated CV straight away and starts a
+``translate_candidate_cv`` job, whose id is kept in the shared cache under
+the candidate and language while it runs; concurrent views of the same
+translation, from any web process, find the id and attach to that job
+instead of starting another. The candidate and language of each job are
+kept under its id as well, so ``cv_translation_status`` only answers for the
+candidate a job belongs to. The page polls ``cv_translation_status`` and
+swaps the translated CV in once the job is done.
+"""
+
+import uuid
+
+from celery import current_app
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _job_key(candidate_id, language):
+    return f"translation-job:{candidate_id}:{language}"
+
+
+def _owner_key(job_id):
+    return f"translation-job-owner:{job_id}"
+
+
+def start_translation_job(candidate_id, language):
+    """Return the id of the running translation job, starting one if needed."""
+    # main.tasks imports this module.
+    from main.tasks import translate_candidate_cv
+
+    cache = caches["shared"]
+    key = _job_key(candidate_id, language)
+    job_id = str(uuid.uuid4())
+    if not cache.add(key, job_id, timeout=settings.TRANSLATION_JOB_TIMEOUT):
+        running_job_id = cache.get(key)
+        if running_job_id:
+            return running_job_id
+        cache.set(key, job_id, timeout=settings.TRANSLATION_JOB_TIMEOUT)
+
+    # Views attaching late poll for up to TRANSLATION_JOB_TIMEOUT too.
+    cache.set(
+        _owner_key(job_id),
+        {"candidate_id": candidate_id, "language": language},
+        timeout=settings.TRANSLATION_JOB_TIMEOUT * 2,
+    )
+    try:
+        translate_candidate_cv.apply_async((candidate_id, language), task_id=job_id)
+    except Exception:
+        cache.delete_many([key, _owner_key(job_id)])
+        raise
+    return job_id
+
+
+def finish_translation_job(candidate_id, language):
+    caches["shared"].delete(_job_key(candidate_id, language))
+
+
+def get_translation_job_owner(job_id):
+    """The candidate id and language of the job ``job_id``, or None."""
+    return caches["shared"].get(_owner_key(job_id))
+
+
+def get_translation_job(job_id):
+    return AsyncResult(job_id, app=current_app)
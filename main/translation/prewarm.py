@@ -0,0 +1,68 @@
+"""
+Background translation of CVs whose content changed.
+
+The signals in ``main.signals`` call ``schedule_prewarm`` after a bio or
+project edit. The first edit of a candidate schedules a Celery task
+``TRANSLATION_PREWARM_DELAY`` seconds ahead and marks the candidate in the
+shared cache, which every web and Celery process sees; later edits find the
+mark and are picked up by the same task, which clears the mark when it starts
+and translates the CV into every translating language, so the first visitor
+finds a warm cache.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from main.models import Candidate
+from main.translation.batch import translate_cv_languages
+
+logger = logging.getLogger(__name__)
+
+
+def _debounce_key(candidate_id):
+    return f"translation-prewarm:{candidate_id}"
+
+
+def schedule_prewarm(candidate_ids):
+    """Schedule a pre-translation of each candidate unless one is pending."""
+    if not settings.TRANSLATION_PREWARM:
+        return
+    # main.tasks imports this module.
+    from main.tasks import prewarm_candidate_translations
+
+    for candidate_id in set(candidate_ids):
+        if caches["shared"].add(
+            _debounce_key(candidate_id),
+            True,
+            timeout=settings.TRANSLATION_PREWARM_DELAY * 10,
+        ):
+            transaction.on_commit(
+                lambda candidate_id=candidate_id: (
+                    prewarm_candidate_translations.apply_async(
+                        (candidate_id,), countdown=settings.TRANSLATION_PREWARM_DELAY
+                    )
+                )
+            )
+
+
+def clear_pending_prewarm(candidate_id):
+    caches["shared"].delete(_debounce_key(candidate_id))
+
+
+def warm_translations(candidate_id, languages):
+    """
+    Translate a candidate's CV into each of ``languages`` (concurrently, see
+    ``main.translation.batch``); return the languages that failed.
+    """
+    if not Candidate.objects.filter(pk=candidate_id).exists():
+        return []
+
+    _, errors = translate_cv_languages(candidate_id, languages)
+    for language, error in errors.items():
+        logger.error(
+            f"Failed to pre-translate CV {candidate_id} into {language}: {error}"
+        )
+    return list(errors)
@@ -0,0 +1,206 @@
+"""
+Field-level translation of CV content.
+
+The content is split into units: each text field (``bio``, the UI labels ...)
+and each project (``project:<pk>``, its name and description). Translated
+units are stored per language with the hash of their source (projects once
+per project, shared by all candidates, the rest per candidate), so after an
+edit only the units whose source changed are sent to the model and the rest
+of the CV is reassembled from storage.
+"""
+
+from main.models import ProjectTranslation, TranslationUnit
+from main.translation.cache import compact_json, content_hash
+
+PROJECT_PREFIX = "project:"
+
+
+def project_key(project_pk):
+    return f"{PROJECT_PREFIX}{project_pk}"
+
+
+def cv_units(cv_content, projects):
+    """
+    Split the output of ``cv_content_to_translate`` into units, using the
+    ``projects`` it was built from for the project keys.
+    """
+    units = {key: value for key, value in cv_content.items() if key != "projects"}
+    for project, project_content in zip(projects, cv_content["projects"]):
+        units[project_key(project.pk)] = project_content
+    return units
+
+
+def assemble(units, translated):
+    """Rebuild the translated CV content, keeping the source of missing units."""
+    content = {"projects": []}
+    for key, source in units.items():
+        value = translated.get(key, source)
+        if key.startswith(PROJECT_PREFIX):
+            content["projects"].append(value)
+        else:
+            content[key] = value
+    return content
+
+
+def _is_valid(source, value):
+    if isinstance(source, dict):
+        return isinstance(value, dict) and set(value) == set(source)
+    return isinstance(value, str)
+
+
+def _project_pk(key):
+    return int(key.removeprefix(PROJECT_PREFIX))
+
+
+def _load(candidate_id, language, units, hashes):
+    """Stored translations of ``units`` whose source is unchanged."""
+    project_keys = [key for key in units if key.startswith(PROJECT_PREFIX)]
+    field_keys = [key for key in units if key not in project_keys]
+
+    stored = {
+        unit.key: unit.translation
+        for unit in TranslationUnit.objects.filter(
+            candidate_id=candidate_id, language=language, key__in=field_keys
+        )
+        if unit.source_hash == hashes[unit.key]
+    }
+    for translation in ProjectTranslation.objects.filter(
+        project_id__in=[_project_pk(key) for key in project_keys], language=language
+    ):
+        key = project_key(translation.project_id)
+        if translation.source_hash == hashes[key]:
+            stored[key] = {
+                "project_name": translation.project_name,
+                "project_description": translation.project_description,
+            }
+    return stored
+
+
+def _store(candidate_id, language, translated, hashes):
+    TranslationUnit.objects.bulk_create(
+        [
+            TranslationUnit(
+                candidate_id=candidate_id,
+                key=key,
+                language=language,
+                source_hash=hashes[key],
+                translation=value,
+            )
+            for key, value in translated.items()
+            if not key.startswith(PROJECT_PREFIX)
+        ],
+        update_conflicts=True,
+        unique_fields=["candidate", "key", "language"],
+        update_fields=["source_hash", "translation"],
+    )
+    ProjectTranslation.objects.bulk_create(
+        [
+            ProjectTranslation(
+                project_id=_project_pk(key),
+                language=language,
+                source_hash=hashes[key],
+                project_name=value["project_name"],
+                project_description=value["project_description"],
+            )
+            for key, value in translated.items()
+            if key.startswith(PROJECT_PREFIX)
+        ],
+        update_conflicts=True,
+        unique_fields=["project", "language"],
+        update_fields=["source_hash", "project_name", "project_description"],
+    )
+
+
+def chunk_units(units, max_chars):
+    """
+    Split ``units`` into dicts whose compact JSON stays within about
+    ``max_chars`` characters; a unit larger than that gets a chunk of its own.
+    """
+    chunks, chunk, size = [], {}, 1
+    for key, source in units.items():
+        # The item plus a brace or comma.
+        item_size = len(compact_json({key: source})) - 1
+        if chunk and size + item_size > max_chars:
+            chunks.append(chunk)
+            chunk, size = {}, 1
+        chunk[key] = source
+        size += item_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def merge_chunk_replies(replies):
+    """
+    Merge the replies to the chunks of one translation, skipping failed
+    chunks (exceptions) so their units stay untranslated. Raises the first
+    error if every chunk failed.
+    """
+    merged, errors = {}, []
+    for reply in replies:
+        if isinstance(reply, Exception):
+            errors.append(reply)
+        else:
+            merged.update(reply)
+    if errors and not merged:
+        raise errors[0]
+    return merged
+
+
+def pending_units(candidate_id, language, units):
+    """
+    Split ``units`` into the stored translations whose source is unchanged
+    and the units that still need translating.
+    """
+    hashes = {key: content_hash(source) for key, source in units.items()}
+    stored = _load(candidate_id, language, units, hashes)
+    missing = {key: source for key, source in units.items() if key not in stored}
+    return stored, missing
+
+
+def save_units(candidate_id, language, units, reply):
+    """
+    Store the translations of ``units`` found in ``reply`` (the model's
+    answer) and return them; units it left out or mangled are skipped.
+    """
+    translated = {
+        key: value
+        for key, value in reply.items()
+        if key in units and _is_valid(units[key], value)
+    }
+    hashes = {key: content_hash(units[key]) for key in translated}
+    _store(candidate_id, language, translated, hashes)
+    return translated
+
+
+def translate_units(candidate_id, language, units, translate):
+    """
+    Return ``units`` translated into ``language``. Stored translations are
+    reused while their source is unchanged; the remaining units are passed to
+    ``translate`` (a callable taking and returning a dict of units) in one
+    call and stored. Units the model left out or mangled stay untranslated.
+
+    Projects are stored once per project in ProjectTranslation and shared by
+    every candidate that lists the project; the other units are stored per
+    candidate.
+    """
+    stored, missing = pending_units(candidate_id, language, units)
+    if not missing:
+        return stored
+    return {**stored, **save_units(candidate_id, language, missing, translate(missing))}
+
+
+def project_source_hash(project):
+    return content_hash(
+        {
+            "project_name": project.project_name,
+            "project_description": project.project_description,
+        }
+    )
+
+
+def invalidate_project_translations(project):
+    """Drop the translations of ``project`` made from different text."""
+    ProjectTranslation.objects.filter(project=project).exclude(
+        source_hash=project_source_hash(project)
+    ).delete()
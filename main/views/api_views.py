@@ -1,4 +1,8 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -13,18 +17,22 @@ from main.models import (
     Project,
     Skill,
 )
+from main.pdf.export import export_candidates, iter_cv_archive
 from main.serializers import (
     BioItemSerializer,
+    CandidateExportSerializer,
     CandidateProjectSerializer,
     CandidateSerializer,
     CandidateSkillSerializer,
     CandidateSummarySerializer,
+    CandidateTranslationSerializer,
     ContactSerializer,
     ContactTypeSerializer,
     ProjectSerializer,
     SkillSerializer,
     UserRegistrationSerializer,
 )
+from main.translation.batch import translate_cv_languages
 
 
 class UserRegistrationView(APIView):
@@ -44,6 +52,55 @@ class CandidateViewSet(viewsets.ModelViewSet):
     serializer_class = CandidateSerializer
     permission_classes = [IsAuthenticated]
 
+    @action(
+        detail=True, methods=["post"], serializer_class=CandidateTranslationSerializer
+    )
+    def translations(self, request, pk=None):
+        candidate = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results, errors = translate_cv_languages(
+            candidate.pk, serializer.validated_data["languages"]
+        )
+        return Response({"results": results, "errors": errors})
+
+    @action(detail=False, methods=["post"], serializer_class=CandidateExportSerializer)
+    def export(self, request):
+        """
+        Stream a ZIP of the CV PDFs of the candidates matching ``ids``,
+        ``search`` and ``skill`` (all candidates if none is given), capped at
+        PDF_EXPORT_MAX_CANDIDATES; larger exports go through the
+        ``export_cvs`` management command.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+        candidate_ids = list(
+            export_candidates(
+                filters.get("ids"), filters.get("search"), filters.get("skill")
+            ).values_list("pk", flat=True)[: settings.PDF_EXPORT_MAX_CANDIDATES + 1]
+        )
+        if not candidate_ids:
+            return Response(
+                {"detail": "No candidates match."}, status=status.HTTP_404_NOT_FOUND
+            )
+        if len(candidate_ids) > settings.PDF_EXPORT_MAX_CANDIDATES:
+            return Response(
+                {
+                    "detail": f"More than {settings.PDF_EXPORT_MAX_CANDIDATES} "
+                    "candidates match; narrow the selection."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        response = StreamingHttpResponse(
+            iter_cv_archive(candidate_ids, filters.get("language")),
+            content_type="application/zip",
+        )
+        filename = f"cvs-{timezone.now():%Y%m%dT%H%M%S}.zip"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
 
 class CandidateSummaryViewSet(viewsets.ModelViewSet):
     queryset = Candidate.objects.all()
@@ -1,21 +1,33 @@
 from celery import current_app
 from celery.result import AsyncResult
 from django import forms
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
 
 from CVProject.constants import AUDIT_BASE_URL, LOGS_BASE_URL, SETTINGS_BASE_URL
 from main.models import Candidate
+from main.pdf.render import RenderError
 from main.tasks import send_candidate_pdf_email
+from main.translation.client import get_translation_client
+from main.translation.jobs import (
+    get_translation_job,
+    get_translation_job_owner,
+    start_translation_job,
+)
 from main.views.helpers import (
-    _get_cv_context,
-    _get_cv_detail_ui_context,
+    _get_cv_detail_context,
     generate_candidate_pdf,
+    get_cached_cv_translation,
     process_cv_context,
+    read_candidate_pdf,
+    stored_cv_translation,
 )
 
 
@@ -57,31 +69,78 @@ def cv_list(request):
 @login_required
 def cv_detail(request, pk):
     error_message = None  # Initialize error message
+    translation_status_url = None
     selected_language = request.GET.get("language")
 
-    try:
-        cv_detail_context = process_cv_context(pk, selected_language)
-    except Exception as e:
-        error_message = f"Failed to load CV details: {str(e)}"
-        cv_detail_context = _get_cv_context(pk)
-        candidate = cv_detail_context["candidate"]
-        cv_detail_ui_context = _get_cv_detail_ui_context(candidate)
-        cv_detail_context.update(cv_detail_ui_context)
+    cv_detail_context = _get_cv_detail_context(pk, selected_language)
+    if selected_language:
+        translation = get_cached_cv_translation(cv_detail_context, selected_language)
+        if translation is not None:
+            cv_detail_context.update(translation)
+        elif get_translation_client().breaker.is_open:
+            cv_detail_context.update(
+                stored_cv_translation(cv_detail_context, selected_language)
+            )
+            error_message = "Translation is temporarily unavailable."
+        else:
+            try:
+                job_id = start_translation_job(pk, selected_language)
+                translation_status_url = reverse(
+                    "cv_translation_status", args=[pk, job_id]
+                )
+            except Exception as e:
+                error_message = f"Failed to load CV details: {str(e)}"
 
     cv_detail_context.update(
         {
             "error_message": error_message,
+            "translation_status_url": translation_status_url,
+            "translation_timeout_ms": settings.TRANSLATION_JOB_TIMEOUT * 1000,
         }
     )
 
     return render(request, "main/cv_detail.html", cv_detail_context)
 
 
+@login_required
+def cv_translation_status(request, pk, job_id):
+    owner = get_translation_job_owner(job_id)
+    if owner is None or owner["candidate_id"] != pk:
+        raise Http404("Unknown translation job.")
+    job = get_translation_job(job_id)
+    if job.failed():
+        return JsonResponse(
+            {"status": "failed", "error": f"Failed to translate the CV: {job.result}"}
+        )
+    if not job.successful():
+        return JsonResponse({"status": "pending"})
+
+    cv_detail_context = _get_cv_detail_context(pk, owner["language"])
+    cv_detail_context.update(job.result["content"])
+    return JsonResponse(
+        {
+            "status": "ready",
+            "html": render_to_string(
+                "includes/candidate_cv_card.html", cv_detail_context
+            ),
+        }
+    )
+
+
 @login_required
 def cv_generate_pdf(request, pk):
     selected_language = request.GET.get("language")
     cv_detail_context = process_cv_context(pk, selected_language)
-    return generate_candidate_pdf(cv_detail_context)
+    try:
+        return generate_candidate_pdf(request, cv_detail_context, selected_language)
+    except RenderError as e:
+        response = HttpResponse(
+            f"Failed to generate the PDF: {str(e)}",
+            status=503,
+            content_type="text/plain",
+        )
+        response["Retry-After"] = "5"
+        return response
 
 
 @login_required
@@ -93,8 +152,7 @@ def send_cv_to_email(request, pk):
             try:
                 validate_email(email)
                 cv_detail_context = process_cv_context(pk, selected_language)
-                pdf_response = generate_candidate_pdf(cv_detail_context)
-                pdf_content = pdf_response.content
+                pdf_content = read_candidate_pdf(cv_detail_context, selected_language)
 
                 candidate = get_object_or_404(Candidate, pk=pk)
                 task_id = send_candidate_pdf_email.delay(
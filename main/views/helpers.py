@@ -1,19 +1,41 @@
 import json
+import logging
 import random
-import re
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
-from openai import OpenAI
-from weasyprint import HTML
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.translation import gettext, gettext_noop
 
 from CVProject.constants import AUDIT_BASE_URL, LOGS_BASE_URL, SETTINGS_BASE_URL
 from main.models import Candidate
-
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from main.pdf.cache import (
+    cached_pdf_response,
+    get_cached_pdf,
+    pdf_cache_name,
+    pdf_version,
+    read_cached_pdf,
+    store_pdf,
+)
+from main.pdf.render import print_stylesheets, render_document
+from main.translation.cache import get_cached_translation, store_translation
+from main.translation.catalogs import has_catalog, language_code
+from main.translation.client import TranslationUnavailable, get_translation_client
+from main.translation.units import (
+    assemble,
+    chunk_units,
+    cv_units,
+    merge_chunk_replies,
+    pending_units,
+    translate_units,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def _get_languages():
@@ -40,27 +62,6 @@ def _get_languages():
     return languages.split(",") if languages else default_languages
 
 
-def extract_clean_json(text: str):
-    text = text.strip()
-    text = text.replace('"```json"', "```json").replace('"```"', "```")
-
-    match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
-
-    if match:
-        json_str = match.group(1)
-    else:
-        json_str = text
-
-    json_str = re.sub(r",\s*([\]}])", r"\1", json_str)
-
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        print("JSON decode error:", e)
-        print("Raw string was:\n", json_str)
-        return None
-
-
 def _get_cv_context(pk):
     candidate = get_object_or_404(Candidate, pk=pk)
 
@@ -92,58 +93,61 @@ def _get_cv_context(pk):
     }
 
 
-def _get_cv_detail_ui_context(candidate):
+# Static labels of the CV page, translated through the gettext catalogs
+# written by the ``translate_ui_strings`` command. For a language without a
+# catalog they are sent for translation with the CV content instead.
+CV_DETAIL_UI_STRINGS = {
+    "tab_title": gettext_noop("%(first_name)s %(last_name)s CV"),
+    "home_btn_title": gettext_noop("< Home"),
+    "download_btn_title": gettext_noop("Download PDF"),
+    "email_submit_btn_title": gettext_noop("Send PDF"),
+    "translate_btn_title": gettext_noop("Translate"),
+    "bio_title": gettext_noop("Bio"),
+    "skills_title": gettext_noop("Skills"),
+    "projects_title": gettext_noop("Projects"),
+    "contacts_title": gettext_noop("Contacts"),
+    "no_bio_message": gettext_noop("No bio information available."),
+    "no_skills_message": gettext_noop("No skills information available."),
+    "no_projects_message": gettext_noop("No projects information available."),
+    "no_contacts_message": gettext_noop("No contacts information available."),
+    "translating_message": gettext_noop("Translating the CV..."),
+}
+
+
+def _get_cv_detail_ui_context(candidate, selected_language=None):
     languages_list = _get_languages()
+    ui_language = (
+        language_code(selected_language)
+        if selected_language
+        else settings.LANGUAGE_CODE
+    )
+    with translation.override(ui_language):
+        labels = {key: gettext(msgid) for key, msgid in CV_DETAIL_UI_STRINGS.items()}
+    labels["tab_title"] = labels["tab_title"] % {
+        "first_name": candidate.first_name,
+        "last_name": candidate.last_name,
+    }
     return {
         "languages_list": languages_list,
-        "tab_title": f"{candidate.first_name} {candidate.last_name} CV",
-        "home_btn_title": "< Home",
         "audit_logs_url": f"/{AUDIT_BASE_URL}{LOGS_BASE_URL}",
         "settings_url": f"/{SETTINGS_BASE_URL}",
-        "download_btn_title": "Download PDF",
-        "email_submit_btn_title": "Send PDF",
-        "translate_btn_title": "Translate",
-        "bio_title": "Bio",
-        "skills_title": "Skills",
-        "projects_title": "Projects",
-        "contacts_title": "Contacts",
-        "no_bio_message": "No bio information available.",
-        "no_skills_message": "No skills information available.",
-        "no_projects_message": "No projects information available.",
-        "no_contacts_message": "No contacts information available.",
+        "translate_labels": bool(selected_language)
+        and not has_catalog(selected_language),
+        **labels,
     }
 
 
 def cv_content_to_translate(cv_detail_context):
-    cv_content = {
-        "no_bio_message": cv_detail_context.get(
-            "no_bio_message", "No bio message is unavailable."
-        ),
-        "no_skills_message": cv_detail_context.get(
-            "no_skills_message", "No skills message is unavailable."
-        ),
-        "no_projects_message": cv_detail_context.get(
-            "no_projects_message", "No projects message is unavailable."
-        ),
-        "no_contacts_message": cv_detail_context.get(
-            "no_contacts_message", "No contacts message is unavailable."
-        ),
-        "download_btn_title": cv_detail_context.get(
-            "download_btn_title", "Download PDF"
-        ),
-        "email_submit_btn_title": cv_detail_context.get(
-            "email_submit_btn_title", "Send PDF"
-        ),
-        "translate_btn_title": cv_detail_context.get(
-            "translate_btn_title", "Translate"
-        ),
-        "skills_title": cv_detail_context.get("skills_title", "Skills"),
-        "projects_title": cv_detail_context.get("projects_title", "Projects"),
-        "contacts_title": cv_detail_context.get("contacts_title", "Contacts"),
-        "bio_title": cv_detail_context.get("bio_title", "Bio"),
-        "bio": cv_detail_context.get("bio", "No bio information available."),
-        "projects": [],
-    }
+    """The candidate-specific content of a CV page, as sent for translation."""
+    cv_content = {"projects": []}
+    if cv_detail_context.get("translate_labels"):
+        cv_content.update(
+            (key, cv_detail_context[key])
+            for key in CV_DETAIL_UI_STRINGS
+            if key != "tab_title"
+        )
+    if cv_detail_context.get("bio"):
+        cv_content["bio"] = cv_detail_context["bio"]
 
     context_projects = cv_detail_context.get("projects", [])
     for project_context in context_projects:
@@ -157,65 +161,182 @@ def cv_content_to_translate(cv_detail_context):
     return cv_content
 
 
+def translate_content(target_language, content):
+    """
+    Translate the values of ``content``; raises TranslationUnavailable when
+    the translation API fails.
+    """
+    return get_translation_client().translate(target_language, content)
+
+
 def translate_cv_content(target_language, cv_detail_context):
-    content_to_translate = json.dumps(
-        cv_content_to_translate(cv_detail_context), indent=2, ensure_ascii=False
+    return translate_content(
+        target_language, cv_content_to_translate(cv_detail_context)
     )
 
-    try:
-        prompt = (
-            f"You are a professional translator.\n"
-            f"Translate the following JSON to {target_language}.\n"
-            f"Return only valid JSON without comments or extra text.\n\n"
-            f"{content_to_translate}"
-        )
 
-        response = client.responses.create(
-            model="gpt-4o",
-            instructions="You are a professional translator.",
-            input=prompt,
-            temperature=0.3,
-        )
+def translate_units_in_chunks(target_language, units):
+    """
+    Translate ``units``, split into chunks of at most
+    ``TRANSLATION_CHUNK_MAX_CHARS`` that are sent in parallel and merged.
+    """
+    chunks = chunk_units(units, settings.TRANSLATION_CHUNK_MAX_CHARS)
+    if len(chunks) == 1:
+        return translate_content(target_language, chunks[0])
+
+    workers = min(len(chunks), settings.TRANSLATION_CHUNK_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(translate_content, target_language, chunk)
+            for chunk in chunks
+        ]
+    replies = []
+    for future in futures:
+        try:
+            replies.append(future.result())
+        except TranslationUnavailable as e:
+            replies.append(e)
+    return merge_chunk_replies(replies)
 
-        translation = response.output_text
 
-    except Exception as e:
-        print(f"Error translating CV content: {str(e)}")
-        return JsonResponse({"Exception error": str(e)}, status=500)
+def _get_cv_detail_context(pk, selected_language=None):
+    cv_detail_context = _get_cv_context(pk)
+    candidate = cv_detail_context["candidate"]
+    cv_detail_ui_context = _get_cv_detail_ui_context(candidate, selected_language)
+    cv_detail_context.update(cv_detail_ui_context)
+    return cv_detail_context
 
-    return translation
 
+def get_cached_cv_translation(cv_detail_context, selected_language):
+    """The stored translation of the CV content, or None."""
+    return get_cached_translation(
+        cv_detail_context["candidate"].pk,
+        selected_language,
+        cv_content_to_translate(cv_detail_context),
+    )
 
-def process_cv_context(pk, selected_language=None):
-    cv_detail_context = _get_cv_context(pk)
+
+def complete_translation(candidate_id, language, payload, units, translated):
+    """
+    Assemble the translated CV content from ``translated`` units and cache it
+    if no unit is missing.
+    """
+    content = assemble(units, translated)
+    if len(translated) == len(units):
+        store_translation(candidate_id, language, payload, content)
+    return content
+
+
+def translate_cv_detail_context(cv_detail_context, selected_language):
+    """
+    Return the CV content of ``cv_detail_context`` translated into
+    ``selected_language``, calling the translation API for whatever is not
+    stored yet.
+    """
     candidate = cv_detail_context["candidate"]
-    cv_detail_ui_context = _get_cv_detail_ui_context(candidate)
-    cv_detail_context.update(cv_detail_ui_context)
+    payload = cv_content_to_translate(cv_detail_context)
+    parsed_translation_data = get_cached_translation(
+        candidate.pk, selected_language, payload
+    )
+    if parsed_translation_data is None:
+        units = cv_units(payload, cv_detail_context["projects"])
+        translated_units = translate_units(
+            candidate.pk,
+            selected_language,
+            units,
+            lambda missing: translate_units_in_chunks(selected_language, missing),
+        )
+        parsed_translation_data = complete_translation(
+            candidate.pk, selected_language, payload, units, translated_units
+        )
+    return parsed_translation_data
+
+
+def stored_cv_translation(cv_detail_context, selected_language):
+    """
+    The CV content translated as far as stored translations go, without
+    calling the translation API.
+    """
+    translation = get_cached_cv_translation(cv_detail_context, selected_language)
+    if translation is not None:
+        return translation
+    candidate = cv_detail_context["candidate"]
+    units = cv_units(
+        cv_content_to_translate(cv_detail_context), cv_detail_context["projects"]
+    )
+    stored, _ = pending_units(candidate.pk, selected_language, units)
+    return assemble(units, stored)
+
+
+def process_cv_context(pk, selected_language=None):
+    cv_detail_context = _get_cv_detail_context(pk, selected_language)
     if selected_language:
-        translation_data = translate_cv_content(selected_language, cv_detail_context)
-        if isinstance(translation_data, JsonResponse):
-            error_message = translation_data.status_code
-            if error_message == 500:
-                raise ValueError(
-                    "An internal server error occurred. "
-                    "Translation failed with status code 500."
-                )
-        if isinstance(translation_data, str):
-            parsed_translation_data = extract_clean_json(translation_data)
-            cv_detail_context.update(parsed_translation_data)
+        try:
+            translation = translate_cv_detail_context(
+                cv_detail_context, selected_language
+            )
+        except TranslationUnavailable as e:
+            logger.warning(f"Serving CV {pk} without a full translation: {str(e)}")
+            translation = stored_cv_translation(cv_detail_context, selected_language)
+        cv_detail_context.update(translation)
 
     return cv_detail_context
 
 
-def generate_candidate_pdf(cv_detail_context):
-    html_content = render_to_string("main/cv_detail.html", cv_detail_context)
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = (
-        f'inline; filename="{cv_detail_context["candidate"].first_name}_'
-        f'{cv_detail_context["candidate"].last_name}_CV.pdf"'
+def candidate_pdf_name(cv_detail_context, selected_language=None):
+    """Storage name of the cached PDF of the CV."""
+    return pdf_cache_name(
+        cv_detail_context["candidate"].pk,
+        pdf_version(cv_detail_context, selected_language),
+        selected_language,
+    )
+
+
+def render_candidate_pdf(name, html_content):
+    """Lay out the print HTML of a CV, cache the PDF as ``name`` and return it."""
+    pdf = render_document(html_content, stylesheets=print_stylesheets())
+    store_pdf(name, pdf)
+    return pdf
+
+
+def _render_cv_pdf(name, cv_detail_context):
+    return render_candidate_pdf(
+        name, render_to_string("main/cv_print.html", cv_detail_context)
     )
-    HTML(string=html_content).write_pdf(response)
-    return response
+
+
+def candidate_pdf(cv_detail_context, selected_language=None):
+    """Storage name of the PDF of the CV, rendered on a cache miss."""
+    name = candidate_pdf_name(cv_detail_context, selected_language)
+    if not get_cached_pdf(name):
+        _render_cv_pdf(name, cv_detail_context)
+    return name
+
+
+def read_candidate_pdf(cv_detail_context, selected_language=None):
+    """The PDF of the CV, rendered on a cache miss."""
+    name = candidate_pdf_name(cv_detail_context, selected_language)
+    pdf = read_cached_pdf(name)
+    if pdf is None:
+        pdf = _render_cv_pdf(name, cv_detail_context)
+    return pdf
+
+
+def generate_candidate_pdf(request, cv_detail_context, selected_language=None):
+    etag = f'"{pdf_version(cv_detail_context, selected_language)}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    candidate = cv_detail_context["candidate"]
+    filename = f"{candidate.first_name}_{candidate.last_name}_CV.pdf"
+    name = candidate_pdf(cv_detail_context, selected_language)
+    try:
+        return cached_pdf_response(name, filename, etag)
+    except FileNotFoundError:
+        # Evicted since it was looked up.
+        _render_cv_pdf(name, cv_detail_context)
+        return cached_pdf_response(name, filename, etag)
 
 
 def remove_message(request):